@@ -1,16 +1,44 @@
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, Response, g, jsonify, request, send_from_directory, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 import time
 import logging
 import os
 import json
+import hashlib
+import tempfile
+import threading
 
 # Import the Google Sheets manager
 from sheets_integration import GoogleSheetsManager
+from single_flight import SingleFlight
+from background_refresh import BackgroundRefresher
+from fetch_scheduler import FetchRefused, FetchScheduler
+from order_snapshot import STATUS_STAT_KEYS, OrderSnapshot, normalize_booth, normalize_exhibitor
+from order_events import OrderBroadcaster
+from change_log import ChangeLog, change_events
+from order_query import OrderQuery, QueryError, parse_fields, project
+from compact_order import CompactOrder, json_default
+from prepared_body import PreparedBody
+from bounded_cache import BoundedCache
+from snapshot_store import FileSnapshotStore, LocalSnapshotStore, default_store_path
+from snapshot_file import SnapshotFile
+from stats_history import StatsHistory
+from metrics import METRICS, SIZE_BUCKETS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+class OrderJSONProvider(DefaultJSONProvider):
+    """JSON provider that expands CompactOrder records into order dicts"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, CompactOrder):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
 
 # Initialize Flask app with static folder for React build
 app = Flask(__name__, static_folder='frontend/build', static_url_path='')
+app.json = OrderJSONProvider(app)
 CORS(app)  # Enable CORS for React app
 
 # Configure logging
@@ -18,24 +46,153 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # SMART CACHING SYSTEM - Allows manual refresh override
-CACHE = {}
 CACHE_DURATION = 120  # 2 minutes cache for auto-refresh
 FORCE_REFRESH_PARAM = 'force_refresh'
 
-def get_from_cache(key, allow_cache=True):
+# Per-exhibitor bodies are LRU-evicted past these limits and dropped once
+# expired; the order snapshot itself is pinned so it can be served stale
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1000))
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+PINNED_CACHE_KEYS = {'all_orders'}
+CACHE = BoundedCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_DURATION)
+
+# /api/orders?limit=... page sizes (default when only a cursor is sent, and the largest allowed)
+ORDERS_PAGE_SIZE = int(os.environ.get('ORDERS_PAGE_SIZE', 500))
+ORDERS_MAX_PAGE_SIZE = int(os.environ.get('ORDERS_MAX_PAGE_SIZE', 5000))
+
+# Most exhibitors plus booths one /api/orders/bulk request may ask for
+BULK_MAX_KEYS = int(os.environ.get('ORDERS_BULK_MAX_KEYS', 100))
+
+# /api/exhibitors/search result counts (default and largest allowed)
+SEARCH_LIMIT = int(os.environ.get('EXHIBITOR_SEARCH_LIMIT', 10))
+MAX_SEARCH_LIMIT = 50
+
+# One in-flight Sheets load per cache key; concurrent misses wait on it
+SHEETS_LOADS = SingleFlight()
+
+# Background refresh rebuilds the order snapshot before it expires, so
+# requests keep serving the previous snapshot instead of waiting on Sheets
+BACKGROUND_REFRESH = os.environ.get('ORDERS_BACKGROUND_REFRESH', 'true').lower() == 'true'
+REFRESH_INTERVAL = float(os.environ.get('ORDERS_REFRESH_INTERVAL', CACHE_DURATION * 0.75))
+REFRESH_JITTER = float(os.environ.get('ORDERS_REFRESH_JITTER', CACHE_DURATION * 0.1))
+
+# Status counts of every Sheets snapshot are sampled into a ring buffer
+# for /api/stats/history: on each new snapshot and on a timer, keeping at
+# most one sample (the latest counts) per interval
+STATS_HISTORY_INTERVAL = float(os.environ.get('STATS_HISTORY_INTERVAL', 60))
+STATS_HISTORY_SIZE = int(os.environ.get('STATS_HISTORY_SIZE', 1440))
+STATS_KEYS = ('total_orders',) + tuple(STATUS_STAT_KEYS.values())
+STATS_HISTORY = StatsHistory(STATS_KEYS, interval=STATS_HISTORY_INTERVAL, capacity=STATS_HISTORY_SIZE)
+
+# Snapshot changes are pushed to /api/stream subscribers instead of being polled
+ORDER_EVENTS = OrderBroadcaster()
+STREAM_KEEPALIVE = float(os.environ.get('STREAM_KEEPALIVE', 15))
+# Under plain Flask/WSGI every /api/stream client holds a worker thread, so
+# streams are capped per process and clients past the cap get a 503 and
+# fall back to polling; asgi.py (the Docker default) serves streams without
+# threads and never reaches this route
+WSGI_MAX_STREAMS = int(os.environ.get('WSGI_MAX_STREAMS', 8))
+_wsgi_streams = {'open': 0, 'refused': 0}
+_wsgi_streams_lock = threading.Lock()
+
+# Order-level events (added, removed, status_changed, updated) between
+# consecutive snapshots, for clients polling /api/changes?since=<version>
+CHANGES_LOG_SIZE = int(os.environ.get('CHANGES_LOG_SIZE', 10000))
+CHANGE_LOG = ChangeLog(max_events=CHANGES_LOG_SIZE)
+
+# Shared snapshot store: one worker fetches from Sheets and writes the
+# snapshot, the other gunicorn workers load it ('file'), or 'local' to
+# keep every process on its own
+SNAPSHOT_STORE_BACKEND = os.environ.get('SNAPSHOT_STORE', 'file').lower()
+STORE_POLL_INTERVAL = float(os.environ.get('SNAPSHOT_STORE_POLL_INTERVAL', 1))
+if SNAPSHOT_STORE_BACKEND == 'file':
+    SNAPSHOT_STORE = FileSnapshotStore(os.environ.get('SNAPSHOT_STORE_PATH') or default_store_path())
+else:
+    SNAPSHOT_STORE = LocalSnapshotStore()
+_store_state = {'token': None, 'checked_at': 0.0}
+
+# The last good Sheets snapshot is also kept on disk, so a restarted
+# process serves it (flagged with its age) while its first fetch runs
+# instead of blocking or falling back to mock orders. Point
+# SNAPSHOT_PERSIST_PATH at a disk that survives redeploys; empty disables
+SNAPSHOT_PERSIST_PATH = os.environ.get(
+    'SNAPSHOT_PERSIST_PATH', os.path.join(tempfile.gettempdir(), 'exhibitor-orders-snapshot.bin')
+)
+SNAPSHOT_FILE = SnapshotFile(SNAPSHOT_PERSIST_PATH) if SNAPSHOT_PERSIST_PATH else None
+# 'snapshot' is the restored snapshot until a fetch confirms or replaces it
+_restore_state = {'checked': False, 'snapshot': None}
+
+# Last Sheets load failure in this process (None once a load succeeds)
+_fetch_state = {'error': None}
+
+# Instrumentation served at /api/metrics (Prometheus text format)
+CACHE_LOOKUPS = METRICS.counter(
+    'cache_lookups_total', 'Cache lookups by cache and result (hit, stale, miss, bypass)',
+    labels=('cache', 'result')
+)
+ORDERS_LOAD_SECONDS = METRICS.histogram(
+    'orders_load_seconds', 'load_orders_from_sheets latency, served from cache or fetched',
+    labels=('result',)
+)
+ORDERS_REFRESHES = METRICS.counter(
+    'orders_refreshes_total', 'Snapshot loads from Sheets by outcome (rebuilt, unchanged, stale, mock, error)',
+    labels=('outcome',)
+)
+HTTP_REQUEST_SECONDS = METRICS.histogram(
+    'http_request_seconds', 'API request latency', labels=('endpoint', 'method', 'status')
+)
+HTTP_RESPONSE_BYTES = METRICS.histogram(
+    'http_response_bytes', 'API response body size', labels=('endpoint',), buckets=SIZE_BUCKETS
+)
+
+def _snapshot_age():
+    snapshot = CACHE.peek('all_orders')
+    return snapshot.age() if snapshot else None
+
+def _snapshot_orders():
+    snapshot = CACHE.peek('all_orders')
+    return len(snapshot) if snapshot else None
+
+def _cache_evictions():
+    stats = CACHE.stats()
+    return stats['evicted_lru'] + stats['evicted_expired']
+
+METRICS.gauge('orders_snapshot_age_seconds', 'Seconds since the served snapshot was built', _snapshot_age)
+METRICS.gauge('orders_snapshot_orders', 'Orders in the served snapshot', _snapshot_orders)
+METRICS.gauge('cache_entries', 'Entries in the response cache', lambda: len(CACHE))
+METRICS.gauge('cache_bytes', 'Estimated bytes held by the response cache', lambda: CACHE.stats()['estimated_bytes'])
+METRICS.gauge('cache_evictions', 'Cache entries evicted (LRU or expired)', _cache_evictions)
+METRICS.gauge('sheets_circuit_open', 'Whether the Sheets circuit breaker is open (1) or closed (0)',
+              lambda: 0 if SHEETS_SCHEDULER.state == 'closed' else 1)
+METRICS.gauge('stream_subscribers', 'Open /api/stream connections', lambda: ORDER_EVENTS.stats()['subscribers'])
+
+def _cache_name(key):
+    # Per-exhibitor and per-query entries share one label so the series count stays bounded
+    if key.startswith('exhibitor_'):
+        return 'exhibitor'
+    if key.startswith('orders_query_'):
+        return 'orders_query'
+    if key.startswith('orders_bulk_'):
+        return 'orders_bulk'
+    return key
+
+def get_from_cache(key, allow_cache=True, allow_stale=False):
     if not allow_cache:
         logger.info(f"Cache bypassed for {key} (manual refresh)")
+        CACHE_LOOKUPS.inc(cache=_cache_name(key), result='bypass')
         return None
         
-    if key in CACHE:
-        data, timestamp = CACHE[key]
-        if datetime.now() - timestamp < timedelta(seconds=CACHE_DURATION):
-            logger.info(f"Using cached data for {key}")
-            return data
+    entry = CACHE.get(key, max_age=None if allow_stale else CACHE_DURATION)
+    if entry is not None:
+        logger.info(f"Using cached data for {key}")
+        fresh = entry.age() < CACHE_DURATION
+        CACHE_LOOKUPS.inc(cache=_cache_name(key), result='hit' if fresh else 'stale')
+        return entry.value
+    CACHE_LOOKUPS.inc(cache=_cache_name(key), result='miss')
     return None
 
 def set_cache(key, data):
-    CACHE[key] = (data, datetime.now())
+    CACHE.set(key, data, pin=key in PINNED_CACHE_KEYS)
     logger.info(f"Cached data for {key}")
 
 # Initialize Google Sheets Manager with environment credentials
@@ -59,13 +216,51 @@ def get_credentials():
         logger.error(f"Error setting up credentials: {e}")
         return None
 
-# Initialize Google Sheets Manager
-credentials_path = get_credentials()
-if credentials_path:
-    gs_manager = GoogleSheetsManager(credentials_path)
-else:
-    gs_manager = None
-    logger.warning("No valid credentials found - using mock data only")
+# Incremental sync re-reads only status changes, rows whose identifying
+# cells changed and appended rows between periodic full reads of the Orders
+# worksheet; quantity/comments edits wait for the next full read (or a
+# force_refresh / clear-cache)
+INCREMENTAL_SYNC = os.environ.get('SHEETS_INCREMENTAL_SYNC', 'true').lower() == 'true'
+FULL_RESYNC_EVERY = int(os.environ.get('SHEETS_FULL_RESYNC_EVERY', 10))
+
+# Worksheets holding orders. With more than one, every refresh reads all of
+# them in a single batched values request and merges them into one snapshot
+ORDER_WORKSHEETS = [
+    name.strip() for name in os.environ.get('ORDERS_WORKSHEETS', 'Orders').split(',') if name.strip()
+] or ['Orders']
+
+# Spreadsheet/Worksheet handles are reused for this long, over one pooled
+# keep-alive session, so a refresh costs a single values request
+HANDLE_TTL = float(os.environ.get('SHEETS_HANDLE_TTL', 300))
+HTTP_POOL_SIZE = int(os.environ.get('SHEETS_HTTP_POOL_SIZE', 10))
+
+# Every Sheets request draws on a per-minute budget; failures back off
+# exponentially and open a circuit breaker, during which the last good
+# snapshot keeps being served (flagged stale) instead of mock data
+SHEETS_SCHEDULER = FetchScheduler(
+    requests_per_minute=float(os.environ.get('SHEETS_REQUESTS_PER_MINUTE', 30)),
+    backoff_base=float(os.environ.get('SHEETS_BACKOFF_BASE', 2)),
+    backoff_max=float(os.environ.get('SHEETS_BACKOFF_MAX', 300)),
+    failure_threshold=int(os.environ.get('SHEETS_BREAKER_THRESHOLD', 3))
+)
+
+# Initialize Google Sheets Manager. Credentials are resolved and the
+# client authorized on the first fetch (or by the prewarm thread), so
+# importing the app does not wait on google-auth and gspread
+gs_manager = GoogleSheetsManager(
+    get_credentials,
+    full_resync_every=FULL_RESYNC_EVERY,
+    handle_ttl=HANDLE_TTL,
+    pool_size=HTTP_POOL_SIZE,
+    scheduler=SHEETS_SCHEDULER,
+    lazy=True
+)
+
+# Prewarm at startup in a background thread: restore the persisted
+# snapshot and set up the Sheets client in parallel, then load the orders,
+# so the first request finds them cached. Off by default so importing the
+# app (tests, benchmarks, one-off scripts) never starts fetching
+SHEETS_PREWARM = os.environ.get('SHEETS_PREWARM', 'false').lower() == 'true'
 
 # Your Google Sheet ID
 SHEET_ID = "1dYeok-Dy_7a03AhPDLV2NNmGbRNoCD3q0zaAHPwxxCE"
@@ -128,55 +323,380 @@ def get_mock_orders():
     ]
 
 def load_orders_from_sheets(force_refresh=False):
-    """Load orders from Google Sheets with smart caching"""
+    """Load the OrderSnapshot built from Google Sheets with smart caching"""
     cache_key = "all_orders"
+    started = time.perf_counter()
     
     # Check cache first (unless force refresh)
+    if not force_refresh:
+        snapshot = peek_orders_snapshot()
+        if snapshot:
+            ORDERS_LOAD_SECONDS.observe(time.perf_counter() - started, result='cached')
+            return snapshot
+    
+    # Coalesce concurrent misses: one caller fetches, the rest wait for it.
+    # A manual refresh reads the whole worksheet, so edits an incremental
+    # sync does not look at (quantity, comments) show up right away
+    with ORDERS_LOAD_SECONDS.time(result='fetched'):
+        return SHEETS_LOADS.do(cache_key, lambda: _fetch_orders(cache_key, force_refresh, full_sync=force_refresh))
+
+def peek_orders_snapshot():
+    """
+    Return the cached snapshot without ever blocking on Google Sheets
+    
+    Returns None when there is nothing usable yet (first load, or expired
+    with background refresh disabled) and the caller has to load it.
+    """
+    cache_key = "all_orders"
+    
+    if BACKGROUND_REFRESH:
+        ORDERS_REFRESHER.start()
+    STATS_SAMPLER.start()
+    
+    _check_snapshot_store(cache_key)
+    if not _restore_state['checked'] and cache_key not in CACHE:
+        SHEETS_LOADS.do('restore', lambda: _restore_persisted_snapshot(cache_key))
+    
+    return cached_orders_snapshot()
+
+def cached_orders_snapshot():
+    """
+    The part of peek_orders_snapshot that only reads the in-memory cache
+    
+    Never touches the disk, the shared store or Google Sheets and never
+    waits on another load, so it is safe on an event loop (asgi.py); run
+    peek_orders_snapshot in a thread when snapshot_checks_due() says so.
+    """
+    cache_key = "all_orders"
+    cached_data = get_from_cache(cache_key, allow_cache=True)
+    if cached_data:
+        return cached_data
+    
+    # Stale-while-revalidate: serve the previous snapshot and let the
+    # background thread rebuild it; only the very first load blocks
+    if BACKGROUND_REFRESH:
+        stale_data = get_from_cache(cache_key, allow_stale=True)
+        if stale_data:
+            ORDERS_REFRESHER.trigger()
+            return stale_data
+    return None
+
+def snapshot_checks_due():
+    """
+    True if peek_orders_snapshot has more to do than cached_orders_snapshot:
+    poll the shared store or restore the persisted snapshot (disk reads,
+    decoding, possibly waiting on an in-flight load). The first call is
+    always due, so peek_orders_snapshot also gets to start the refresh threads
+    """
+    if not _restore_state['checked'] and "all_orders" not in CACHE:
+        return True
+    return time.monotonic() - _store_state['checked_at'] >= STORE_POLL_INTERVAL
+
+def refresh_orders(max_age=None):
+    """
+    Rebuild the all_orders snapshot from Google Sheets (background thread)
+    
+    Args:
+        max_age: Adopt a snapshot another worker stored this recently
+            instead of fetching (default: half the refresh interval)
+    """
+    cache_key = "all_orders"
+    if max_age is None:
+        max_age = REFRESH_INTERVAL / 2
+    return SHEETS_LOADS.do(cache_key, lambda: _fetch_orders(cache_key, force_refresh=True, max_age=max_age))
+
+ORDERS_REFRESHER = BackgroundRefresher(
+    refresh_orders,
+    interval=REFRESH_INTERVAL,
+    jitter=REFRESH_JITTER,
+    name='orders-refresh',
+    retry_delay=SHEETS_SCHEDULER.retry_delay
+)
+
+def sample_stats():
+    """Record the served snapshot's status counts in STATS_HISTORY (Sheets data only)"""
+    snapshot = CACHE.peek('all_orders')
+    if snapshot is not None and snapshot.source == 'sheets':
+        STATS_HISTORY.record(snapshot.stats)
+
+# Sampling twice per interval means no interval is skipped as the timer drifts
+STATS_SAMPLER = BackgroundRefresher(sample_stats, interval=STATS_HISTORY_INTERVAL / 2, name='stats-history')
+
+def _fetch_orders(cache_key, force_refresh=False, max_age=None, full_sync=False):
+    """
+    Fetch and parse orders from Google Sheets, caching the result
+    
+    Holds the snapshot store's leader lock, so across worker processes only
+    one fetch runs at a time; a worker that waited for it adopts the stored
+    snapshot if it is younger than max_age (default: CACHE_DURATION, or
+    only snapshots stored after this call started when force_refresh).
+    full_sync reads the whole worksheet instead of syncing incrementally.
+    """
+    # Another caller may have filled the cache while we were waiting to lead
     if not force_refresh:
         cached_data = get_from_cache(cache_key, allow_cache=True)
         if cached_data:
             return cached_data
     
+    started = time.time()
+    if max_age is None:
+        max_age = 0 if force_refresh else CACHE_DURATION
+    
+    with SNAPSHOT_STORE.lock():
+        stored = _adopt_stored_snapshot(cache_key, newer_than=started - max_age)
+        if stored is not None:
+            return stored
+        return _fetch_orders_from_sheets(cache_key, force_refresh, full_sync)
+
+def _fetch_orders_from_sheets(cache_key, force_refresh=False, full_sync=False):
     try:
-        if not gs_manager:
-            logger.warning("No Google Sheets manager available, using mock data")
-            mock_data = get_mock_orders()
-            set_cache(cache_key, mock_data)
-            return mock_data
+        if not gs_manager or not gs_manager.gc:
+            logger.warning("No Google Sheets client available, using mock data")
+            ORDERS_REFRESHES.inc(outcome='mock')
+            return _cache_mock_snapshot(cache_key)
             
         # Get all orders from Google Sheets
-        all_orders = []
-        data = gs_manager.get_data(SHEET_ID, "Orders")
+        all_orders = _read_orders_from_sheets(full_sync)
         
-        # FIX: Handle both list and dataframe returns
-        if data and len(data) > 0:
-            # If it's a list (not empty), parse it
-            if isinstance(data, list):
-                all_orders = gs_manager.parse_orders_data(data)
-                logger.info(f"Loaded {len(all_orders)} orders from Google Sheets (direct)")
+        if all_orders:
+            previous = get_from_cache(cache_key, allow_stale=True)
+            sync = gs_manager.last_sync if INCREMENTAL_SYNC or len(ORDER_WORKSHEETS) > 1 else None
+            if sync and not sync['changed'] and previous is not None and previous.source == 'sheets':
+                # Nothing changed since the last sync: keep the existing snapshot
+                snapshot = previous
+                set_cache(cache_key, snapshot)
+                ORDERS_REFRESHES.inc(outcome='unchanged')
             else:
-                # If it has .empty attribute (pandas DataFrame)
-                if hasattr(data, 'empty') and not data.empty:
-                    all_orders = gs_manager.parse_orders_data(data)
-                    logger.info(f"Loaded {len(all_orders)} orders from Google Sheets (dataframe)")
+                snapshot = _install_snapshot(cache_key, OrderSnapshot(all_orders, source='sheets'))
+                ORDERS_REFRESHES.inc(outcome='rebuilt')
             
-            if all_orders:
-                set_cache(cache_key, all_orders)
-                if force_refresh:
-                    logger.info("🔄 FORCE REFRESH: Fresh data loaded from Google Sheets")
-                return all_orders
+            # Share with the other workers (just mark it fresh if unchanged)
+            if snapshot is previous and _store_state['token'] is not None:
+                SNAPSHOT_STORE.touch()
+            else:
+                _store_state['token'] = SNAPSHOT_STORE.write(snapshot)
+            
+            if SNAPSHOT_FILE is not None:
+                if snapshot is previous:
+                    SNAPSHOT_FILE.touch()
+                else:
+                    SNAPSHOT_FILE.save(snapshot)
+            
+            _fetch_state['error'] = None
+            if force_refresh:
+                logger.info("🔄 FORCE REFRESH: Fresh data loaded from Google Sheets")
+            return snapshot
         
+        _fetch_state['error'] = None
         logger.warning("No data found in Google Sheets, using mock data")
-        mock_data = get_mock_orders()
-        set_cache(cache_key, mock_data)
-        return mock_data
+        ORDERS_REFRESHES.inc(outcome='mock')
+        return _cache_mock_snapshot(cache_key)
         
     except Exception as e:
+        _fetch_state['error'] = str(e)
+        previous = get_from_cache(cache_key, allow_stale=True) or _restore_persisted_snapshot(cache_key)
+        if previous is not None and previous.source == 'sheets':
+            # Circuit breaker: keep the last good data rather than replace it with mock orders
+            if isinstance(e, FetchRefused):
+                logger.info(f"Serving last good snapshot ({previous.age():.0f}s old): {e}")
+            else:
+                logger.warning(f"⚠️ Error loading orders from sheets, serving last good snapshot: {e}")
+            ORDERS_REFRESHES.inc(outcome='stale')
+            return previous
+        
         logger.error(f"Error loading orders from sheets: {e}")
         logger.info("Falling back to mock data")
-        mock_data = get_mock_orders()
-        set_cache(cache_key, mock_data)
-        return mock_data
+        ORDERS_REFRESHES.inc(outcome='error')
+        return _cache_mock_snapshot(cache_key)
+
+def _install_snapshot(cache_key, snapshot):
+    """Cache a new snapshot, prepare its bodies and notify stream subscribers"""
+    previous = get_from_cache(cache_key, allow_stale=True)
+    if previous is not None and previous.version == snapshot.version:
+        # Same content: keep the old snapshot so its ETag/Last-Modified hold
+        snapshot = previous
+    else:
+        _prepare_hot_bodies(snapshot)
+    
+    set_cache(cache_key, snapshot)
+    _restore_state['snapshot'] = None
+    if snapshot is not previous:
+        change = ORDER_EVENTS.publish(previous, snapshot)
+        _record_changes(previous, snapshot, change)
+        sample_stats()
+    return snapshot
+
+def _record_changes(previous, snapshot, change):
+    """Log the order events of a snapshot change, or reset the log if there is nothing to diff against"""
+    if previous is None or previous.source != snapshot.source:
+        CHANGE_LOG.reset()
+    elif change is not None:
+        CHANGE_LOG.record(change_events(previous, change.changed, change.removed))
+
+def _restore_persisted_snapshot(cache_key):
+    """
+    Install the snapshot persisted before this process started (once per process)
+    
+    It keeps the time it was last confirmed against Sheets, so it only
+    counts as fresh for what is left of CACHE_DURATION, and it is flagged
+    stale until a fetch confirms or replaces it; the background refresh
+    is asked to do that right away. Its hot bodies are prepared in a
+    background thread, as _install_snapshot does for fetched snapshots.
+    """
+    if _restore_state['checked']:
+        return None
+    _restore_state['checked'] = True
+    if SNAPSHOT_FILE is None or cache_key in CACHE:
+        return None
+    
+    stored = SNAPSHOT_FILE.load()
+    if stored is None:
+        return None
+    
+    snapshot = OrderSnapshot(stored.orders, stored.source, stored.created_at, version=stored.token)
+    CACHE.set(cache_key, snapshot, pin=True, stored_at=min(stored.written_at, time.time()))
+    _restore_state['snapshot'] = snapshot
+    # Serialize the hot bodies right away, but off this (possibly request) thread
+    threading.Thread(target=_prepare_hot_bodies, args=(snapshot,), name='restore-bodies', daemon=True).start()
+    logger.info(
+        f"💾 Restored {len(snapshot)} orders confirmed {time.time() - stored.written_at:.0f}s ago "
+        f"from {SNAPSHOT_FILE.path} in {SNAPSHOT_FILE.stats()['last_load_seconds'] * 1000:.1f} ms"
+    )
+    if BACKGROUND_REFRESH:
+        ORDERS_REFRESHER.trigger()
+    return snapshot
+
+def _adopt_stored_snapshot(cache_key, newer_than):
+    """Install the snapshot from the shared store if it was confirmed after newer_than"""
+    current = get_from_cache(cache_key, allow_stale=True)
+    token = SNAPSHOT_STORE.token()
+    if token is None:
+        return None
+    if current is not None and token == _store_state['token']:
+        # The stored snapshot is the one we already hold; skip decoding it
+        written_at = SNAPSHOT_STORE.written_at()
+        if written_at < newer_than:
+            return None
+        set_cache(cache_key, current)
+        _note_confirmed(written_at)
+        return current
+    
+    stored = SNAPSHOT_STORE.read()
+    if stored is None or stored.written_at < newer_than:
+        return None
+    
+    _store_state['token'] = stored.token
+    _note_confirmed(stored.written_at)
+    logger.info(f"Loaded shared snapshot ({len(stored.orders)} orders) written by another worker")
+    return _install_snapshot(cache_key, OrderSnapshot(stored.orders, stored.source, stored.created_at))
+
+def _note_confirmed(written_at):
+    """
+    Clear this process's fetch error when it adopts a snapshot another
+    worker confirmed against Sheets within CACHE_DURATION; a worker that
+    only follows the leader would otherwise report stale data forever
+    """
+    if time.time() - written_at < CACHE_DURATION:
+        _fetch_state['error'] = None
+
+def _check_snapshot_store(cache_key):
+    """Notice snapshots written or invalidated by other workers (throttled)"""
+    now = time.monotonic()
+    if now - _store_state['checked_at'] < STORE_POLL_INTERVAL:
+        return
+    _store_state['checked_at'] = now
+    
+    token = SNAPSHOT_STORE.token()
+    if token == _store_state['token']:
+        return
+    
+    if token is None:
+        # Another worker ran /api/clear-cache
+        logger.info("🗑️ Shared snapshot invalidated, clearing local cache")
+        CACHE.clear()
+        if gs_manager is not None:
+            gs_manager.reset_sync()
+        _store_state['token'] = None
+    elif BACKGROUND_REFRESH and cache_key in CACHE:
+        # Load the newer snapshot off the request path
+        ORDERS_REFRESHER.trigger()
+    else:
+        SHEETS_LOADS.do(cache_key, lambda: _adopt_stored_snapshot(cache_key, newer_than=0))
+
+def _read_orders_from_sheets(full_sync=False):
+    """Fetch and parse the Orders worksheet(s), incrementally when enabled (unless full_sync)"""
+    if len(ORDER_WORKSHEETS) > 1:
+        all_orders = gs_manager.sync_tabs(SHEET_ID, ORDER_WORKSHEETS)
+        logger.info(f"Loaded {len(all_orders)} orders from {len(ORDER_WORKSHEETS)} worksheets (batch read)")
+        return all_orders
+    
+    worksheet_name = ORDER_WORKSHEETS[0]
+    if INCREMENTAL_SYNC:
+        all_orders = gs_manager.sync_orders(SHEET_ID, worksheet_name, full=full_sync)
+        logger.info(f"Loaded {len(all_orders)} orders from Google Sheets ({gs_manager.last_sync['mode']} sync)")
+        return all_orders
+    
+    all_orders = []
+    data = gs_manager.get_data(SHEET_ID, worksheet_name, raise_errors=True)
+    
+    # FIX: Handle both list and dataframe returns
+    if data and len(data) > 0:
+        # If it's a list (not empty), parse it
+        if isinstance(data, list):
+            all_orders = gs_manager.parse_orders_data(data)
+            logger.info(f"Loaded {len(all_orders)} orders from Google Sheets (direct)")
+        else:
+            # If it has .empty attribute (pandas DataFrame)
+            if hasattr(data, 'empty') and not data.empty:
+                all_orders = gs_manager.parse_orders_data(data)
+                logger.info(f"Loaded {len(all_orders)} orders from Google Sheets (dataframe)")
+    
+    return all_orders
+
+def _cache_mock_snapshot(cache_key):
+    snapshot = OrderSnapshot(get_mock_orders(), source='mock')
+    set_cache(cache_key, snapshot)
+    _restore_state['snapshot'] = None
+    return snapshot
+
+def _not_modified(snapshot):
+    """Return a 304 response if the client already holds this snapshot version"""
+    if not is_not_modified(snapshot, request.if_none_match, request.if_modified_since):
+        return None
+    return _with_validators(app.response_class(status=304), snapshot)
+
+def is_not_modified(snapshot, if_none_match, if_modified_since):
+    """Evaluate parsed If-None-Match / If-Modified-Since headers against a snapshot"""
+    if if_none_match:
+        return if_none_match.contains_weak(snapshot.version)
+    if if_modified_since:
+        return int(snapshot.created_at) <= if_modified_since.timestamp()
+    return False
+
+def _with_validators(response, snapshot):
+    """Tag a response with the snapshot's ETag and Last-Modified headers (and staleness)"""
+    # Weak ETag: bodies carry a per-request 'last_updated' timestamp
+    response.set_etag(snapshot.version, weak=True)
+    response.last_modified = datetime.fromtimestamp(int(snapshot.created_at), tz=timezone.utc)
+    response.cache_control.no_cache = True
+    for name, value in staleness_headers(snapshot):
+        response.headers[name] = value
+    return response
+
+def is_stale(snapshot):
+    """
+    True if snapshot is the last good Sheets data, served because refreshing
+    it failed or because it was restored from disk and not yet refreshed
+    """
+    if snapshot is _restore_state['snapshot']:
+        return True
+    return _fetch_state['error'] is not None and snapshot.source == 'sheets'
+
+def staleness_headers(snapshot):
+    """X-Data-Stale / X-Data-Age headers for a snapshot served while Sheets is failing (or catching up)"""
+    if not is_stale(snapshot):
+        return []
+    return [('X-Data-Stale', 'true'), ('X-Data-Age', str(int(snapshot.age())))]
 
 def map_status(sheet_status):
     """Map Google Sheets status to React app status"""
@@ -212,15 +732,53 @@ def serve_static_files(path):
         except FileNotFoundError:
             return "Frontend not built. Please run 'npm run build' in frontend directory.", 404
 
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        observe_request(request.url_rule.rule if request.url_rule else 'unmatched',
+                        request.method, response.status_code, time.perf_counter() - started,
+                        response.content_length)
+    return response
+
+def observe_request(endpoint, method, status, seconds, size=None):
+    """Record one API request in the HTTP metrics (also called by asgi.py)"""
+    HTTP_REQUEST_SECONDS.observe(seconds, endpoint=endpoint, method=method, status=status)
+    if size is not None:
+        HTTP_RESPONSE_BYTES.observe(size, endpoint=endpoint)
+
 # API ROUTES
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Counters and latency histograms in the Prometheus text format"""
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy', 
         'timestamp': datetime.now().isoformat(),
-        'google_sheets_connected': gs_manager is not None,
-        'cache_size': len(CACHE)
+        'google_sheets_connected': gs_manager is not None and gs_manager.client_state != 'failed',
+        'sheets_client': gs_manager.client_state if gs_manager else None,
+        'cache_size': len(CACHE),
+        'cache': CACHE.stats(),
+        'sheets_loads': SHEETS_LOADS.stats(),
+        'background_refresh': ORDERS_REFRESHER.stats() if BACKGROUND_REFRESH else None,
+        'stream': ORDER_EVENTS.stats(),
+        'wsgi_streams': dict(_wsgi_streams, max=WSGI_MAX_STREAMS),
+        'stats_history': STATS_HISTORY.stats(),
+        'changes': CHANGE_LOG.stats(),
+        'snapshot_store': SNAPSHOT_STORE.stats(),
+        'sheets_scheduler': SHEETS_SCHEDULER.stats(),
+        'snapshot_file': SNAPSHOT_FILE.stats() if SNAPSHOT_FILE else None,
+        'restored_snapshot': _restore_state['snapshot'] is not None,
+        'data_stale': _fetch_state['error'] is not None or _restore_state['snapshot'] is not None,
+        'last_fetch_error': _fetch_state['error']
     })
 
 @app.route('/api/abacus-status', methods=['GET'])
@@ -238,90 +796,81 @@ def abacus_status():
 @app.route('/api/exhibitors', methods=['GET'])
 def get_exhibitors():
     """Get list of all exhibitors with smart caching"""
-    cache_key = "exhibitors"
     force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
     
-    # Try cache first (unless force refresh)
-    if not force_refresh:
-        cached_data = get_from_cache(cache_key, allow_cache=True)
-        if cached_data:
-            return jsonify(cached_data)
-    
     try:
-        exhibitors = []
-        
-        # Get exhibitors from orders data
-        orders = load_orders_from_sheets(force_refresh=force_refresh)
-        exhibitors_dict = {}
-        
-        for order in orders:
-            exhibitor_name = order['exhibitor_name']
-            booth_number = order['booth_number']
-            
-            if exhibitor_name not in exhibitors_dict:
-                exhibitors_dict[exhibitor_name] = {
-                    'name': exhibitor_name,
-                    'booth': booth_number,
-                    'total_orders': 0,
-                    'delivered_orders': 0
-                }
-            
-            exhibitors_dict[exhibitor_name]['total_orders'] += 1
-            if order['status'] == 'delivered':
-                exhibitors_dict[exhibitor_name]['delivered_orders'] += 1
-        
-        exhibitors = list(exhibitors_dict.values())
-        set_cache(cache_key, exhibitors)
-        return jsonify(exhibitors)
+        # Exhibitor summaries are precomputed when the snapshot is built
+        snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+        not_modified = _not_modified(snapshot)
+        if not_modified:
+            return not_modified
+        return _body_response(snapshot, snapshot.prepared_body('exhibitors', lambda: snapshot.exhibitors))
         
     except Exception as e:
         logger.error(f"Error getting exhibitors: {e}")
         return jsonify([]), 500
 
+@app.route('/api/exhibitors/search', methods=['GET'])
+def search_exhibitors():
+    """Top exhibitor matches for ?q= (name or booth prefix, or a fuzzy name match)"""
+    force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
+    try:
+        query, limit = search_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+    not_modified = _not_modified(snapshot)
+    if not_modified:
+        return not_modified
+    return _body_response(snapshot, PreparedBody(search_payload(snapshot, query, limit)))
+
 @app.route('/api/orders', methods=['GET'])
 def get_all_orders():
-    """Get all orders with smart caching"""
+    """
+    Get all orders with smart caching
+    
+    Optional query parameters (see order_query.OrderQuery):
+        fields: Comma-separated fields to return for each order
+        sort: Field to sort on, '-field' for descending
+        status, section: Comma-separated values to filter on
+        limit, cursor: Page size and the next_cursor of the previous page;
+            the response becomes {'orders', 'total_orders', 'next_cursor', 'last_updated'}
+    """
     force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
-    orders = load_orders_from_sheets(force_refresh=force_refresh)
-    return jsonify(orders)
+    try:
+        query = OrderQuery.from_args(request.args, ORDERS_PAGE_SIZE, ORDERS_MAX_PAGE_SIZE)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+    not_modified = _not_modified(snapshot)
+    if not_modified:
+        return not_modified
+    if query is None:
+        return _body_response(snapshot, snapshot.prepared_body('orders', lambda: snapshot.orders))
+    
+    try:
+        body = orders_query_body(snapshot, query)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    return _body_response(snapshot, body)
 
 @app.route('/api/orders/exhibitor/<exhibitor_name>', methods=['GET'])
 def get_orders_by_exhibitor(exhibitor_name):
     """Get orders for a specific exhibitor with smart caching"""
-    cache_key = f"exhibitor_{exhibitor_name}"
     force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
     
-    # Try cache first (unless force refresh)
-    if not force_refresh:
-        cached_data = get_from_cache(cache_key, allow_cache=True)
-        if cached_data:
-            return jsonify(cached_data)
-    
     try:
-        # Get all orders and filter
-        all_orders = load_orders_from_sheets(force_refresh=force_refresh)
-        exhibitor_orders = [
-            order for order in all_orders 
-            if order['exhibitor_name'].lower() == exhibitor_name.lower()
-        ]
-        
-        delivered_count = len([o for o in exhibitor_orders if o['status'] == 'delivered'])
-        
-        result = {
-            'exhibitor': exhibitor_name,
-            'orders': exhibitor_orders,
-            'total_orders': len(exhibitor_orders),
-            'delivered_orders': delivered_count,
-            'last_updated': datetime.now().isoformat(),
-            'force_refreshed': force_refresh
-        }
-        
-        set_cache(cache_key, result)
+        snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+        not_modified = _not_modified(snapshot)
+        if not_modified:
+            return not_modified
         
         if force_refresh:
             logger.info(f"🔄 MANUAL REFRESH: Fresh data for {exhibitor_name}")
         
-        return jsonify(result)
+        return _body_response(snapshot, exhibitor_body(snapshot, exhibitor_name, force_refresh))
         
     except Exception as e:
         logger.error(f"Error getting orders for exhibitor {exhibitor_name}: {e}")
@@ -338,42 +887,491 @@ def get_orders_by_exhibitor(exhibitor_name):
 def get_orders_by_booth(booth_number):
     """Get orders for a specific booth"""
     force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
-    orders = load_orders_from_sheets(force_refresh=force_refresh)
-    booth_orders = [order for order in orders if order['booth_number'] == booth_number]
+    snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+    not_modified = _not_modified(snapshot)
+    if not_modified:
+        return not_modified
     
-    return jsonify({
-        'booth': booth_number,
-        'orders': booth_orders,
-        'total_orders': len(booth_orders),
-        'last_updated': datetime.now().isoformat()
-    })
+    # Only booths that exist get a body memoized on the snapshot
+    if snapshot.orders_for_booth(booth_number):
+        body = snapshot.prepared_body(f"booth:{booth_number}", lambda: booth_payload(snapshot, booth_number))
+    else:
+        body = PreparedBody(booth_payload(snapshot, booth_number))
+    return _body_response(snapshot, body)
+
+@app.route('/api/orders/bulk', methods=['GET', 'POST'])
+def get_orders_bulk():
+    """
+    Orders and counts for several exhibitors and/or booths in one response
+    
+    GET: ?exhibitor=<name>&exhibitor=...&booth=<booth>&...&fields=id,status
+    POST: {"exhibitors": [...], "booths": [...], "fields": [...]}
+    """
+    force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object with 'exhibitors' and/or 'booths'")
+            fields = data.get('fields')
+            if isinstance(fields, list):
+                fields = ','.join(str(field) for field in fields)
+            exhibitors, booths, fields = bulk_params(data.get('exhibitors'), data.get('booths'), fields)
+        else:
+            exhibitors, booths, fields = bulk_params(
+                request.args.getlist('exhibitor'), request.args.getlist('booth'), request.args.get('fields')
+            )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+    if request.method == 'GET':
+        not_modified = _not_modified(snapshot)
+        if not_modified:
+            return not_modified
+    return _body_response(snapshot, bulk_body(snapshot, exhibitors, booths, fields))
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get overall statistics"""
     force_refresh = request.args.get(FORCE_REFRESH_PARAM, 'false').lower() == 'true'
-    orders = load_orders_from_sheets(force_refresh=force_refresh)
-    
-    stats = {
-        'total_orders': len(orders),
-        'delivered': len([o for o in orders if o['status'] == 'delivered']),
-        'in_process': len([o for o in orders if o['status'] == 'in-process']),
-        'in_route': len([o for o in orders if o['status'] == 'in-route']),
-        'out_for_delivery': len([o for o in orders if o['status'] == 'out-for-delivery']),
-        'cancelled': len([o for o in orders if o['status'] == 'cancelled']),
-        'last_updated': datetime.now().isoformat()
+    snapshot = load_orders_from_sheets(force_refresh=force_refresh)
+    not_modified = _not_modified(snapshot)
+    if not_modified:
+        return not_modified
+    return _body_response(snapshot, snapshot.prepared_body('stats', lambda: stats_payload(snapshot)))
+
+@app.route('/api/stats/history', methods=['GET'])
+def get_stats_history():
+    """Status counts sampled over time, oldest first (?since=<unix time or ISO>&limit=N)"""
+    try:
+        since, limit = history_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(history_payload(since, limit))
+
+def history_params(args):
+    """(since, limit) of an /api/stats/history request; ValueError if invalid"""
+    since = args.get('since')
+    if since:
+        try:
+            since = float(since)
+        except ValueError:
+            try:
+                since = datetime.fromisoformat(since).timestamp()
+            except ValueError:
+                raise ValueError("since must be a Unix time or an ISO timestamp")
+    else:
+        since = None
+    
+    limit = args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 1 <= limit <= STATS_HISTORY.capacity:
+            raise ValueError(f"limit must be between 1 and {STATS_HISTORY.capacity}")
+    return since, limit
+
+def history_payload(since=None, limit=None):
+    """JSON payload of /api/stats/history"""
+    samples = STATS_HISTORY.samples(since, limit)
+    return {
+        'interval': STATS_HISTORY.interval,
+        'samples': samples,
+        'total_samples': len(samples)
+    }
+
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """
+    Order events after ?since=<version> (optionally at most &limit=N)
+    
+    Clients read 'version' first (no since), load the orders, then poll
+    with the version of the last response. Replaying an event that the
+    loaded orders already include is harmless. 'resync': true means the
+    version is no longer covered by the log (or came from another worker
+    process, which keeps its own log): reload the orders and poll from
+    the returned version.
+    """
+    try:
+        since, limit = changes_params(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    snapshot = load_orders_from_sheets()
+    return jsonify(changes_payload(snapshot, since, limit))
+
+def changes_params(args):
+    """(since, limit) of an /api/changes request; ValueError if invalid"""
+    # Unknown or malformed versions are answered with a resync, not an error
+    since = args.get('since')
+    
+    limit = args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if not 1 <= limit <= CHANGES_LOG_SIZE:
+            raise ValueError(f"limit must be between 1 and {CHANGES_LOG_SIZE}")
+    return since, limit
+
+def changes_payload(snapshot, since=None, limit=None):
+    """JSON payload of /api/changes"""
+    if since is None:
+        events, version = [], CHANGE_LOG.version
+    else:
+        events, version = CHANGE_LOG.since(since, limit)
+    return {
+        'version': version,
+        'events': events or [],
+        'resync': events is None,
+        'has_more': version != CHANGE_LOG.version,
+        'last_updated': snapshot.last_updated()
+    }
+
+def exhibitor_payload(snapshot, exhibitor_name, force_refresh=False):
+    """JSON payload of /api/orders/exhibitor/<exhibitor_name>"""
+    # Index lookup on the snapshot instead of scanning every order
+    exhibitor_orders = snapshot.orders_for_exhibitor(exhibitor_name)
+    delivered_count = sum(1 for o in exhibitor_orders if o['status'] == 'delivered')
+    
+    return {
+        'exhibitor': exhibitor_name,
+        'orders': exhibitor_orders,
+        'total_orders': len(exhibitor_orders),
+        'delivered_orders': delivered_count,
+        'last_updated': snapshot.last_updated(),
+        'force_refreshed': force_refresh
+    }
+
+def exhibitor_body(snapshot, exhibitor_name, force_refresh=False, build=True):
+    """
+    Prepared body of /api/orders/exhibitor/<exhibitor_name>, cached per exhibitor
+    
+    The cache key is the normalized name, so case and whitespace variants
+    share one entry (the body echoes the name as sent, so a different
+    variant rebuilds it). Names with no orders are not cached at all.
+    With build=False only a cached body is returned (None on a miss).
+    """
+    cache_key = f"exhibitor_{normalize_exhibitor(exhibitor_name)}"
+    
+    # Try cache first (unless force refresh); entries from an older snapshot are rebuilt
+    if not force_refresh:
+        cached_data = get_from_cache(cache_key, allow_cache=True)
+        if cached_data and cached_data[0] == snapshot.version and cached_data[1] == exhibitor_name:
+            return cached_data[2]
+    if not build:
+        return None
+    
+    body = PreparedBody(exhibitor_payload(snapshot, exhibitor_name, force_refresh))
+    if not force_refresh and snapshot.orders_for_exhibitor(exhibitor_name):
+        set_cache(cache_key, (snapshot.version, exhibitor_name, body))
+    return body
+
+def bulk_params(exhibitors, booths, fields=None):
+    """
+    Validate the keys of an /api/orders/bulk request
+    
+    Args:
+        exhibitors: Exhibitor names (or None)
+        booths: Booth numbers (or None)
+        fields: Comma-separated fields to return for each order (or None)
+    
+    Returns:
+        Tuple of (exhibitors, booths, fields) with blanks and repeats removed
+    
+    Raises:
+        ValueError: If nothing or too much is asked for, or a field is unknown
+    """
+    def keys(values, what):
+        if values is None:
+            return []
+        if not isinstance(values, list):
+            raise ValueError(f"{what} must be a list")
+        unique = {}
+        for value in values:
+            value = str(value).strip()
+            if value:
+                unique.setdefault(value, None)
+        return list(unique)
+    
+    exhibitors = keys(exhibitors, 'exhibitors')
+    booths = keys(booths, 'booths')
+    if not exhibitors and not booths:
+        raise ValueError("Give at least one exhibitor or booth")
+    if len(exhibitors) + len(booths) > BULK_MAX_KEYS:
+        raise ValueError(f"At most {BULK_MAX_KEYS} exhibitors and booths per request")
+    return exhibitors, booths, parse_fields(fields) if fields is not None else None
+
+def bulk_payload(snapshot, exhibitors, booths, fields=None):
+    """JSON payload of /api/orders/bulk, one entry per exhibitor and booth in request order"""
+    def entry(orders):
+        return {
+            'orders': [project(o, fields) for o in orders] if fields else orders,
+            'total_orders': len(orders),
+            'delivered_orders': sum(1 for o in orders if o['status'] == 'delivered')
+        }
+    
+    return {
+        'exhibitors': [
+            dict(entry(snapshot.orders_for_exhibitor(name)), exhibitor=name) for name in exhibitors
+        ],
+        'booths': [
+            dict(entry(snapshot.orders_for_booth(booth)), booth=booth) for booth in booths
+        ],
+        'last_updated': snapshot.last_updated()
+    }
+
+def bulk_body(snapshot, exhibitors, booths, fields=None, build=True):
+    """
+    Prepared body of /api/orders/bulk, cached per request and rebuilt when the snapshot changes
+    
+    With build=False only a cached body is returned (None on a miss).
+    """
+    request_key = json.dumps([exhibitors, booths, fields])
+    cache_key = f"orders_bulk_{hashlib.blake2b(request_key.encode('utf-8'), digest_size=12).hexdigest()}"
+    cached_data = get_from_cache(cache_key)
+    if cached_data and cached_data[0] == snapshot.version:
+        return cached_data[1]
+    if not build:
+        return None
+    
+    body = PreparedBody(bulk_payload(snapshot, exhibitors, booths, fields))
+    set_cache(cache_key, (snapshot.version, body))
+    return body
+
+def search_params(args):
+    """(query, limit) of an /api/exhibitors/search request; ValueError if invalid"""
+    query = args.get('q', '').strip()
+    if not query:
+        raise ValueError("q is required")
+    try:
+        limit = int(args.get('limit', SEARCH_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    return query, limit
+
+def search_payload(snapshot, query, limit):
+    """JSON payload of /api/exhibitors/search"""
+    index = snapshot.search_index()
+    return {
+        'query': query,
+        'results': index.search(query, limit),
+        'total_exhibitors': len(index),
+        'last_updated': snapshot.last_updated()
+    }
+
+def orders_query_body(snapshot, query, build=True):
+    """
+    Prepared body of a filtered, sorted, projected or paginated /api/orders request
+    
+    Bodies are cached per canonical query and rebuilt when the snapshot changes.
+    With build=False only a cached body is returned (None on a miss).
+    """
+    cache_key = f"orders_query_{query.cache_key()}"
+    cached_data = get_from_cache(cache_key)
+    if cached_data and cached_data[0] == snapshot.version:
+        return cached_data[1]
+    if not build:
+        return None
+    
+    body = PreparedBody(query.run(snapshot))
+    set_cache(cache_key, (snapshot.version, body))
+    return body
+
+def booth_payload(snapshot, booth_number):
+    """JSON payload of /api/orders/booth/<booth_number>"""
+    booth_orders = snapshot.orders_for_booth(booth_number)
+    return {
+        'booth': booth_number,
+        'orders': booth_orders,
+        'total_orders': len(booth_orders),
+        'last_updated': snapshot.last_updated()
     }
+
+def stats_payload(snapshot):
+    """JSON payload of /api/stats"""
+    # Status counts are computed once when the snapshot is built
+    stats = dict(snapshot.stats)
+    stats['last_updated'] = snapshot.last_updated()
+    return stats
+
+def _prepare_hot_bodies(snapshot):
+    """Serialize the most requested bodies and build the search index as soon as a snapshot lands"""
+    snapshot.prepared_body('orders', lambda: snapshot.orders)
+    snapshot.prepared_body('exhibitors', lambda: snapshot.exhibitors)
+    snapshot.prepared_body('stats', lambda: stats_payload(snapshot))
+    snapshot.search_index()
+
+def _body_response(snapshot, body):
+    """Serve a PreparedBody in the best encoding the client accepts"""
+    data, encoding = body.negotiate(request.accept_encodings)
+    response = app.response_class(data, mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return _with_validators(response, snapshot)
+
+@app.route('/api/stream', methods=['GET'])
+def stream_orders():
+    """
+    Server-Sent Events stream of order changes
+    
+    Sends a 'snapshot' event with the current orders, then an 'orders'
+    event with only the changed/removed orders each time a new snapshot
+    lands. Filter with ?exhibitor=<name> and/or ?booth=<booth>. Event IDs
+    are snapshot versions, so a reconnecting client that is already up to
+    date (Last-Event-ID) skips the initial snapshot.
+    
+    Each stream here holds a worker thread, so at most WSGI_MAX_STREAMS
+    are open per process; past that the answer is 503 with Retry-After.
+    """
+    with _wsgi_streams_lock:
+        if _wsgi_streams['open'] >= WSGI_MAX_STREAMS:
+            _wsgi_streams['refused'] += 1
+            refused = True
+        else:
+            _wsgi_streams['open'] += 1
+            refused = False
+    if refused:
+        response = jsonify({'error': 'Too many open streams on this worker; poll /api/orders instead'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(STREAM_KEEPALIVE * 4))
+        return response
+    
+    released = []
+    def release():
+        with _wsgi_streams_lock:
+            if not released:
+                released.append(True)
+                _wsgi_streams['open'] -= 1
+    
+    stream_filter = StreamFilter(request.args.get('exhibitor'), request.args.get('booth'))
+    last_version = request.headers.get('Last-Event-ID')
+    
+    def generate():
+        ORDER_EVENTS.subscribe()
+        try:
+            cursor = ORDER_EVENTS.seq
+            snapshot = load_orders_from_sheets()
+            if snapshot.version != last_version:
+                yield stream_filter.snapshot_event(snapshot)
+            
+            while True:
+                changes = ORDER_EVENTS.wait(cursor, STREAM_KEEPALIVE)
+                if changes is None:
+                    # Fell behind the change ring: resend the full filtered view
+                    cursor = ORDER_EVENTS.seq
+                    yield stream_filter.snapshot_event(load_orders_from_sheets())
+                    continue
+                if not changes:
+                    yield SSE_KEEPALIVE
+                    continue
+                
+                for change in changes:
+                    cursor = change.seq
+                    event = stream_filter.change_event(change)
+                    if event:
+                        yield event
+        finally:
+            ORDER_EVENTS.unsubscribe()
     
-    return jsonify(stats)
+    response = Response(generate(), mimetype='text/event-stream', headers=SSE_HEADERS)
+    # Runs when the server closes the stream, even if the generator never started
+    response.call_on_close(release)
+    return response
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'
+}
+SSE_KEEPALIVE = ': keep-alive\n\n'
+
+class StreamFilter:
+    """Exhibitor/booth filter of one /api/stream subscriber"""
+    
+    def __init__(self, exhibitor=None, booth=None):
+        self.exhibitor = exhibitor
+        self.booth = booth
+        self.exhibitor_key = normalize_exhibitor(exhibitor) if exhibitor else None
+        self.booth_key = normalize_booth(booth) if booth else None
+    
+    def matches(self, order):
+        if self.exhibitor_key and normalize_exhibitor(order['exhibitor_name']) != self.exhibitor_key:
+            return False
+        if self.booth_key and normalize_booth(order['booth_number']) != self.booth_key:
+            return False
+        return True
+    
+    def snapshot_event(self, snapshot):
+        """'snapshot' event with every order of snapshot that passes the filter"""
+        if self.exhibitor_key:
+            orders = [o for o in snapshot.orders_for_exhibitor(self.exhibitor) if self.matches(o)]
+        elif self.booth_key:
+            orders = list(snapshot.orders_for_booth(self.booth))
+        else:
+            orders = list(snapshot.orders)
+        return _sse_event('snapshot', {
+            'version': snapshot.version,
+            'orders': orders,
+            'total_orders': len(orders)
+        }, event_id=snapshot.version)
+    
+    def change_event(self, change):
+        """'orders' event for one OrderChange, or None if nothing passes the filter"""
+        changed = [o for o in change.changed if self.matches(o)]
+        removed = [o['id'] for o in change.removed if self.matches(o)]
+        if not changed and not removed:
+            return None
+        return _sse_event('orders', {
+            'version': change.version,
+            'changed': changed,
+            'removed': removed
+        }, event_id=change.version)
+
+def _sse_event(event, data, event_id=None):
+    """Format one Server-Sent Event"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=json_default)}")
+    return '\n'.join(lines) + '\n\n'
 
 @app.route('/api/clear-cache', methods=['POST'])
 def clear_cache():
-    """Clear all cached data - useful for forcing fresh data"""
-    global CACHE
-    CACHE = {}
+    """Clear all cached data in every worker - useful for forcing fresh data"""
+    CACHE.clear()
+    SNAPSHOT_STORE.invalidate()
+    _store_state['token'] = None
+    # The next fetch reads the whole worksheet instead of syncing incrementally
+    if gs_manager is not None:
+        gs_manager.reset_sync()
     logger.info("🗑️ Cache cleared manually")
     return jsonify({'message': 'Cache cleared successfully'})
 
+def prewarm():
+    """Restore the persisted snapshot and connect to Sheets side by side, then load the orders"""
+    started = time.perf_counter()
+    restore = threading.Thread(target=peek_orders_snapshot, name='prewarm-restore', daemon=True)
+    restore.start()
+    try:
+        gs_manager.connect()
+        restore.join()
+        snapshot = load_orders_from_sheets()
+        logger.info(
+            f"🔥 Prewarmed {len(snapshot)} {snapshot.source} orders in {time.perf_counter() - started:.2f}s"
+        )
+    except Exception as e:
+        logger.error(f"Prewarm failed, the first request will load the orders: {e}")
+
+if SHEETS_PREWARM:
+    threading.Thread(target=prewarm, name='prewarm', daemon=True).start()
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 5000))
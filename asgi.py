@@ -0,0 +1,409 @@
+# asgi.py
+# Async serving mode: the snapshot-backed API routes run on the event loop and
+# never wait on Google Sheets in a request; everything else goes to the Flask app.
+#
+# Run with:  uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+import asyncio
+import json
+import logging
+import re
+import time
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date, parse_accept_header, parse_date, parse_etags, quote_etag
+
+import app as api
+from compact_order import json_default
+from order_query import OrderQuery, QueryError
+from prepared_body import PreparedBody
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequest:
+    """The parts of an ASGI HTTP request the API routes read"""
+
+    __slots__ = ('scope', 'receive', 'headers', 'args')
+
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])
+        }
+        # Same semantics as Flask's request.args: blanks kept, repeats via getlist()
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+
+    @property
+    def force_refresh(self) -> bool:
+        return self.args.get(api.FORCE_REFRESH_PARAM, 'false').lower() == 'true'
+
+    @property
+    def accept_encodings(self):
+        return parse_accept_header(self.headers.get('accept-encoding'))
+
+
+class AsyncOrdersApp:
+    """
+    ASGI application serving the order API without a thread per request.
+
+    Requests read the cached snapshot directly (api.cached_orders_snapshot).
+    Disk and shared-store checks, and any cold or forced load from Google
+    Sheets, run in a worker thread with concurrent requests awaiting the
+    same future. Only cache hits on prepared bodies are served on the loop;
+    building and serializing a body runs in a thread too.
+    /api/stream subscribers are coroutines woken through an asyncio.Event,
+    so idle streams cost no threads at all.
+    """
+
+    def __init__(self, flask_app):
+        self.wsgi = WsgiToAsgi(flask_app)
+        self._loop = None
+        self._loads = {}
+        self._change_event = None
+        # (path pattern, Flask rule used as the metrics label, handler)
+        self.routes = [
+            (re.compile(r'^/api/orders$'), '/api/orders', self.orders),
+            (re.compile(r'^/api/exhibitors$'), '/api/exhibitors', self.exhibitors),
+            (re.compile(r'^/api/exhibitors/search$'), '/api/exhibitors/search', self.search_exhibitors),
+            (re.compile(r'^/api/stats$'), '/api/stats', self.stats),
+            (re.compile(r'^/api/orders/exhibitor/(?P<exhibitor_name>[^/]+)$'),
+             '/api/orders/exhibitor/<exhibitor_name>', self.exhibitor_orders),
+            (re.compile(r'^/api/orders/booth/(?P<booth_number>[^/]+)$'),
+             '/api/orders/booth/<booth_number>', self.booth_orders),
+            (re.compile(r'^/api/orders/bulk$'), '/api/orders/bulk', self.bulk_orders),
+            (re.compile(r'^/api/stream$'), '/api/stream', self.stream)
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if self._loop is None:
+            self._bind_loop()
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, rule, handler in self.routes:
+                match = pattern.match(scope['path'])
+                if match:
+                    send = self._metered_send(send, rule, time.perf_counter())
+                    await handler(AsyncRequest(scope, receive), send, **match.groupdict())
+                    return
+
+        await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._bind_loop()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _bind_loop(self):
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._change_event = asyncio.Event()
+        # Snapshots are published from the refresh thread; hop onto the loop
+        api.ORDER_EVENTS.add_listener(lambda: self._loop.call_soon_threadsafe(self._notify_change))
+
+    def _notify_change(self):
+        event, self._change_event = self._change_event, asyncio.Event()
+        event.set()
+
+    async def snapshot(self, force_refresh=False):
+        """
+        Current snapshot, reading only the in-memory cache on the loop
+
+        Shared-store polls and the persisted-snapshot restore
+        (api.peek_orders_snapshot) and Sheets loads run in threads, shared
+        by concurrent callers. While a poll runs, requests keep getting the
+        cached snapshot; they only wait when there is none.
+        """
+        if not force_refresh:
+            snapshot = api.cached_orders_snapshot()
+            if api.snapshot_checks_due():
+                check = self._in_thread('peek', api.peek_orders_snapshot)
+                if not snapshot:
+                    snapshot = await asyncio.shield(check)
+            if snapshot:
+                return snapshot
+
+        return await asyncio.shield(self._in_thread(force_refresh, api.load_orders_from_sheets, force_refresh))
+
+    def _in_thread(self, key, fn, *args):
+        """Future of fn(*args) run in a thread, reused while one for key is in flight"""
+        future = self._loads.get(key)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            self._loads[key] = future
+            future.add_done_callback(lambda done: self._load_done(key, done))
+        return future
+
+    def _load_done(self, key, future):
+        self._loads.pop(key, None)
+        # Requests may not await a background poll, so its failure is logged here
+        if key == 'peek' and not future.cancelled() and future.exception() is not None:
+            logger.error(f"Snapshot load ({key}) failed: {future.exception()}")
+
+    # ROUTES
+
+    async def orders(self, request, send):
+        try:
+            query = OrderQuery.from_args(request.args, api.ORDERS_PAGE_SIZE, api.ORDERS_MAX_PAGE_SIZE)
+        except QueryError as e:
+            await self._send_json(request, send, {'error': str(e)}, status=400)
+            return
+
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+        except Exception as e:
+            logger.error(f"Error loading orders: {e}")
+            await self._send_json(request, send, {'error': str(e)}, status=500)
+            return
+
+        if query is None:
+            body = await self._prepared(snapshot, 'orders', lambda: snapshot.orders)
+        else:
+            try:
+                body = (api.orders_query_body(snapshot, query, build=False)
+                        or await asyncio.to_thread(api.orders_query_body, snapshot, query))
+            except QueryError as e:
+                await self._send_json(request, send, {'error': str(e)}, status=400)
+                return
+        await self._send_body(request, send, snapshot, body)
+
+    async def exhibitors(self, request, send):
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+        except Exception as e:
+            logger.error(f"Error getting exhibitors: {e}")
+            await self._send_json(request, send, [], status=500)
+            return
+        body = await self._prepared(snapshot, 'exhibitors', lambda: snapshot.exhibitors)
+        await self._send_body(request, send, snapshot, body)
+
+    async def search_exhibitors(self, request, send):
+        try:
+            query, limit = api.search_params(request.args)
+        except ValueError as e:
+            await self._send_json(request, send, {'error': str(e)}, status=400)
+            return
+
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+        except Exception as e:
+            logger.error(f"Error searching exhibitors: {e}")
+            await self._send_json(request, send, {'error': str(e)}, status=500)
+            return
+        # The first search of a snapshot builds its index
+        body = await asyncio.to_thread(lambda: PreparedBody(api.search_payload(snapshot, query, limit)))
+        await self._send_body(request, send, snapshot, body)
+
+    async def stats(self, request, send):
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+        except Exception as e:
+            logger.error(f"Error getting stats: {e}")
+            await self._send_json(request, send, {'error': str(e)}, status=500)
+            return
+        body = await self._prepared(snapshot, 'stats', lambda: api.stats_payload(snapshot))
+        await self._send_body(request, send, snapshot, body)
+
+    async def exhibitor_orders(self, request, send, exhibitor_name):
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+            body = (api.exhibitor_body(snapshot, exhibitor_name, request.force_refresh, build=False)
+                    or await asyncio.to_thread(api.exhibitor_body, snapshot, exhibitor_name, request.force_refresh))
+        except Exception as e:
+            logger.error(f"Error getting orders for exhibitor {exhibitor_name}: {e}")
+            await self._send_json(request, send, {
+                'exhibitor': exhibitor_name,
+                'orders': [],
+                'total_orders': 0,
+                'delivered_orders': 0,
+                'error': str(e)
+            }, status=500)
+            return
+        await self._send_body(request, send, snapshot, body)
+
+    async def booth_orders(self, request, send, booth_number):
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+        except Exception as e:
+            logger.error(f"Error getting orders for booth {booth_number}: {e}")
+            await self._send_json(request, send, {'error': str(e)}, status=500)
+            return
+
+        if snapshot.orders_for_booth(booth_number):
+            body = await self._prepared(snapshot, f"booth:{booth_number}",
+                                        lambda: api.booth_payload(snapshot, booth_number))
+        else:
+            body = PreparedBody(api.booth_payload(snapshot, booth_number))
+        await self._send_body(request, send, snapshot, body)
+
+    async def bulk_orders(self, request, send):
+        # POST bodies are read by the Flask route
+        try:
+            exhibitors, booths, fields = api.bulk_params(
+                request.args.getlist('exhibitor'), request.args.getlist('booth'), request.args.get('fields')
+            )
+        except ValueError as e:
+            await self._send_json(request, send, {'error': str(e)}, status=400)
+            return
+
+        try:
+            snapshot = await self.snapshot(request.force_refresh)
+        except Exception as e:
+            logger.error(f"Error getting bulk orders: {e}")
+            await self._send_json(request, send, {'error': str(e)}, status=500)
+            return
+        body = (api.bulk_body(snapshot, exhibitors, booths, fields, build=False)
+                or await asyncio.to_thread(api.bulk_body, snapshot, exhibitors, booths, fields))
+        await self._send_body(request, send, snapshot, body)
+
+    async def stream(self, request, send):
+        """Async twin of the Flask /api/stream endpoint"""
+        stream_filter = api.StreamFilter(request.args.get('exhibitor'), request.args.get('booth'))
+        last_version = request.headers.get('last-event-id')
+        events = api.ORDER_EVENTS
+
+        headers = [(b'content-type', b'text/event-stream; charset=utf-8')]
+        headers += [(name.lower().encode(), value.encode()) for name, value in api.SSE_HEADERS.items()]
+        headers += self._cors_headers(request)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(request.receive))
+        events.subscribe()
+        try:
+            cursor = events.seq
+            snapshot = await self.snapshot()
+            if snapshot.version != last_version:
+                # An unfiltered snapshot event serializes every order
+                await self._send_chunk(send, await asyncio.to_thread(stream_filter.snapshot_event, snapshot))
+
+            while not disconnected.done():
+                # Grab the wake-up event before checking, so no publish is missed
+                change_event = self._change_event
+                changes = events.changes_since(cursor)
+
+                if changes is None:
+                    # Fell behind the change ring: resend the full filtered view
+                    cursor = events.seq
+                    snapshot = await self.snapshot()
+                    await self._send_chunk(send, await asyncio.to_thread(stream_filter.snapshot_event, snapshot))
+                    continue
+
+                if not changes:
+                    woke = await self._wait_for_change(change_event, disconnected)
+                    if not woke and not disconnected.done():
+                        await self._send_chunk(send, api.SSE_KEEPALIVE)
+                    continue
+
+                for change in changes:
+                    cursor = change.seq
+                    event = stream_filter.change_event(change)
+                    if event:
+                        await self._send_chunk(send, event)
+        finally:
+            events.unsubscribe()
+            disconnected.cancel()
+
+    # HELPERS
+
+    @staticmethod
+    async def _prepared(snapshot, key, payload_fn):
+        """snapshot.prepared_body(key, payload_fn), serialized in a thread unless it is already built"""
+        body = snapshot.cached_body(key)
+        if body is None:
+            body = await asyncio.to_thread(snapshot.prepared_body, key, payload_fn)
+        return body
+
+    @staticmethod
+    def _metered_send(send, rule, started):
+        """Wrap send so the request is recorded in the HTTP metrics when its headers go out"""
+        async def metered_send(message):
+            if message['type'] == 'http.response.start':
+                length = dict(message.get('headers', ())).get(b'content-length')
+                api.observe_request(rule, 'GET', message['status'], time.perf_counter() - started,
+                                    int(length) if length is not None else None)
+            await send(message)
+        return metered_send
+
+    async def _wait_for_change(self, change_event, disconnected) -> bool:
+        waiter = asyncio.ensure_future(change_event.wait())
+        try:
+            await asyncio.wait({waiter, disconnected}, timeout=api.STREAM_KEEPALIVE,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        return change_event.is_set()
+
+    @staticmethod
+    async def _wait_for_disconnect(receive):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    @staticmethod
+    async def _send_chunk(send, text):
+        await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+    @staticmethod
+    def _cors_headers(request):
+        # Mirrors CORS(app): any origin may read the API
+        if 'origin' in request.headers:
+            return [(b'access-control-allow-origin', b'*')]
+        return []
+
+    @staticmethod
+    def _validator_headers(snapshot):
+        return [
+            (b'etag', quote_etag(snapshot.version, weak=True).encode()),
+            (b'last-modified', http_date(int(snapshot.created_at)).encode()),
+            (b'cache-control', b'no-cache')
+        ] + [(name.lower().encode(), value.encode()) for name, value in api.staleness_headers(snapshot)]
+
+    async def _send_body(self, request, send, snapshot, body):
+        """Send a PreparedBody, or 304 if the client already holds this snapshot"""
+        headers = self._validator_headers(snapshot) + self._cors_headers(request)
+
+        if_none_match = parse_etags(request.headers.get('if-none-match'))
+        if_modified_since = parse_date(request.headers.get('if-modified-since'))
+        if api.is_not_modified(snapshot, if_none_match, if_modified_since):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        data, encoding = body.negotiate(request.accept_encodings)
+        headers += [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(data)).encode()),
+            (b'vary', b'Accept-Encoding')
+        ]
+        if encoding != 'identity':
+            headers.append((b'content-encoding', encoding.encode()))
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': data})
+
+    async def _send_json(self, request, send, payload, status=200):
+        data = json.dumps(payload, default=json_default).encode('utf-8')
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(data)).encode())
+        ] + self._cors_headers(request)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': data})
+
+
+app = AsyncOrdersApp(api.app)
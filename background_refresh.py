@@ -0,0 +1,138 @@
+# background_refresh.py
+# Periodically rebuilds cached data in a daemon thread so requests never wait on it
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    Run a refresh function on a jittered schedule in a daemon thread.
+
+    Callers keep serving whatever is cached while a refresh runs; trigger()
+    wakes the thread early when a request notices the cache went stale.
+    """
+
+    def __init__(self, refresh_fn: Callable[[], object], interval: float,
+                 jitter: float = 0.0, name: str = 'background-refresh',
+                 retry_delay: Callable[[], Optional[float]] = None):
+        """
+        Args:
+            refresh_fn: Zero-argument callable that rebuilds the cache
+            interval: Base number of seconds between refreshes
+            jitter: Up to this many seconds are randomly added or removed
+                from each wait so workers do not refresh in lockstep
+            name: Thread name used in logs
+            retry_delay: Optional callable returning seconds until a failed
+                refresh may be retried (None when healthy); the thread wakes
+                then instead of waiting out the whole interval
+        """
+        self.refresh_fn = refresh_fn
+        self.interval = max(float(interval), 1.0)
+        self.jitter = max(float(jitter), 0.0)
+        self.name = name
+        self.retry_delay = retry_delay
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._stats = {
+            'refreshes': 0,
+            'failures': 0,
+            'triggers': 0,
+            'last_refresh': None,
+            'last_duration': None,
+            'last_error': None
+        }
+
+    def start(self) -> bool:
+        """
+        Start the refresh thread if it is not already running in this process
+
+        Safe to call on every request: after a gunicorn fork the parent's
+        thread does not exist in the child, so it is started again there.
+
+        Returns:
+            True if a new thread was started
+        """
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return False
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._wake.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+        logger.info(f"Started {self.name} thread (every {self.interval:.0f}s ± {self.jitter:.0f}s)")
+        return True
+
+    def stop(self, timeout: float = None):
+        """Stop the refresh thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def trigger(self):
+        """Ask the thread to refresh now instead of waiting for its schedule"""
+        with self._lock:
+            self._stats['triggers'] += 1
+        self._wake.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _next_delay(self) -> float:
+        delay = self.interval
+        if self.jitter:
+            delay = max(1.0, self.interval + random.uniform(-self.jitter, self.jitter))
+        if self.retry_delay is not None:
+            retry = self.retry_delay()
+            if retry is not None:
+                delay = min(delay, max(1.0, retry))
+        return delay
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self._next_delay())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh_now()
+
+    def refresh_now(self):
+        """Run one refresh in the calling thread, recording the outcome"""
+        started = time.monotonic()
+        try:
+            self.refresh_fn()
+        except Exception as e:
+            logger.error(f"{self.name} failed: {e}")
+            with self._lock:
+                self._stats['failures'] += 1
+                self._stats['last_error'] = str(e)
+            return
+
+        with self._lock:
+            self._stats['refreshes'] += 1
+            self._stats['last_refresh'] = time.time()
+            self._stats['last_duration'] = round(time.monotonic() - started, 4)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['running'] = self.is_running()
+        stats['interval'] = self.interval
+        stats['jitter'] = self.jitter
+        return stats
@@ -0,0 +1,189 @@
+# benchmark_load.py
+# Concurrent-request throughput of the threaded Flask server vs the ASGI app (asgi.py)
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+HOST = '127.0.0.1'
+
+FLASK_SERVER = "import app; app.app.run(host='{host}', port={port}, threaded=True)"
+
+
+def start_server(kind, port):
+    """Launch the API in a subprocess serving the mock/local snapshot"""
+    env = dict(os.environ, SNAPSHOT_STORE='local', PYTHONUNBUFFERED='1')
+    if kind == 'asgi':
+        cmd = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', HOST,
+               '--port', str(port), '--log-level', 'warning', '--no-access-log']
+    else:
+        cmd = [sys.executable, '-c', FLASK_SERVER.format(host=HOST, port=port)]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def request(reader, writer, path):
+    """One GET on an open connection; returns (status code, connection reusable)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAccept-Encoding: gzip\r\n\r\n".encode())
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('server closed the connection')
+    status = int(status_line.split()[1])
+
+    length = 0
+    chunked = False
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+        elif name == 'connection' and 'close' in value.lower():
+            keep_alive = False
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def connect(port):
+    return await asyncio.open_connection(HOST, port)
+
+
+async def wait_until_ready(port, path, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await connect(port)
+            status, _ = await request(reader, writer, path)
+            writer.close()
+            if status == 200:
+                return
+        except (OSError, ConnectionError, ValueError, IndexError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not become ready")
+
+
+async def worker(port, path, stop_at, latencies, errors):
+    reader, writer = await connect(port)
+    try:
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                status, keep_alive = await request(reader, writer, path)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError):
+                errors.append(1)
+                keep_alive = False
+            else:
+                if status != 200:
+                    errors.append(status)
+                latencies.append(time.perf_counter() - started)
+            if not keep_alive:
+                # e.g. the Werkzeug server closes after every response
+                writer.close()
+                reader, writer = await connect(port)
+    finally:
+        writer.close()
+
+
+async def idle_stream(port):
+    """An SSE subscriber that connects and then only listens"""
+    reader, writer = await connect(port)
+    writer.write(f"GET /api/stream HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+    await writer.drain()
+    try:
+        while await reader.read(4096):
+            pass
+    finally:
+        writer.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(port, path, connections, duration, idle_streams):
+    await wait_until_ready(port, path)
+
+    streams = [asyncio.ensure_future(idle_stream(port)) for _ in range(idle_streams)]
+    await asyncio.sleep(0.5 if idle_streams else 0)
+
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(port, path, stop_at, latencies, errors) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+
+    for stream in streams:
+        stream.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API throughput under concurrent clients')
+    parser.add_argument('--server', choices=['flask', 'asgi', 'both'], default='both')
+    parser.add_argument('--path', default='/api/orders')
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--idle-streams', type=int, default=0, help='Open /api/stream subscribers during the run')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    kinds = ['flask', 'asgi'] if args.server == 'both' else [args.server]
+    results = {}
+    for kind in kinds:
+        server = start_server(kind, args.port)
+        try:
+            results[kind] = asyncio.run(
+                run_load(args.port, args.path, args.connections, args.duration, args.idle_streams)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps({
+            'path': args.path,
+            'connections': args.connections,
+            'idle_streams': args.idle_streams,
+            'results': results
+        }))
+    else:
+        print(f"{args.path}, {args.connections} connections, {args.idle_streams} idle streams, {args.duration}s")
+        for kind, result in results.items():
+            print(f"{kind:6} {result['requests_per_second']:>9} req/s   "
+                  f"p50 {result['p50_ms']} ms   p99 {result['p99_ms']} ms   errors {result['errors']}")
+
+
+if __name__ == '__main__':
+    main()
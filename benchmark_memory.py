@@ -0,0 +1,69 @@
+# benchmark_memory.py
+# Measures memory held per order by the snapshot: parsed dicts vs CompactOrder records
+
+import argparse
+import gc
+import json
+import logging
+import tracemalloc
+
+from sheets_integration import GoogleSheetsManager
+from compact_order import compact_order
+from fake_sheets import make_grid
+
+
+def retained_bytes(build):
+    """Bytes still allocated after build() returns and everything but its result is freed"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return result, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot memory per order')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--exhibitors', type=int, default=500)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    manager = GoogleSheetsManager(lazy=True)
+
+    def as_dicts():
+        return manager.parse_orders_data(make_grid(args.rows, args.exhibitors))
+
+    def as_compact():
+        return [compact_order(order) for order in as_dicts()]
+
+    dicts, dict_bytes = retained_bytes(as_dicts)
+    count = len(dicts)
+    del dicts
+    compact, compact_bytes = retained_bytes(as_compact)
+    assert len(compact) == count
+    del compact
+
+    results = {
+        'rows': args.rows,
+        'orders': count,
+        'dict_bytes_per_order': round(dict_bytes / count, 1),
+        'compact_bytes_per_order': round(compact_bytes / count, 1),
+        'saved_bytes_per_order': round((dict_bytes - compact_bytes) / count, 1),
+        'saved_percent': round(100.0 * (dict_bytes - compact_bytes) / dict_bytes, 1)
+    }
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Orders parsed:        {count}")
+        print(f"dict snapshot:        {results['dict_bytes_per_order']} bytes/order")
+        print(f"CompactOrder snapshot: {results['compact_bytes_per_order']} bytes/order")
+        print(f"Saved:                {results['saved_bytes_per_order']} bytes/order ({results['saved_percent']}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# benchmark_parse.py
+# Parity check and timing of the compiled RowParser against the per-row dict parser it replaced
+
+import argparse
+import json
+import logging
+import time
+
+from fake_sheets import make_grid
+from sheets_integration import GoogleSheetsManager
+from test_row_parser import edge_case_grids, legacy_parse_orders
+
+
+def check_parity(manager, rows, exhibitors):
+    """Assert parse_orders_data matches the dict parser on every grid (test_row_parser.py runs the same check)"""
+    grids = edge_case_grids()
+    grids['synthetic'] = make_grid(rows, exhibitors)
+    for name, grid in grids.items():
+        expected = legacy_parse_orders(manager, grid)
+        actual = manager.parse_orders_data(grid)
+        assert actual == expected, f"parser output differs on the {name} grid"
+        assert [list(order) for order in actual] == [list(order) for order in expected], \
+            f"key order differs on the {name} grid"
+    return sorted(grids)
+
+
+def best_time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Row parser parity and throughput')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--exhibitors', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    manager = GoogleSheetsManager(lazy=True)
+
+    checked = check_parity(manager, min(args.rows, 5000), args.exhibitors)
+
+    grid = make_grid(args.rows, args.exhibitors)
+    legacy = best_time(lambda: legacy_parse_orders(manager, grid), args.repeat)
+    compiled = best_time(lambda: manager.parse_orders_data(grid), args.repeat)
+
+    results = {
+        'rows': args.rows,
+        'parity_grids': checked,
+        'legacy_seconds': round(legacy, 4),
+        'compiled_seconds': round(compiled, 4),
+        'legacy_rows_per_second': round(args.rows / legacy),
+        'compiled_rows_per_second': round(args.rows / compiled),
+        'speedup': round(legacy / compiled, 2)
+    }
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Parity OK on: {', '.join(checked)}")
+        print(f"dict parser:     {results['legacy_seconds']}s ({results['legacy_rows_per_second']} rows/s)")
+        print(f"compiled parser: {results['compiled_seconds']}s ({results['compiled_rows_per_second']} rows/s)")
+        print(f"Speedup:         {results['speedup']}x on {args.rows} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# benchmark_startup.py
+# Cold start: import-time breakdown of app.py and time until a fresh server answers /api/health
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HOST = '127.0.0.1'
+
+FLASK_SERVER = "import app; app.app.run(host='{host}', port={port}, threaded=True)"
+
+# Modules that lazy startup keeps out of the import of app.py
+DEFERRED_MODULES = ('gspread', 'google.oauth2', 'google.auth', 'requests')
+
+
+def startup_env(prewarm):
+    """Environment of a fresh process: no shared or persisted snapshot to pick up"""
+    return dict(
+        os.environ, SNAPSHOT_STORE='local', SNAPSHOT_PERSIST_PATH='', PYTHONUNBUFFERED='1',
+        SHEETS_PREWARM='true' if prewarm else 'false'
+    )
+
+
+def import_breakdown(prewarm, top):
+    """
+    Import app.py under -X importtime
+
+    Returns:
+        Dict with the total import time, the slowest modules imported
+        directly by app.py (cumulative) and which deferred modules got loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        env=startup_env(prewarm), capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        head, cumulative_us, name = line.split('|')
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.append((name.strip(), depth, int(head.split(':')[1]), int(cumulative_us)))
+
+    # A module is listed after everything it imports; app.py's own imports
+    # are the entries one level deeper since the previous top-level module
+    app_index = next(i for i, entry in enumerate(modules) if entry[0] == 'app')
+    app_entry = modules[app_index]
+    first = app_index
+    while first > 0 and modules[first - 1][1] > app_entry[1]:
+        first -= 1
+    children = [entry for entry in modules[first:app_index] if entry[1] == app_entry[1] + 1]
+    names = {entry[0] for entry in modules}
+    return {
+        'app_import_ms': round(app_entry[3] / 1000, 1),
+        'slowest_imports_ms': {
+            name: round(cumulative / 1000, 1)
+            for name, _, _, cumulative in sorted(children, key=lambda entry: -entry[3])[:top]
+        },
+        'deferred_modules_loaded': [name for name in DEFERRED_MODULES if name in names]
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, prewarm):
+    if kind == 'asgi':
+        cmd = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', HOST,
+               '--port', str(port), '--log-level', 'warning', '--no-access-log']
+    else:
+        cmd = [sys.executable, '-c', FLASK_SERVER.format(host=HOST, port=port)]
+    return subprocess.Popen(cmd, env=startup_env(prewarm), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def time_to_health(kind, prewarm, timeout=30):
+    """Seconds from spawning a server process until /api/health answers 200"""
+    port = free_port()
+    url = f"http://{HOST}:{port}/api/health"
+    started = time.perf_counter()
+    server = start_server(kind, port, prewarm)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"{kind} server exited with {server.returncode}")
+            time.sleep(0.005)
+        raise RuntimeError(f"{kind} server did not answer /api/health within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start time of the API')
+    parser.add_argument('--server', choices=['flask', 'asgi', 'both'], default='both')
+    parser.add_argument('--runs', type=int, default=5, help='Server starts per kind (median is reported)')
+    parser.add_argument('--top', type=int, default=8, help='Slowest direct imports of app.py to list')
+    parser.add_argument('--prewarm', action='store_true', help='Start with SHEETS_PREWARM=true')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    kinds = ['flask', 'asgi'] if args.server == 'both' else [args.server]
+    results = {'prewarm': args.prewarm, 'imports': import_breakdown(args.prewarm, args.top), 'health': {}}
+    for kind in kinds:
+        samples = [time_to_health(kind, args.prewarm) for _ in range(args.runs)]
+        results['health'][kind] = {
+            'median_ms': round(statistics.median(samples) * 1000, 1),
+            'min_ms': round(min(samples) * 1000, 1),
+            'max_ms': round(max(samples) * 1000, 1)
+        }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    imports = results['imports']
+    print(f"import app: {imports['app_import_ms']} ms"
+          f" (deferred modules loaded: {', '.join(imports['deferred_modules_loaded']) or 'none'})")
+    for name, ms in imports['slowest_imports_ms'].items():
+        print(f"  {name:24} {ms:>8} ms")
+    for kind, timing in results['health'].items():
+        print(f"{kind:6} first /api/health after {timing['median_ms']} ms "
+              f"(min {timing['min_ms']}, max {timing['max_ms']}, {args.runs} starts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+# benchmark_suite.py
+# Offline benchmarks on synthetic Orders sheets: parse, snapshot build and every /api/* endpoint
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+# One in-process app: no refresher thread and no snapshot file shared with other runs
+os.environ.setdefault('SNAPSHOT_STORE', 'local')
+os.environ.setdefault('ORDERS_BACKGROUND_REFRESH', 'false')
+os.environ.setdefault('SNAPSHOT_PERSIST_PATH', '')
+
+import app as api
+from fake_sheets import FakeSheetsManager, make_grid
+from order_snapshot import OrderSnapshot
+from snapshot_file import SnapshotFile
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+RESULTS_DIR = 'benchmark_results'
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def best_of(fn, repeat):
+    """Fastest of repeat runs, in seconds"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        _, seconds = timed(fn)
+        best = seconds if best is None else min(best, seconds)
+    return round(best, 6)
+
+
+def latency_summary(samples):
+    ordered = sorted(samples)
+    return {
+        'requests': len(ordered),
+        'first_ms': round(samples[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3)
+    }
+
+
+def time_endpoint(client, requests, method, path, headers=None, status=200):
+    """Latency of repeated requests; the first one is reported separately as first_ms"""
+    samples = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers)
+        body = response.get_data()
+        samples.append(time.perf_counter() - started)
+        if response.status_code != status:
+            raise RuntimeError(f"{method} {path} returned {response.status_code}, expected {status}")
+        size = len(body)
+    summary = latency_summary(samples)
+    summary['bytes'] = size
+    return summary
+
+
+def time_stream_open(client, requests):
+    """Time to the first /api/stream event (the snapshot the client starts from)"""
+    samples = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get('/api/stream', buffered=False)
+        first_event = next(iter(response.response))
+        samples.append(time.perf_counter() - started)
+        response.close()
+        size = len(first_event)
+    summary = latency_summary(samples)
+    summary['bytes'] = size
+    return summary
+
+
+def install_sheet(grid):
+    """Point the app at a fake Orders sheet and drop everything cached"""
+    api.gs_manager = FakeSheetsManager(
+        {'Orders': grid},
+        full_resync_every=api.FULL_RESYNC_EVERY,
+        handle_ttl=api.HANDLE_TTL
+    )
+    api.CACHE.clear()
+    api.SNAPSHOT_STORE.invalidate()
+
+
+def bench_size(rows, args):
+    result = {'rows': rows, 'exhibitors': args.exhibitors, 'booths': args.booths or args.exhibitors}
+
+    grid, seconds = timed(lambda: make_grid(rows, args.exhibitors, seed=args.seed, booths=args.booths))
+    result['generate_seconds'] = round(seconds, 3)
+
+    manager = FakeSheetsManager({'Orders': grid})
+    orders = manager.parse_orders_data(grid)
+    result['orders'] = len(orders)
+    result['parse_seconds'] = best_of(lambda: manager.parse_orders_data(grid), args.repeat)
+    result['snapshot_build_seconds'] = best_of(lambda: OrderSnapshot(orders), args.repeat)
+    result.update(bench_snapshot_file(OrderSnapshot(orders), args))
+    del orders
+
+    client = api.app.test_client()
+    install_sheet(grid)
+
+    # Cold: full sheet read, parse, snapshot build and serialization behind one request
+    response, seconds = timed(lambda: client.get('/api/orders'))
+    if response.status_code != 200:
+        raise RuntimeError(f"cold /api/orders returned {response.status_code}")
+    result['cold_orders_seconds'] = round(seconds, 6)
+    snapshot = api.load_orders_from_sheets()
+    if snapshot.source != 'sheets':
+        raise RuntimeError(f"expected a snapshot from the fake sheet, got source={snapshot.source}")
+
+    # Background refresh with nothing changed (incremental sync of the status/identity columns)
+    result['refresh_unchanged_seconds'] = best_of(lambda: api.refresh_orders(max_age=0), args.repeat)
+
+    exhibitor = snapshot.exhibitors[0]['name']
+    booth = snapshot.orders[0]['booth_number']
+    # A supervisor screen's worth of booths in one request
+    bulk_query = '&'.join(f"booth={quote(b)}" for b in sorted({o['booth_number'] for o in snapshot.orders})[:40])
+    etag = client.get('/api/orders').headers['ETag']
+
+    endpoints = {
+        'health': ('GET', '/api/health', None, 200),
+        'abacus_status': ('GET', '/api/abacus-status', None, 200),
+        'exhibitors': ('GET', '/api/exhibitors', None, 200),
+        'exhibitor_search': ('GET', f"/api/exhibitors/search?q={exhibitor[:8]}", None, 200),
+        'orders': ('GET', '/api/orders', None, 200),
+        'orders_gzip': ('GET', '/api/orders', {'Accept-Encoding': 'gzip'}, 200),
+        'orders_not_modified': ('GET', '/api/orders', {'If-None-Match': etag}, 304),
+        'orders_page': ('GET', '/api/orders?limit=100', None, 200),
+        'orders_page_projected': ('GET', '/api/orders?limit=100&fields=id,booth_number,status', None, 200),
+        'orders_page_sorted': ('GET', '/api/orders?limit=100&sort=-order_date', None, 200),
+        'orders_filtered': ('GET', '/api/orders?status=delivered&fields=id,booth_number', None, 200),
+        'orders_by_exhibitor': ('GET', f"/api/orders/exhibitor/{exhibitor}", None, 200),
+        'orders_by_booth': ('GET', f"/api/orders/booth/{booth}", None, 200),
+        'orders_bulk': ('GET', f"/api/orders/bulk?{bulk_query}", None, 200),
+        'stats': ('GET', '/api/stats', None, 200),
+        'stats_history': ('GET', '/api/stats/history', None, 200),
+        'changes': ('GET', f"/api/changes?since={api.CHANGE_LOG.version}", None, 200),
+        'metrics': ('GET', '/api/metrics', None, 200)
+    }
+    result['endpoints'] = {
+        name: time_endpoint(client, args.requests, method, path, headers, status)
+        for name, (method, path, headers, status) in endpoints.items()
+    }
+    result['endpoints']['stream_open'] = time_stream_open(client, args.stream_requests)
+    result['endpoints']['clear_cache'] = time_endpoint(client, args.requests, 'POST', '/api/clear-cache')
+
+    del snapshot, grid
+    api.CACHE.clear()
+    api.gs_manager = None
+    gc.collect()
+    return result
+
+
+def bench_snapshot_file(snapshot, args):
+    """Persist a snapshot and restore it the way a restarted process does"""
+    directory = tempfile.mkdtemp(prefix='bench-snapshot-')
+    try:
+        persisted = SnapshotFile(os.path.join(directory, 'orders.bin'))
+
+        def restore():
+            stored = persisted.load()
+            return OrderSnapshot(stored.orders, stored.source, stored.created_at, version=stored.token)
+
+        write_seconds = best_of(lambda: persisted.save(snapshot), args.repeat)
+        restored = restore()
+        if restored.version != snapshot.version or list(restored.orders) != list(snapshot.orders):
+            raise RuntimeError("restored snapshot differs from the persisted one")
+        return {
+            'snapshot_file_bytes': persisted.stats()['bytes'],
+            'snapshot_file_write_seconds': write_seconds,
+            'snapshot_file_load_seconds': best_of(persisted.load, args.repeat),
+            'snapshot_restore_seconds': best_of(restore, args.repeat)
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(result, prefix=''):
+    """Numeric leaves of a size result as {'endpoints.orders.median_ms': ...}"""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline_path, report):
+    """Print timing ratios against an earlier results file (>1 means slower now)"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {entry['rows']: flatten(entry) for entry in baseline['results']}
+
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('commit')})")
+    for entry in report['results']:
+        old = previous.get(entry['rows'])
+        if old is None:
+            continue
+        print(f"{entry['rows']} rows:")
+        for name, value in flatten(entry).items():
+            if not (name.endswith('_seconds') or name.endswith('median_ms')):
+                continue
+            if old.get(name):
+                print(f"  {name:45} {old[name]:>12} -> {value:>12}  x{value / old[name]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite on synthetic Orders sheets')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Sheet sizes in rows')
+    parser.add_argument('--exhibitors', type=int, default=500)
+    parser.add_argument('--booths', type=int, default=None, help='Distinct booths (default: one per exhibitor)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per parse/build/refresh timing (best is kept)')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint')
+    parser.add_argument('--stream-requests', type=int, default=5,
+                        help='Stream connections to open (each sends the full snapshot)')
+    parser.add_argument('--output', help=f"Results file (default: {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument('--compare', help='Earlier results file to print ratios against')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args)
+        },
+        'results': []
+    }
+
+    for rows in args.sizes:
+        print(f"Benchmarking {rows} rows...", flush=True)
+        entry = bench_size(rows, args)
+        report['results'].append(entry)
+        print(f"  parse {entry['parse_seconds']}s, snapshot {entry['snapshot_build_seconds']}s, "
+              f"cold /api/orders {entry['cold_orders_seconds']}s, "
+              f"warm /api/orders {entry['endpoints']['orders']['median_ms']} ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+# bounded_cache.py
+# LRU/TTL response cache bounded by entry count and estimated bytes
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Rough retained size of a cached value in bytes
+
+    Objects with an nbytes() method (PreparedBody, OrderSnapshot) report
+    their own size; tuples, lists and dicts are walked two levels deep.
+    """
+    nbytes = getattr(value, 'nbytes', None)
+    if callable(nbytes):
+        return nbytes()
+
+    size = sys.getsizeof(value)
+    if _depth < 2:
+        if isinstance(value, (tuple, list)):
+            size += sum(estimate_size(item, _depth + 1) for item in value)
+        elif isinstance(value, dict):
+            size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    return size
+
+
+class CacheEntry:
+    """A cached value with its store time and estimated size"""
+
+    __slots__ = ('value', 'stored_at', 'size', 'pinned')
+
+    def __init__(self, value: Any, size: int, pinned: bool, stored_at: float = None):
+        self.value = value
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.size = size
+        self.pinned = pinned
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class BoundedCache:
+    """
+    Thread-safe LRU cache with a TTL, an entry limit and a byte budget.
+
+    Unpinned entries are dropped once they are older than ttl, and the
+    least recently used ones are evicted whenever the entry count or the
+    estimated bytes go over their limits. Pinned entries (the order
+    snapshot) never expire or get evicted, so a stale snapshot can still
+    be served while it is rebuilt; they are included in the reported
+    memory but not in the limits.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024, ttl: float = None):
+        """
+        Args:
+            max_entries: Most unpinned entries to hold
+            max_bytes: Estimated byte budget for unpinned entries
+            ttl: Seconds after which an unpinned entry is dropped (None: never)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._pinned_bytes = 0
+        self._pinned = 0
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evicted_lru': 0, 'evicted_expired': 0}
+
+    def get(self, key: Hashable, max_age: float = None) -> Optional[CacheEntry]:
+        """
+        Look up key, marking it most recently used
+
+        Args:
+            key: Cache key
+            max_age: Treat entries older than this many seconds as a miss
+
+        Returns:
+            The CacheEntry, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.pinned and self.ttl is not None and entry.age() >= self.ttl:
+                self._remove(key)
+                self._stats['evicted_expired'] += 1
+                entry = None
+
+            if entry is None or (max_age is not None and entry.age() >= max_age):
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def peek(self, key: Hashable) -> Any:
+        """Value for key without touching recency or the hit statistics"""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, pin: bool = False, stored_at: float = None):
+        """
+        Store value under key, evicting older entries to stay within the limits
+
+        stored_at backdates the entry (e.g. data confirmed before a restart)
+        so it expires when it would have; defaults to now.
+        """
+        entry = CacheEntry(value, estimate_size(value), pin, stored_at)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            if pin:
+                self._pinned += 1
+                self._pinned_bytes += entry.size
+            else:
+                self._bytes += entry.size
+            self._stats['sets'] += 1
+            self._evict()
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._pinned_bytes = 0
+            self._pinned = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        if entry.pinned:
+            self._pinned -= 1
+            self._pinned_bytes -= entry.size
+        else:
+            self._bytes -= entry.size
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones, until within the limits"""
+        now = time.time()
+        count = len(self._entries) - self._pinned
+        nbytes = self._bytes
+        doomed = []
+        for key, entry in self._entries.items():
+            if entry.pinned:
+                continue
+            if self.ttl is not None and now - entry.stored_at >= self.ttl:
+                doomed.append((key, 'evicted_expired'))
+            elif count > self.max_entries or nbytes > self.max_bytes:
+                doomed.append((key, 'evicted_lru'))
+            else:
+                # Everything after this entry was used more recently
+                break
+            count -= 1
+            nbytes -= entry.size
+
+        for key, reason in doomed:
+            self._remove(key)
+            self._stats[reason] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['misses']
+            stats.update({
+                'entries': len(self._entries),
+                'pinned_entries': self._pinned,
+                'max_entries': self.max_entries,
+                'estimated_bytes': self._bytes + self._pinned_bytes,
+                'pinned_bytes': self._pinned_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': round(stats['hits'] / lookups, 4) if lookups else None
+            })
+        return stats
@@ -0,0 +1,157 @@
+# change_log.py
+# Versioned log of order-level change events behind /api/changes?since=<version>
+
+import os
+import secrets
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+ADDED = 'added'
+REMOVED = 'removed'
+STATUS_CHANGED = 'status_changed'
+UPDATED = 'updated'
+
+
+def change_events(old_snapshot, changed: List[Dict], removed: List[Dict]) -> List[Dict]:
+    """
+    Classify the orders that differ between two snapshots
+
+    Args:
+        old_snapshot: Snapshot before the change
+        changed: Orders of the new snapshot that are new or differ (diff_snapshots)
+        removed: Orders of the old snapshot that are gone
+
+    Returns:
+        Event dicts (without versions): 'added' and 'updated' carry the
+        order, 'status_changed' the order plus its 'previous_status', and
+        'removed' only the order ID
+    """
+    old_by_id = old_snapshot.by_id()
+    events = []
+    for order in changed:
+        previous = old_by_id.get(order['id'])
+        if previous is None:
+            events.append({'type': ADDED, 'order_id': order['id'], 'order': order})
+        elif previous['status'] != order['status']:
+            events.append({
+                'type': STATUS_CHANGED, 'order_id': order['id'],
+                'previous_status': previous['status'], 'status': order['status'], 'order': order
+            })
+        else:
+            events.append({'type': UPDATED, 'order_id': order['id'], 'order': order})
+    for order in removed:
+        events.append({'type': REMOVED, 'order_id': order['id']})
+    return events
+
+
+class ChangeLog:
+    """
+    Bounded, versioned log of order change events.
+
+    Every event gets the next version; a client polls with the last
+    version it saw and receives only newer events, so it transfers bytes
+    in proportion to what changed instead of the whole order book.
+    Versions are tokens '<epoch>-<number>': the epoch is random per log and
+    per process (a forked gunicorn worker picks a new one), so a version
+    handed out by another worker or before a restart never matches and the
+    client is told to resync instead of silently skipping or repeating
+    changes. The same happens when the client falls further behind than
+    the log reaches, or when the snapshot was replaced wholesale (first
+    load, mock data, cache cleared) rather than diffed.
+    """
+
+    def __init__(self, max_events: int = 10000):
+        """
+        Args:
+            max_events: Events kept; older ones are dropped and clients
+                still behind them have to resync
+        """
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=max(int(max_events), 1))
+        self._pid = None
+        self._epoch = None
+        self._number = 0
+        # Numbers at or below this cannot be answered from the log
+        self._floor = 0
+        self._stats = {'recorded': 0, 'resets': 0}
+        self._check_process()
+
+    def _check_process(self):
+        """Start a new epoch (and an empty log) in a process forked from the one that made the log"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._epoch = secrets.token_hex(4)
+            self._number = self._floor = 0
+            self._events.clear()
+
+    def _token(self, number: int) -> str:
+        return f"{self._epoch}-{number}"
+
+    @property
+    def version(self) -> str:
+        """Version of the newest event (or reset)"""
+        with self._lock:
+            self._check_process()
+            return self._token(self._number)
+
+    def record(self, events: List[Dict]) -> str:
+        """
+        Append events, numbering them with consecutive versions
+
+        Returns:
+            The log's version after appending
+        """
+        with self._lock:
+            self._check_process()
+            for event in events:
+                self._number += 1
+                event['version'] = self._token(self._number)
+                self._events.append((self._number, event))
+            self._stats['recorded'] += len(events)
+            return self._token(self._number)
+
+    def reset(self) -> str:
+        """Mark every earlier version as needing a resync (snapshot replaced without a diff)"""
+        with self._lock:
+            self._check_process()
+            self._number += 1
+            self._floor = self._number
+            self._events.clear()
+            self._stats['resets'] += 1
+            return self._token(self._number)
+
+    def since(self, version: str, limit: int = None) -> Tuple[Optional[List[Dict]], str]:
+        """
+        Events newer than version
+
+        Args:
+            version: Last version the client has seen
+            limit: Most events to return (oldest first)
+
+        Returns:
+            (events, version to poll with next); events is None if the
+            client must resync (reload the orders and poll from the
+            returned version), including for a version from another
+            epoch (worker process or restart) or one that is malformed
+        """
+        epoch, _, number = str(version).rpartition('-')
+        with self._lock:
+            self._check_process()
+            latest = self._number
+            oldest = self._events[0][0] if self._events else latest + 1
+            floor = max(self._floor, oldest - 1)
+            if epoch != self._epoch or not number.isdigit() or not floor <= int(number) <= latest:
+                return None, self._token(latest)
+            start = int(number) - floor
+            end = len(self._events) if limit is None else min(len(self._events), start + limit)
+            events = [event for _, event in islice(self._events, start, end)]
+            return events, events[-1]['version'] if events else self._token(int(number))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._check_process()
+            stats = dict(self._stats)
+            stats.update({'version': self._token(self._number), 'events': len(self._events)})
+        return stats
@@ -0,0 +1,154 @@
+# compact_order.py
+# Slotted in-memory order record; the API dict is only built when serializing
+
+import sys
+from typing import Any, Dict, Union
+
+DESCRIPTION_PREFIX = "Order from Google Sheets: "
+
+# Fields that are identical for every order parsed from Google Sheets
+CONSTANT_FIELDS = {
+    'abacus_ai_processed': True,
+    'data_source': 'Google Sheets via Abacus AI'
+}
+
+# Key order of the dictionaries built by GoogleSheetsManager.parse_order_row
+ORDER_KEYS = (
+    'id', 'booth_number', 'exhibitor_name', 'item', 'description', 'color',
+    'quantity', 'status', 'order_date', 'comments', 'section', 'type',
+    'user', 'hour', 'abacus_ai_processed', 'data_source'
+)
+
+# Orders read from several worksheets also record their tab
+MULTI_TAB_ORDER_KEYS = ORDER_KEYS + ('source_tab',)
+
+
+class CompactOrder:
+    """
+    Memory-compact order parsed from Google Sheets.
+
+    Holds only the per-row values in slots with repeated strings interned;
+    the derived description and the constant fields are produced by
+    to_dict(). Supports order['key'] and order.get('key') so it can be used
+    wherever an order dictionary is read.
+    """
+
+    __slots__ = (
+        'id', 'booth_number', 'exhibitor_name', 'item', 'color', 'quantity',
+        'status', 'order_date', 'comments', 'section', 'type', 'user', 'hour',
+        'source_tab'
+    )
+
+    def __init__(self, id, booth_number, exhibitor_name, item, color, quantity,
+                 status, order_date, comments, section, type, user, hour, source_tab=None):
+        # Low-cardinality strings repeated across many rows share one object
+        intern = sys.intern
+        self.id = id
+        self.booth_number = intern(booth_number)
+        self.exhibitor_name = intern(exhibitor_name)
+        self.item = intern(item)
+        self.color = intern(color)
+        self.quantity = quantity
+        self.status = intern(status)
+        self.order_date = intern(order_date)
+        self.comments = comments
+        self.section = intern(section)
+        self.type = intern(type)
+        self.user = intern(user)
+        self.hour = intern(hour)
+        self.source_tab = intern(source_tab) if source_tab is not None else None
+
+    @property
+    def description(self) -> str:
+        return DESCRIPTION_PREFIX + self.item
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The order dictionary exactly as parse_orders_data builds it"""
+        order = {
+            'id': self.id,
+            'booth_number': self.booth_number,
+            'exhibitor_name': self.exhibitor_name,
+            'item': self.item,
+            'description': DESCRIPTION_PREFIX + self.item,
+            'color': self.color,
+            'quantity': self.quantity,
+            'status': self.status,
+            'order_date': self.order_date,
+            'comments': self.comments,
+            'section': self.section,
+            'type': self.type,
+            'user': self.user,
+            'hour': self.hour,
+            'abacus_ai_processed': True,
+            'data_source': 'Google Sheets via Abacus AI'
+        }
+        if self.source_tab is not None:
+            order['source_tab'] = self.source_tab
+        return order
+
+    def __getitem__(self, key: str):
+        if key in CONSTANT_FIELDS:
+            return CONSTANT_FIELDS[key]
+        if key == 'source_tab' and self.source_tab is None:
+            raise KeyError(key)
+        if key in self.__slots__ or key == 'description':
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactOrder):
+            return self._values() == other._values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"CompactOrder({self.id!r}, {self.exhibitor_name!r}, {self.status!r})"
+
+
+def compact_order(order: Union[Dict, CompactOrder]) -> Union[Dict, CompactOrder]:
+    """
+    Convert a parsed Sheets order dict to a CompactOrder
+
+    Orders that do not have exactly the Sheets layout (e.g. mock orders)
+    are returned unchanged so nothing is lost.
+    """
+    if not isinstance(order, dict):
+        return order
+    keys = tuple(order)
+    if keys != ORDER_KEYS and keys != MULTI_TAB_ORDER_KEYS:
+        return order
+    if order['description'] != DESCRIPTION_PREFIX + order['item']:
+        return order
+    if any(order[key] != value for key, value in CONSTANT_FIELDS.items()):
+        return order
+
+    return CompactOrder(
+        order['id'], order['booth_number'], order['exhibitor_name'], order['item'],
+        order['color'], order['quantity'], order['status'], order['order_date'],
+        order['comments'], order['section'], order['type'], order['user'], order['hour'],
+        order.get('source_tab')
+    )
+
+
+def order_to_dict(order: Union[Dict, CompactOrder]) -> Dict:
+    """Dictionary form of an order, whichever representation it is held in"""
+    return order.to_dict() if isinstance(order, CompactOrder) else order
+
+
+def json_default(value):
+    """json.dumps default hook that serializes CompactOrder records"""
+    if isinstance(value, CompactOrder):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
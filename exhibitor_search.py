@@ -0,0 +1,150 @@
+# exhibitor_search.py
+# Prefix and trigram search over exhibitor names and booth numbers, built once per snapshot
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Score of each kind of match; higher ranks first
+EXACT_SCORE = 1.0
+BOOTH_EXACT_SCORE = 0.95
+NAME_PREFIX_SCORE = 0.9
+BOOTH_PREFIX_SCORE = 0.85
+WORD_PREFIX_SCORE = 0.8
+# Trigram matches score their Dice similarity scaled below any prefix match
+FUZZY_SCALE = 0.7
+MIN_FUZZY_SIMILARITY = 0.3
+# Trigrams shared by more than this share of exhibitors (and at least
+# COMMON_TRIGRAM_MIN of them) do not nominate fuzzy candidates
+COMMON_TRIGRAM_SHARE = 0.05
+COMMON_TRIGRAM_MIN = 50
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_text(text) -> str:
+    """Lowercase, with runs of punctuation and whitespace collapsed to one space"""
+    return _NON_ALNUM.sub(' ', str(text).lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of normalized text, padded so short words still match"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExhibitorSearchIndex:
+    """
+    Search index over the exhibitors of one OrderSnapshot.
+
+    Full names, the words in each name and every booth number are kept in
+    sorted key lists, so a prefix lookup is a bisect plus a walk over at
+    most limit matches per list. Queries that find fewer than limit prefix
+    matches fall back to trigram similarity, which tolerates typos and
+    partial words; candidates come only from trigrams shared by few
+    exhibitors, so generic fragments like "inc" do not scan every name.
+    The index is immutable and shared by every request on the snapshot.
+    """
+
+    __slots__ = ('entries', '_prefix', '_grams', '_postings', '_common')
+
+    def __init__(self, exhibitors: Iterable[Dict], booths: Dict[str, List[str]]):
+        """
+        Args:
+            exhibitors: Exhibitor summaries (OrderSnapshot.exhibitors)
+            booths: Exhibitor name -> every booth number it ordered for
+        """
+        self.entries = tuple(exhibitors)
+        keyed: Dict[str, List[Tuple[str, str, int]]] = {'name': [], 'booth': [], 'word': []}
+        grams_by_entry = []
+        postings: Dict[str, List[int]] = {}
+
+        for i, exhibitor in enumerate(self.entries):
+            name = normalize_text(exhibitor['name'])
+            keyed['name'].append((name, name, i))
+            for word in set(name.split()[1:]):
+                keyed['word'].append((word, name, i))
+            for booth in booths.get(exhibitor['name'], ()):
+                keyed['booth'].append((normalize_text(booth), name, i))
+
+            grams = frozenset(trigrams(name))
+            grams_by_entry.append(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+
+        # Equal keys (e.g. the word "inc") are ordered by name
+        self._prefix = {}
+        for kind, entries in keyed.items():
+            entries.sort()
+            self._prefix[kind] = ([key for key, _, _ in entries], [i for _, _, i in entries])
+        self._grams = grams_by_entry
+        self._postings = postings
+        self._common = max(COMMON_TRIGRAM_MIN, int(len(self.entries) * COMMON_TRIGRAM_SHARE))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Best matches for a query
+
+        Args:
+            query: Part of an exhibitor name or booth number, in any case
+            limit: Most results to return
+
+        Returns:
+            Up to limit exhibitor summaries with 'score' (0-1) and 'match'
+            ('exact', 'booth', 'prefix' or 'fuzzy'), best first
+        """
+        text = normalize_text(query)
+        if not text:
+            return []
+
+        scores: Dict[int, Tuple[float, str]] = {}
+        self._prefix_matches(text, limit, scores)
+        if len(scores) < limit:
+            self._fuzzy_matches(text, scores)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], self.entries[item[0]]['name']))
+        results = []
+        for i, (score, match) in ranked[:limit]:
+            result = dict(self.entries[i])
+            result['score'] = round(score, 3)
+            result['match'] = match
+            results.append(result)
+        return results
+
+    def _prefix_matches(self, text: str, limit: int, scores: Dict[int, Tuple[float, str]]):
+        for kind, (keys, refs) in self._prefix.items():
+            found = set()
+            position = bisect.bisect_left(keys, text)
+            # Exact keys sort first, so the first limit entries are the best of this kind
+            while position < len(keys) and len(found) < limit and keys[position].startswith(text):
+                i = refs[position]
+                exact = keys[position] == text
+                if kind == 'name':
+                    score, match = (EXACT_SCORE, 'exact') if exact else (NAME_PREFIX_SCORE, 'prefix')
+                elif kind == 'booth':
+                    score, match = (BOOTH_EXACT_SCORE if exact else BOOTH_PREFIX_SCORE), 'booth'
+                else:
+                    score, match = WORD_PREFIX_SCORE, 'prefix'
+                if score > scores.get(i, (0, None))[0]:
+                    scores[i] = (score, match)
+                found.add(i)
+                position += 1
+
+    def _fuzzy_matches(self, text: str, scores: Dict[int, Tuple[float, str]]):
+        grams = trigrams(text)
+        candidates = set()
+        for gram in grams:
+            entries = self._postings.get(gram, ())
+            if len(entries) <= self._common:
+                candidates.update(entries)
+
+        for i in candidates:
+            similarity = 2 * len(grams & self._grams[i]) / (len(grams) + len(self._grams[i]))
+            if similarity < MIN_FUZZY_SIMILARITY:
+                continue
+            score = similarity * FUZZY_SCALE
+            if score > scores.get(i, (0, None))[0]:
+                scores[i] = (score, 'fuzzy')
@@ -0,0 +1,182 @@
+# fake_sheets.py
+# Synthetic Orders grids and an in-memory Google Sheets stand-in for offline benchmarks
+
+import random
+import re
+from typing import Dict, List
+
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+
+from sheets_integration import GoogleSheetsManager
+
+HEADERS = ['Date', 'Hour', 'Booth #', 'Exhibitor Name', 'Section', 'Item', 'Color',
+           'Quantity', 'Status', 'Type', 'User', 'Comments']
+STATUSES = ['Delivered', 'Received', 'Out for delivery', 'In route from warehouse', 'In Process', 'cancelled']
+COLORS = ['White', 'Black', 'Blue', 'Red', 'Green', 'Grey']
+ITEMS = ['Chair', 'Table 6ft', 'Carpet 10x10', 'Spotlight', 'Power Drop 500W', 'Wastebasket', 'Easel', 'Monitor 55"']
+TYPES = ['Furniture', 'Electrical', 'Flooring', 'AV']
+USERS = ['maria', 'john', 'li', 'ahmed']
+
+
+def _cell(value):
+    """A fresh str object per cell, as decoding an API response produces"""
+    return value.encode('utf-8').decode('utf-8')
+
+
+def make_grid(rows, exhibitors=500, seed=1, booths=None):
+    """
+    Synthetic Orders grid with exhibitor-level repetition of booth/section
+
+    Args:
+        rows: Number of order rows below the header
+        exhibitors: Number of distinct exhibitors
+        seed: Random seed, so the same arguments give the same grid
+        booths: Number of distinct booths (defaults to one per exhibitor).
+            More booths than exhibitors spreads each exhibitor over several
+            booths; fewer makes exhibitors share booths.
+
+    Returns:
+        List of rows, header first, as get_all_values returns them
+    """
+    booths = booths or exhibitors
+    booths_per_exhibitor = max(1, booths // exhibitors)
+    rng = random.Random(seed)
+    grid = [list(HEADERS)]
+    for i in range(rows):
+        ex = rng.randrange(exhibitors)
+        booth = ex * booths_per_exhibitor
+        if booths_per_exhibitor > 1:
+            booth += rng.randrange(booths_per_exhibitor)
+        booth %= booths
+        grid.append([
+            _cell(f"6/{10 + i % 5}/2025"),
+            _cell(f"{8 + i % 10}:00"),
+            _cell(f"{chr(65 + booth % 8)}-{100 + booth}"),
+            _cell(f"Exhibitor {ex} Inc"),
+            _cell(f"Section {chr(65 + ex % 8)}"),
+            _cell(rng.choice(ITEMS)),
+            _cell(rng.choice(COLORS)),
+            str(rng.randint(1, 5)),
+            _cell(rng.choice(STATUSES)),
+            _cell(rng.choice(TYPES)),
+            _cell(rng.choice(USERS)),
+            _cell(f"Note {i}") if i % 4 == 0 else ''
+        ])
+    return grid
+
+
+class FakeWorksheet:
+    """In-memory worksheet answering the gspread calls GoogleSheetsManager makes"""
+
+    def __init__(self, title: str, grid: List[List[str]], id: int = 0):
+        self.title = title
+        self.grid = grid
+        self.id = id
+        self.requests = 0
+
+    def get_all_values(self) -> List[List[str]]:
+        self.requests += 1
+        width = max((len(row) for row in self.grid), default=0)
+        return [list(row) + [''] * (width - len(row)) for row in self.grid]
+
+    def batch_get(self, ranges: List[str], **kwargs) -> List[List[List[str]]]:
+        """A1 ranges like 'A10:L' or 'I2:I500', trimmed the way the API trims them"""
+        self.requests += 1
+        return [self._range(a1) for a1 in ranges]
+
+    def _range(self, a1: str) -> List[List[str]]:
+        start, end = a1.split(':')
+        first_row, first_col = a1_to_rowcol(start)
+        match = re.match(r'([A-Z]+)(\d*)$', end)
+        last_row = int(match.group(2)) if match.group(2) else len(self.grid)
+        last_col = a1_to_rowcol(f"{match.group(1)}1")[1]
+
+        values = []
+        for row in self.grid[first_row - 1:last_row]:
+            cells = list(row[first_col - 1:last_col])
+            # Trailing empty cells and rows are not returned
+            while cells and not cells[-1]:
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets: Dict[str, FakeWorksheet], client: 'FakeSheetsClient' = None):
+        self._worksheets = worksheets
+        self._client = client
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        try:
+            return self._worksheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title)
+
+    def get_worksheet_by_id(self, id: int) -> FakeWorksheet:
+        for worksheet in self._worksheets.values():
+            if worksheet.id == id:
+                return worksheet
+        raise WorksheetNotFound(id)
+
+    def worksheets(self) -> List[FakeWorksheet]:
+        return list(self._worksheets.values())
+
+    def values_batch_get(self, ranges: List[str], params: Dict = None) -> Dict:
+        """Ranges like "'Orders'" or "'Orders'!A1:L", answered in one request"""
+        if self._client is not None:
+            self._client.batch_requests += 1
+        value_ranges = []
+        for a1 in ranges:
+            title, _, cells = a1.partition('!')
+            if title.startswith("'"):
+                title = title[1:-1].replace("''", "'")
+            worksheet = self.worksheet(title)
+            values = worksheet._range(cells) if cells else worksheet._range(f"A1:{_last_column(worksheet.grid)}")
+            entry = {'range': a1, 'majorDimension': 'ROWS'}
+            if values:
+                entry['values'] = values
+            value_ranges.append(entry)
+        return {'valueRanges': value_ranges}
+
+
+def _last_column(grid: List[List[str]]) -> str:
+    width = max((len(row) for row in grid), default=1)
+    return rowcol_to_a1(1, max(width, 1)).rstrip('0123456789')
+
+
+class FakeSheetsClient:
+    """Stands in for a gspread Client: every sheet ID opens the same spreadsheet"""
+
+    def __init__(self, grids: Dict[str, List[List[str]]]):
+        self.worksheets = {
+            title: FakeWorksheet(title, grid, id=i) for i, (title, grid) in enumerate(grids.items())
+        }
+        self.batch_requests = 0
+
+    def open_by_key(self, sheet_id: str) -> FakeSpreadsheet:
+        return FakeSpreadsheet(self.worksheets, self)
+
+
+class FakeSheetsManager(GoogleSheetsManager):
+    """
+    GoogleSheetsManager reading synthetic worksheets instead of Google Sheets.
+
+    Everything above the gspread client is the real manager (handle cache,
+    parsing, incremental sync), so benchmarks measure the code that runs in
+    production without credentials or network.
+    """
+
+    def __init__(self, grids: Dict[str, List[List[str]]], **kwargs):
+        """
+        Args:
+            grids: Worksheet title -> grid of cell values (header row included)
+            **kwargs: Passed on to GoogleSheetsManager
+        """
+        self.grids = grids
+        super().__init__(**kwargs)
+
+    def setup_client(self):
+        self.gc = FakeSheetsClient(self.grids)
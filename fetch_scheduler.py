@@ -0,0 +1,182 @@
+# fetch_scheduler.py
+# Per-minute request budget, exponential backoff and a circuit breaker for Google Sheets calls
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+FETCHES_REFUSED = METRICS.counter(
+    'sheets_fetches_refused_total', 'Sheets requests not sent (quota budget, backoff or open circuit)',
+    labels=('reason',)
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class FetchRefused(Exception):
+    """A Sheets request was not sent because the scheduler held it back"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Sheets request refused ({reason}), retry in {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def rate_limit_delay(error: Exception) -> Optional[float]:
+    """Seconds to wait from a 429 response (Retry-After, or 0 if absent); None if not a 429"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) != 429:
+        return None
+    try:
+        return float(response.headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class FetchScheduler:
+    """
+    Gate in front of every Google Sheets request.
+
+    A token bucket holds the per-minute request budget, so bursts of forced
+    refreshes cannot run past the API quota. Each consecutive failure
+    pushes the next allowed attempt back exponentially (with jitter, and
+    at least as long as a 429's Retry-After). After failure_threshold
+    failures in a row the circuit opens: requests are refused without
+    touching the API until the backoff expires, then a single trial
+    request is let through (half-open) and its outcome closes or re-opens
+    the circuit. Refusals raise FetchRefused immediately, so callers can
+    keep serving what they already have.
+    """
+
+    def __init__(self, requests_per_minute: float = 30, backoff_base: float = 2.0,
+                 backoff_max: float = 300.0, failure_threshold: int = 3):
+        """
+        Args:
+            requests_per_minute: Sheets requests allowed per minute (burst up to the same)
+            backoff_base: Delay in seconds after the first failure; doubles per failure
+            backoff_max: Longest delay between attempts
+            failure_threshold: Consecutive failures that open the circuit
+        """
+        self.requests_per_minute = max(float(requests_per_minute), 1.0)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = max(int(failure_threshold), 1)
+
+        self._lock = threading.Lock()
+        self._tokens = self.requests_per_minute
+        self._refilled_at = time.monotonic()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._state = CLOSED
+        self._trial_in_flight = False
+        self._last_error = None
+        self._stats = {'allowed': 0, 'refused': 0, 'successes': 0, 'failures': 0, 'rate_limited': 0}
+
+    def acquire(self):
+        """
+        Take one request from the budget
+
+        Raises:
+            FetchRefused: If the request must not be sent now
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._retry_at:
+                reason = 'circuit_open' if self._state != CLOSED else 'backoff'
+                self._refuse(reason)
+                raise FetchRefused(reason, self._retry_at - now)
+
+            if self._state == OPEN:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                if self._trial_in_flight:
+                    self._refuse('circuit_open')
+                    raise FetchRefused('circuit_open', 1.0)
+                self._trial_in_flight = True
+
+            self._refill(now)
+            if self._tokens < 1:
+                self._trial_in_flight = False
+                self._refuse('quota')
+                raise FetchRefused('quota', (1 - self._tokens) * 60 / self.requests_per_minute)
+            self._tokens -= 1
+            self._stats['allowed'] += 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("✅ Sheets requests succeeding again, closing circuit")
+            self._failures = 0
+            self._retry_at = 0.0
+            self._state = CLOSED
+            self._trial_in_flight = False
+            self._last_error = None
+            self._stats['successes'] += 1
+
+    def record_failure(self, error: Exception):
+        """Count a failed request and schedule the next allowed attempt"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            self._last_error = str(error)
+            self._stats['failures'] += 1
+
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (self._failures - 1))
+            # Full jitter over the upper half keeps workers from retrying in lockstep
+            delay = random.uniform(delay / 2, delay)
+            retry_after = rate_limit_delay(error)
+            if retry_after is not None:
+                self._stats['rate_limited'] += 1
+                delay = max(delay, retry_after)
+            self._retry_at = time.monotonic() + delay
+
+            if self._failures >= self.failure_threshold:
+                if self._state == CLOSED:
+                    logger.warning(
+                        f"⚠️ {self._failures} Sheets failures in a row, opening circuit for {delay:.1f}s: {error}"
+                    )
+                elif self._state == HALF_OPEN:
+                    logger.warning(f"Trial Sheets request failed, circuit open for another {delay:.1f}s: {error}")
+                self._state = OPEN
+
+    def retry_delay(self) -> Optional[float]:
+        """Seconds until the next attempt is allowed after failures, or None when healthy"""
+        with self._lock:
+            if not self._failures:
+                return None
+            return max(self._retry_at - time.monotonic(), 0.0)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._tokens = min(self.requests_per_minute, self._tokens + elapsed * self.requests_per_minute / 60)
+
+    def _refuse(self, reason: str):
+        self._stats['refused'] += 1
+        FETCHES_REFUSED.inc(reason=reason)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            stats = dict(self._stats)
+            stats.update({
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'retry_in': round(max(self._retry_at - time.monotonic(), 0.0), 3) if self._failures else None,
+                'tokens': round(self._tokens, 2),
+                'requests_per_minute': self.requests_per_minute,
+                'last_error': self._last_error
+            })
+        return stats
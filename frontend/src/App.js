@@ -1,10 +1,12 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { Lock, ArrowRight, Package, Truck, CheckCircle2, Clock, AlertCircle, MapPin, Star, Zap, Bell, RefreshCw, Building2, Award, Shield, Search, X } from 'lucide-react';
 
 function App() {
   const [selectedExhibitor, setSelectedExhibitor] = useState('');
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [orders, setOrders] = useState([]);
+  // Latest orders for the live-update stream, which merges changes into them between renders
+  const ordersRef = useRef([]);
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(false);
   const [lastUpdated, setLastUpdated] = useState(null);
@@ -292,6 +294,10 @@ function App() {
     }
   }, [API_BASE, generateNotifications, createFallbackOrders, loading]); // CRITICAL FIX: Remove sortOrdersByStatus from dependencies
 
+  useEffect(() => {
+    ordersRef.current = orders;
+  }, [orders]);
+
   // FIXED: Load exhibitors on component mount (like your working version)
   useEffect(() => {
     fetchExhibitors();
@@ -305,12 +311,57 @@ function App() {
       if (exhibitor) {
         // Initial fetch (uses cache if available)
         fetchOrders(exhibitor.name, false);
-        
-        const interval = setInterval(() => {
-          fetchOrders(exhibitor.name, false); // Auto-refresh uses cache
-        }, 120000); // Auto-refresh every 2 minutes
-        
-        return () => clearInterval(interval);
+
+        if (!window.EventSource) {
+          const interval = setInterval(() => {
+            fetchOrders(exhibitor.name, false); // Auto-refresh uses cache
+          }, 120000); // Auto-refresh every 2 minutes
+
+          return () => clearInterval(interval);
+        }
+
+        // Live updates: the server pushes only the orders that changed
+        const stream = new EventSource(`${API_BASE}/stream?exhibitor=${encodeURIComponent(exhibitor.name)}`);
+
+        stream.addEventListener('snapshot', (event) => {
+          const data = JSON.parse(event.data);
+          const sortedOrders = sortOrdersByStatus(data.orders || []);
+          ordersRef.current = sortedOrders;
+          setOrders(sortedOrders);
+          setLastUpdated(new Date());
+          generateNotifications(sortedOrders);
+        });
+
+        stream.addEventListener('orders', (event) => {
+          const data = JSON.parse(event.data);
+          // Merge into the ref, not inside a setOrders updater: updaters must stay pure
+          const byId = new Map(ordersRef.current.map(order => [order.id, order]));
+          (data.removed || []).forEach(id => byId.delete(id));
+          (data.changed || []).forEach(order => byId.set(order.id, order));
+          const sortedOrders = sortOrdersByStatus(Array.from(byId.values()));
+          ordersRef.current = sortedOrders;
+          setOrders(sortedOrders);
+          setLastUpdated(new Date());
+          generateNotifications(sortedOrders);
+          console.log(`📡 Live update: ${(data.changed || []).length} changed, ${(data.removed || []).length} removed`);
+        });
+
+        // A closed stream (e.g. the server has no free stream slot) falls back to polling
+        let interval = null;
+        stream.onerror = () => {
+          if (stream.readyState === EventSource.CLOSED && !interval) {
+            interval = setInterval(() => {
+              fetchOrders(exhibitor.name, false);
+            }, 120000);
+          }
+        };
+
+        return () => {
+          stream.close();
+          if (interval) {
+            clearInterval(interval);
+          }
+        };
       }
     }
   }, [isLoggedIn, selectedExhibitor]); // CRITICAL FIX: Remove exhibitors and fetchOrders from dependencies
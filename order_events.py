@@ -0,0 +1,138 @@
+# order_events.py
+# Fan-out of snapshot changes to streaming (SSE) subscribers
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from order_snapshot import diff_snapshots
+
+
+class OrderChange:
+    """Orders that changed between two consecutive snapshots"""
+
+    __slots__ = ('seq', 'version', 'changed', 'removed')
+
+    def __init__(self, seq: int, version: str, changed: List[Dict], removed: List[Dict]):
+        self.seq = seq
+        self.version = version
+        self.changed = changed
+        self.removed = removed
+
+
+class OrderBroadcaster:
+    """
+    Publish snapshot changes to any number of waiting subscribers.
+
+    Changes are diffed once per snapshot and appended to a short shared
+    ring. Subscribers hold nothing but a cursor into that ring and all
+    sleep on one condition, so an idle subscriber costs one suspended
+    generator and publishing costs the same for ten clients or ten
+    thousand. Filtering by exhibitor or booth happens per subscriber on
+    the (small) changed set only.
+    """
+
+    def __init__(self, max_changes: int = 64):
+        """
+        Args:
+            max_changes: Changes kept for subscribers that fall behind; a
+                subscriber whose cursor drops out of the ring must resync
+        """
+        self._cond = threading.Condition()
+        self._changes = deque(maxlen=max_changes)
+        self._seq = 0
+        self._subscribers = 0
+        self._published = 0
+        self._listeners = []
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest change; new subscribers start here"""
+        return self._seq
+
+    def publish(self, old_snapshot, new_snapshot) -> Optional[OrderChange]:
+        """
+        Diff two snapshots and wake every subscriber if anything changed
+
+        Returns:
+            The published change, or None if the snapshots hold the same orders
+        """
+        if old_snapshot is not None and old_snapshot.version == new_snapshot.version:
+            return None
+
+        changed, removed = diff_snapshots(old_snapshot, new_snapshot)
+        if not changed and not removed:
+            return None
+
+        with self._cond:
+            self._seq += 1
+            change = OrderChange(self._seq, new_snapshot.version, changed, removed)
+            self._changes.append(change)
+            self._published += 1
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener()
+        return change
+
+    def add_listener(self, callback):
+        """
+        Call callback() from the publishing thread after every change
+
+        Used to wake subscribers that cannot block on the condition, such
+        as coroutines on an asyncio event loop.
+        """
+        with self._cond:
+            self._listeners.append(callback)
+
+    def changes_since(self, cursor: int) -> Optional[List[OrderChange]]:
+        """
+        Non-blocking form of wait()
+
+        Returns:
+            Changes newer than cursor (empty if none), or None if some were
+            already dropped from the ring and the subscriber must resync
+        """
+        with self._cond:
+            return self._changes_since(cursor)
+
+    def _changes_since(self, cursor: int) -> Optional[List[OrderChange]]:
+        if self._seq == cursor:
+            return []
+        if not self._changes or self._changes[0].seq > cursor + 1:
+            return None
+        return [change for change in self._changes if change.seq > cursor]
+
+    def wait(self, cursor: int, timeout: float) -> Optional[List[OrderChange]]:
+        """
+        Block until there are changes after cursor or timeout expires
+
+        Args:
+            cursor: Sequence number of the last change the subscriber saw
+            timeout: Seconds to wait (used to send keep-alives)
+
+        Returns:
+            Changes newer than cursor (empty on timeout), or None if some
+            were already dropped from the ring and the subscriber must resync
+        """
+        with self._cond:
+            if self._seq == cursor:
+                self._cond.wait(timeout)
+            return self._changes_since(cursor)
+
+    def subscribe(self):
+        with self._cond:
+            self._subscribers += 1
+
+    def unsubscribe(self):
+        with self._cond:
+            self._subscribers -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'subscribers': self._subscribers,
+                'published': self._published,
+                'seq': self._seq
+            }
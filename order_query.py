@@ -0,0 +1,273 @@
+# order_query.py
+# Filters, sorting, field projection and cursor pagination of /api/orders, served from snapshot indexes
+
+import base64
+import binascii
+import json
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from compact_order import MULTI_TAB_ORDER_KEYS
+
+# Query parameters that turn a plain /api/orders request into a query
+QUERY_PARAMS = ('fields', 'sort', 'status', 'section', 'limit', 'cursor')
+
+# Fields that can be projected and sorted on
+ORDER_FIELDS = MULTI_TAB_ORDER_KEYS
+
+_MISSING = object()
+
+
+class QueryError(ValueError):
+    """An invalid /api/orders query parameter (answered with 400)"""
+
+
+def sort_key(value) -> Tuple:
+    """Comparable key for a field value: missing values first, then numbers, then text"""
+    if value is None:
+        return (0, '')
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def _split(value: str) -> List[str]:
+    """Comma-separated parameter values, stripped, without blanks or repeats"""
+    items = []
+    for item in value.split(','):
+        item = item.strip()
+        if item and item not in items:
+            items.append(item)
+    return items
+
+
+def parse_fields(value: str) -> List[str]:
+    """
+    Validate a comma-separated fields parameter
+
+    Raises:
+        QueryError: If it is empty or names an unknown field
+    """
+    fields = _split(value)
+    unknown = [field for field in fields if field not in ORDER_FIELDS]
+    if not fields or unknown:
+        raise QueryError(f"Unknown fields {unknown}; choose from {', '.join(ORDER_FIELDS)}")
+    return fields
+
+
+def project(order, fields: Sequence[str]) -> Dict:
+    """The given fields of an order (fields it does not have are left out)"""
+    projected = {}
+    for field in fields:
+        value = order.get(field, _MISSING)
+        if value is not _MISSING:
+            projected[field] = value
+    return projected
+
+
+def _encode_cursor(sort: str, key) -> str:
+    raw = json.dumps({'s': sort, 'k': key}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str, sort: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        key = data['k']
+        cursor_sort = data['s']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise QueryError("Invalid cursor")
+    if cursor_sort != sort:
+        raise QueryError("Cursor was issued for a different sort order")
+    # Sort keys round-trip through JSON as nested lists
+    if isinstance(key, list):
+        key = tuple(tuple(part) if isinstance(part, list) else part for part in key)
+    return key
+
+
+def _first_after(keys: Sequence, cursor, descending: bool) -> int:
+    """Index of the first key that comes after cursor in keys' order"""
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (keys[mid] >= cursor) if descending else (keys[mid] <= cursor):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class OrderQuery:
+    """
+    A parsed /api/orders query.
+
+    Status and section filters are answered from the snapshot's indexes, so
+    a filtered query only touches the matching orders. A sort on a field
+    over all orders uses an ordering memoized on the snapshot; filtered
+    results are sorted on the fly. Pages are keyset-paginated: the cursor
+    holds the sort key of the last order returned, so a page boundary stays
+    put when orders are appended or change status between requests.
+    """
+
+    __slots__ = ('fields', 'sort', 'descending', 'statuses', 'sections', 'limit', 'cursor')
+
+    def __init__(self, fields: List[str] = None, sort: str = None, descending: bool = False,
+                 statuses: List[str] = None, sections: List[str] = None,
+                 limit: int = None, cursor: str = None):
+        self.fields = fields
+        self.sort = sort
+        self.descending = descending
+        self.statuses = statuses
+        self.sections = sections
+        self.limit = limit
+        self.cursor = cursor
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str], page_size: int, max_page_size: int) -> Optional['OrderQuery']:
+        """
+        Parse request query parameters
+
+        Args:
+            args: Query parameters (request.args)
+            page_size: Page size when a cursor is sent without a limit
+            max_page_size: Largest limit accepted
+
+        Returns:
+            OrderQuery, or None if none of QUERY_PARAMS was given
+
+        Raises:
+            QueryError: If a parameter is invalid
+        """
+        if not any(args.get(name) is not None for name in QUERY_PARAMS):
+            return None
+
+        fields = parse_fields(args['fields']) if args.get('fields') is not None else None
+
+        sort, descending = None, False
+        if args.get('sort'):
+            sort = args['sort'].strip()
+            descending = sort.startswith('-')
+            sort = sort.lstrip('-')
+            if sort not in ORDER_FIELDS:
+                raise QueryError(f"Cannot sort on '{sort}'; choose from {', '.join(ORDER_FIELDS)}")
+
+        statuses = _split(args['status']) if args.get('status') is not None else None
+        sections = _split(args['section']) if args.get('section') is not None else None
+
+        limit = None
+        if args.get('limit') is not None or args.get('cursor') is not None:
+            try:
+                limit = int(args['limit']) if args.get('limit') is not None else page_size
+            except ValueError:
+                raise QueryError("limit must be an integer")
+            if not 1 <= limit <= max_page_size:
+                raise QueryError(f"limit must be between 1 and {max_page_size}")
+
+        return cls(fields, sort, descending, statuses, sections, limit, args.get('cursor') or None)
+
+    @property
+    def sort_spec(self) -> str:
+        """The sort parameter as given ('' for snapshot order)"""
+        if self.sort is None:
+            return ''
+        return ('-' if self.descending else '') + self.sort
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None
+
+    def cache_key(self) -> str:
+        """Canonical form of the query, equal for equivalent parameter spellings"""
+        parts = [
+            ','.join(self.fields) if self.fields else '',
+            self.sort_spec,
+            ','.join(sorted(self.statuses)) if self.statuses is not None else '*',
+            ','.join(sorted(self.sections)) if self.sections is not None else '*',
+            str(self.limit or ''),
+            self.cursor or ''
+        ]
+        return '|'.join(parts)
+
+    def run(self, snapshot) -> Any:
+        """
+        Execute the query against a snapshot
+
+        Args:
+            snapshot: OrderSnapshot to read
+
+        Returns:
+            List of orders, or for a paginated query a dict with 'orders',
+            'total_orders', 'next_cursor' (None on the last page) and
+            'last_updated'
+
+        Raises:
+            QueryError: If the cursor is invalid for this query
+        """
+        orders, keys = self._matching(snapshot)
+        total = len(orders)
+
+        next_cursor = None
+        if self.paginated:
+            start = 0
+            if self.cursor:
+                try:
+                    start = _first_after(keys, _decode_cursor(self.cursor, self.sort_spec), self.descending)
+                except TypeError:
+                    raise QueryError("Invalid cursor")
+            end = min(start + self.limit, total)
+            if end < total:
+                next_cursor = _encode_cursor(self.sort_spec, keys[end - 1])
+            orders = orders[start:end]
+
+        if self.fields is not None:
+            orders = [project(order, self.fields) for order in orders]
+
+        if not self.paginated:
+            # Sorted views can be read-only sequences; the body needs a list
+            return list(orders)
+        return {
+            'orders': orders,
+            'total_orders': total,
+            'next_cursor': next_cursor,
+            'last_updated': snapshot.last_updated()
+        }
+
+    def _matching(self, snapshot) -> Tuple[Sequence, Sequence]:
+        """Matching orders in the requested order, with their sort keys"""
+        if self.statuses is None and self.sections is None:
+            if self.sort is None:
+                return snapshot.orders, range(len(snapshot.orders))
+            return snapshot.sorted_view(self.sort, self.descending)
+
+        candidates = self._filtered(snapshot)
+        positions = snapshot.positions()
+        if self.sort is None:
+            orders = sorted(candidates, key=lambda order: positions[id(order)])
+            return orders, [positions[id(order)] for order in orders]
+
+        field = self.sort
+        keyed = sorted(
+            (((sort_key(order.get(field)), order['id'], positions[id(order)]), order) for order in candidates),
+            key=itemgetter(0), reverse=self.descending
+        )
+        return [order for _, order in keyed], [key for key, _ in keyed]
+
+    def _filtered(self, snapshot) -> List:
+        """Orders matching the status and section filters, via the smaller index"""
+        by_status = None
+        if self.statuses is not None:
+            by_status = [order for status in self.statuses for order in snapshot.orders_with_status(status)]
+        by_section = None
+        if self.sections is not None:
+            by_section = [order for section in self.sections for order in snapshot.orders_in_section(section)]
+
+        if by_status is None:
+            return by_section
+        if by_section is None:
+            return by_status
+        if len(by_status) <= len(by_section):
+            sections = set(self.sections)
+            return [order for order in by_status if order.get('section', '') in sections]
+        statuses = set(self.statuses)
+        return [order for order in by_section if order['status'] in statuses]
@@ -0,0 +1,306 @@
+# order_snapshot.py
+# Immutable snapshot of the parsed orders with lookup indexes built once per Sheets load
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from compact_order import compact_order, json_default
+from exhibitor_search import ExhibitorSearchIndex
+from order_query import sort_key
+from prepared_body import PreparedBody
+
+# Status values produced by GoogleSheetsManager.map_order_status, with the
+# key each one is reported under in /api/stats
+STATUS_STAT_KEYS = {
+    'delivered': 'delivered',
+    'in-process': 'in_process',
+    'in-route': 'in_route',
+    'out-for-delivery': 'out_for_delivery',
+    'cancelled': 'cancelled'
+}
+
+# Orders measured by OrderSnapshot.nbytes() to estimate the rest
+SIZE_SAMPLE = 200
+
+
+def normalize_exhibitor(name) -> str:
+    """Key used for case-insensitive exhibitor lookups"""
+    return str(name).strip().lower()
+
+
+def normalize_booth(booth) -> str:
+    """Key used for booth lookups"""
+    return str(booth).strip()
+
+
+class OrderSnapshot:
+    """
+    Read-only view of one order load.
+
+    Orders are grouped by exhibitor, booth, section and status in a single
+    pass when the snapshot is built, so every lookup afterwards costs
+    O(result) instead of a scan over all orders. The version is a hash of
+    the order contents and is used as the HTTP ETag. Sheets orders are held
+    as CompactOrder records; serialize them with the app's JSON provider or
+    compact_order.json_default.
+    """
+
+    __slots__ = (
+        'orders', 'source', 'created_at', 'version',
+        '_by_exhibitor', '_by_booth', '_by_section', '_by_status',
+        'exhibitors', 'stats', '_bodies', '_bodies_lock', '_views'
+    )
+
+    def __init__(self, orders: Iterable[Dict], source: str = 'sheets', created_at: float = None,
+                 version: str = None):
+        """
+        Args:
+            orders: Order dictionaries as returned by parse_orders_data
+                (or CompactOrder records)
+            source: Where the orders came from ('sheets' or 'mock')
+            created_at: Build time to keep when reloading a stored snapshot
+            version: Content version recorded with a stored snapshot, so
+                reloading it does not hash every order again
+        """
+        orders = tuple(compact_order(order) for order in orders)
+        by_exhibitor: Dict[str, List[Dict]] = {}
+        by_booth: Dict[str, List[Dict]] = {}
+        by_section: Dict[str, List[Dict]] = {}
+        by_status: Dict[str, List[Dict]] = {}
+        exhibitors: Dict[str, Dict] = {}
+
+        for order in orders:
+            exhibitor_name = order['exhibitor_name']
+            status = order['status']
+
+            by_exhibitor.setdefault(normalize_exhibitor(exhibitor_name), []).append(order)
+            by_booth.setdefault(normalize_booth(order['booth_number']), []).append(order)
+            by_section.setdefault(order.get('section', ''), []).append(order)
+            by_status.setdefault(status, []).append(order)
+
+            summary = exhibitors.get(exhibitor_name)
+            if summary is None:
+                summary = exhibitors[exhibitor_name] = {
+                    'name': exhibitor_name,
+                    'booth': order['booth_number'],
+                    'total_orders': 0,
+                    'delivered_orders': 0
+                }
+            summary['total_orders'] += 1
+            if status == 'delivered':
+                summary['delivered_orders'] += 1
+
+        stats = {'total_orders': len(orders)}
+        for status, key in STATUS_STAT_KEYS.items():
+            stats[key] = len(by_status.get(status, ()))
+
+        _set = object.__setattr__
+        _set(self, 'orders', orders)
+        _set(self, 'source', source)
+        _set(self, 'created_at', time.time() if created_at is None else created_at)
+        _set(self, 'version', content_version(orders) if version is None else version)
+        _set(self, '_by_exhibitor', _freeze(by_exhibitor))
+        _set(self, '_by_booth', _freeze(by_booth))
+        _set(self, '_by_section', _freeze(by_section))
+        _set(self, '_by_status', _freeze(by_status))
+        _set(self, 'exhibitors', tuple(exhibitors.values()))
+        _set(self, 'stats', stats)
+        _set(self, '_bodies', {})
+        _set(self, '_bodies_lock', threading.Lock())
+        _set(self, '_views', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("OrderSnapshot is immutable")
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        return iter(self.orders)
+
+    def orders_for_exhibitor(self, exhibitor_name: str) -> Tuple[Dict, ...]:
+        """Orders whose exhibitor matches exhibitor_name (case-insensitive)"""
+        return self._by_exhibitor.get(normalize_exhibitor(exhibitor_name), ())
+
+    def orders_for_booth(self, booth_number: str) -> Tuple[Dict, ...]:
+        """Orders placed for booth_number"""
+        return self._by_booth.get(normalize_booth(booth_number), ())
+
+    def orders_in_section(self, section: str) -> Tuple[Dict, ...]:
+        """Orders in the given section"""
+        return self._by_section.get(section, ())
+
+    def orders_with_status(self, status: str) -> Tuple[Dict, ...]:
+        """Orders with the given API status (e.g. 'delivered')"""
+        return self._by_status.get(status, ())
+
+    def by_id(self) -> Dict[str, Dict]:
+        """Orders keyed by order ID; built on first use, so each snapshot is mapped once across diffs"""
+        return self._view('by_id', lambda: {order['id']: order for order in self.orders})
+
+    def positions(self) -> Dict[int, int]:
+        """Index of every order in self.orders, keyed by id(order); built on first use"""
+        return self._view('positions', lambda: {id(order): i for i, order in enumerate(self.orders)})
+
+    def sorted_view(self, field: str, descending: bool = False) -> Tuple[Sequence[Dict], Sequence[Tuple]]:
+        """
+        All orders sorted on a field, built on first use and kept for this snapshot
+
+        Ties are broken by order ID and then position, so the order is total
+        and the descending order is exactly the ascending one reversed: only
+        the ascending view is kept, and descending reads it back to front.
+
+        Args:
+            field: Order field to sort on
+            descending: Sort from the largest value down
+
+        Returns:
+            Tuple of (sorted orders, their sort keys in the same order)
+        """
+        def build():
+            keyed = sorted((sort_key(order.get(field)), order['id'], i) for i, order in enumerate(self.orders))
+            return tuple(self.orders[key[2]] for key in keyed), keyed
+
+        orders, keys = self._view(('sorted', field), build)
+        if descending:
+            return ReversedView(orders), ReversedView(keys)
+        return orders, keys
+
+    def search_index(self) -> ExhibitorSearchIndex:
+        """Prefix/trigram index over exhibitor names and booths; built on first use"""
+        def build():
+            booths: Dict[str, Dict[str, None]] = {}
+            for order in self.orders:
+                booths.setdefault(order['exhibitor_name'], {})[order['booth_number']] = None
+            return ExhibitorSearchIndex(self.exhibitors, {name: list(b) for name, b in booths.items()})
+
+        return self._view('search', build)
+
+    def _view(self, key, build: Callable[[], Any]):
+        view = self._views.get(key)
+        if view is None:
+            with self._bodies_lock:
+                view = self._views.get(key)
+                if view is None:
+                    view = self._views[key] = build()
+        return view
+
+    def age(self) -> float:
+        """Seconds since this snapshot was built"""
+        return time.time() - self.created_at
+
+    def last_updated(self) -> str:
+        """Build time as an ISO timestamp, as reported in 'last_updated' fields"""
+        return datetime.fromtimestamp(self.created_at).isoformat()
+
+    def nbytes(self) -> int:
+        """
+        Estimated memory held by the orders and prepared bodies
+
+        Order sizes are extrapolated from a sample, so this stays cheap on
+        large snapshots; the lookup indexes are not counted.
+        """
+        sample = self.orders[:SIZE_SAMPLE]
+        per_order = 0
+        if sample:
+            # Interned values shared between orders are counted once
+            seen = set()
+            sampled = 0
+            for order in sample:
+                sampled += sys.getsizeof(order)
+                for value in _field_values(order):
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        sampled += sys.getsizeof(value)
+            per_order = sampled / len(sample)
+        bodies = sum(body.nbytes() for body in list(self._bodies.values()))
+        return int(sys.getsizeof(self.orders) + per_order * len(self.orders)) + bodies
+
+    def cached_body(self, key: str) -> Optional[PreparedBody]:
+        """The body prepared_body built for key, or None if it has not been built yet"""
+        return self._bodies.get(key)
+
+    def prepared_body(self, key: str, payload_fn: Callable[[], Any]) -> PreparedBody:
+        """
+        Serialized (and compressed) response body for key, built once per snapshot
+
+        Args:
+            key: Identity of the response within this snapshot (e.g. 'orders')
+            payload_fn: Builds the JSON payload the first time key is requested
+
+        Returns:
+            PreparedBody shared by every later request for key
+        """
+        body = self._bodies.get(key)
+        if body is None:
+            with self._bodies_lock:
+                body = self._bodies.get(key)
+                if body is None:
+                    body = self._bodies[key] = PreparedBody(payload_fn())
+        return body
+
+
+class ReversedView(Sequence):
+    """Read-only view of a sequence back to front, without copying it"""
+
+    __slots__ = ('_items',)
+
+    def __init__(self, items: Sequence):
+        self._items = items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError('ReversedView index out of range')
+        return self._items[len(self._items) - 1 - index]
+
+    def __iter__(self):
+        return reversed(self._items)
+
+
+def _field_values(order):
+    if isinstance(order, dict):
+        return order.values()
+    return (getattr(order, name) for name in order.__slots__)
+
+
+def content_version(orders: Iterable[Dict]) -> str:
+    """Hash of the order contents; equal orders always give the same version"""
+    payload = json.dumps(list(orders), sort_keys=True, separators=(',', ':'), default=json_default)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _freeze(index: Dict[str, List[Dict]]) -> Dict[str, Tuple[Dict, ...]]:
+    return {key: tuple(values) for key, values in index.items()}
+
+
+def diff_snapshots(old: 'OrderSnapshot', new: 'OrderSnapshot') -> Tuple[List[Dict], List[Dict]]:
+    """
+    Compare two snapshots by order ID
+
+    Args:
+        old: Previous snapshot (may be None)
+        new: Snapshot that replaces it
+
+    Returns:
+        Tuple of (orders added or changed in new, orders of old missing from new)
+    """
+    if old is None:
+        return list(new.orders), []
+
+    old_by_id = old.by_id()
+    new_by_id = new.by_id()
+    changed = [order for order in new.orders if old_by_id.get(order['id']) != order]
+    removed = [order for order_id, order in old_by_id.items() if order_id not in new_by_id]
+    return changed, removed
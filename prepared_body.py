@@ -0,0 +1,68 @@
+# prepared_body.py
+# JSON response bodies serialized and compressed once, then served as bytes
+
+import gzip
+import json
+from typing import Any, Dict, Tuple
+
+from compact_order import json_default
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+class PreparedBody:
+    """
+    A JSON body with its compressed variants.
+
+    Serialization matches Flask's jsonify (sorted keys, compact separators,
+    trailing newline) so clients see byte-identical output.
+    """
+
+    __slots__ = ('identity', 'gzip', 'br')
+
+    def __init__(self, payload: Any):
+        text = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=json_default)
+        self.identity = (text + '\n').encode('utf-8')
+        self.gzip = None
+        self.br = None
+
+        if len(self.identity) >= MIN_COMPRESS_SIZE:
+            self.gzip = gzip.compress(self.identity, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(self.identity, quality=BROTLI_QUALITY)
+
+    def negotiate(self, accept_encodings) -> Tuple[bytes, str]:
+        """
+        Pick the smallest variant the client accepts
+
+        Args:
+            accept_encodings: werkzeug Accept header (request.accept_encodings)
+
+        Returns:
+            Tuple of (body bytes, content encoding or 'identity')
+        """
+        if self.br is not None and accept_encodings.quality('br') > 0:
+            return self.br, 'br'
+        if self.gzip is not None and accept_encodings.quality('gzip') > 0:
+            return self.gzip, 'gzip'
+        return self.identity, 'identity'
+
+    def nbytes(self) -> int:
+        """Bytes held by all variants"""
+        return sum(len(variant) for variant in (self.identity, self.gzip, self.br) if variant is not None)
+
+    def sizes(self) -> Dict[str, int]:
+        return {
+            'identity': len(self.identity),
+            'gzip': len(self.gzip) if self.gzip is not None else None,
+            'br': len(self.br) if self.br is not None else None
+        }
@@ -0,0 +1,200 @@
+# row_parser.py
+# Sheet row parser compiled once per header layout: cells are read by column index
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+# Google Sheets status -> API status
+STATUS_MAPPING = {
+    'Delivered': 'delivered',
+    'Received': 'delivered',
+    'Out for delivery': 'out-for-delivery',
+    'In route from warehouse': 'in-route',
+    'In Process': 'in-process',
+    'cancelled': 'cancelled',
+    'Cancelled': 'cancelled'
+}
+DEFAULT_STATUS = 'in-process'
+
+DEFAULT_QUANTITY = 1
+
+# Cap on remembered quantity strings, so free-text cells cannot grow the table unbounded
+MAX_LOOKUP_ENTRIES = 4096
+
+# Sheet columns an order is built from, in the order RowParser unpacks them
+ORDER_COLUMNS = (
+    'Booth #', 'Exhibitor Name', 'Item', 'Date', 'Color', 'Quantity',
+    'Status', 'Comments', 'Section', 'Type', 'User', 'Hour'
+)
+
+
+# Header names of a designated order ID column, in order of preference;
+# when a sheet has one, its non-empty cells are used as the order IDs
+ORDER_ID_COLUMNS = ('Order ID', 'Order #', 'ID')
+
+# Cells that identify an order: status, quantity and comments are edited
+# over an order's life, so they are left out and such edits keep the ID
+FINGERPRINT_COLUMNS = ('Date', 'Hour', 'Booth #', 'Exhibitor Name', 'Item', 'Color', 'Section', 'Type', 'User')
+
+
+def tab_id(tab: str) -> str:
+    """Worksheet name as used inside order IDs"""
+    return '_'.join(tab.split())
+
+
+def fingerprint(values) -> str:
+    """Short deterministic hash of an order's identifying cell values"""
+    return hashlib.blake2b('\x1f'.join(values).encode('utf-8'), digest_size=6).hexdigest()
+
+
+def unique_id(order_id: str, seen: Optional[Dict[str, int]]) -> str:
+    """
+    order_id, or order_id-2, -3, ... for its later occurrences
+
+    Args:
+        order_id: ID derived from the row
+        seen: Occurrences of each ID so far in this sheet (updated), or
+            None when the row is parsed on its own
+    """
+    if seen is None:
+        return order_id
+    count = seen.get(order_id, 0) + 1
+    seen[order_id] = count
+    return order_id if count == 1 else f"{order_id}-{count}"
+
+
+def parse_quantity(value, default=DEFAULT_QUANTITY) -> int:
+    """Sheet quantity cell as an int, or default when empty or not a number"""
+    try:
+        return int(float(str(value))) if value else default
+    except (ValueError, TypeError):
+        return default
+
+
+class RowParser:
+    """
+    Converts raw sheet rows to order dictionaries for one header row.
+
+    Order IDs do not depend on a row's position: they come from a
+    designated ID column (ORDER_ID_COLUMNS) when the sheet has one, and
+    otherwise from a fingerprint of the cells that identify the order, so
+    inserting, deleting or sorting rows leaves every other ID unchanged.
+    Rows that produce the same ID get -2, -3, ... appended in sheet order.
+
+    Header positions are resolved once: for every row length the parser
+    keeps the index of each needed column, so a row is parsed with a dozen
+    index lookups instead of a dict of every cell. Where a header name
+    repeats, the right-most cell present in the row wins, as it does when
+    the row is zipped into a dict. Quantity strings are converted once and
+    remembered, since a sheet repeats a handful of values.
+    """
+
+    def __init__(self, headers: List[str]):
+        """
+        Args:
+            headers: Stripped header names from the sheet's header row
+        """
+        self.headers = tuple(headers)
+        id_column = next((column for column in ORDER_ID_COLUMNS if column in self.headers), None)
+        # The ID column (if any) is looked up last, after ORDER_COLUMNS
+        self._positions = tuple(
+            tuple(i for i, name in enumerate(self.headers) if name == column)
+            for column in ORDER_COLUMNS + (id_column,)
+        )
+        self._layouts: Dict[int, Tuple[int, ...]] = {}
+        self._quantities: Dict[str, int] = {}
+
+    def _layout(self, length: int) -> Tuple[int, ...]:
+        """Column index of each ORDER_COLUMNS entry, then the ID column, for a row of this length (-1 if absent)"""
+        length = min(length, len(self.headers))
+        layout = self._layouts.get(length)
+        if layout is None:
+            layout = tuple(
+                max((i for i in positions if i < length), default=-1)
+                for positions in self._positions
+            )
+            self._layouts[length] = layout
+        return layout
+
+    def parse(self, row: List, row_idx: int, tab: str = None, seen: Dict[str, int] = None) -> Optional[Dict]:
+        """
+        Convert one raw sheet row into an order dictionary
+
+        Args:
+            row: Raw cell values for the row
+            row_idx: 0-based index of the row in the sheet grid (not part
+                of the order ID)
+            tab: Worksheet the row was read from when orders span several
+                tabs; recorded as 'source_tab' and made part of the order ID
+            seen: ID occurrence counts shared by every row of one parse of
+                the sheet, so repeated IDs get a suffix (see unique_id)
+
+        Returns:
+            Order dictionary, or None if the row lacks a booth or exhibitor
+        """
+        if not row:
+            return None
+
+        (booth_col, exhibitor_col, item_col, date_col, color_col, quantity_col,
+         status_col, comments_col, section_col, type_col, user_col, hour_col, id_col) = self._layout(len(row))
+
+        booth_num = str(row[booth_col]).strip() if booth_col >= 0 else ''
+        exhibitor_name = str(row[exhibitor_col]).strip() if exhibitor_col >= 0 else ''
+
+        # Skip rows without essential data
+        if not booth_num or not exhibitor_name:
+            return None
+
+        item = str(row[item_col]).strip() if item_col >= 0 else ''
+        date = str(row[date_col]).strip() if date_col >= 0 else ''
+
+        if quantity_col >= 0:
+            raw_quantity = str(row[quantity_col]).strip()
+            quantity = self._quantities.get(raw_quantity)
+            if quantity is None:
+                quantity = parse_quantity(raw_quantity)
+                if len(self._quantities) < MAX_LOOKUP_ENTRIES:
+                    self._quantities[raw_quantity] = quantity
+        else:
+            quantity = DEFAULT_QUANTITY
+
+        raw_status = str(row[status_col]).strip() if status_col >= 0 else ''
+        status = STATUS_MAPPING.get(raw_status, DEFAULT_STATUS)
+
+        color = str(row[color_col]).strip() if color_col >= 0 else ''
+        section = str(row[section_col]).strip() if section_col >= 0 else ''
+        order_type = str(row[type_col]).strip() if type_col >= 0 else ''
+        user = str(row[user_col]).strip() if user_col >= 0 else ''
+        hour = str(row[hour_col]).strip() if hour_col >= 0 else ''
+
+        order_id = str(row[id_col]).strip() if id_col >= 0 else ''
+        if not order_id:
+            # Same order as FINGERPRINT_COLUMNS
+            digest = fingerprint((date, hour, booth_num, exhibitor_name, item, color, section, order_type, user))
+            # Tabs can hold identical rows, so the tab is part of the ID
+            tab_part = f"{tab_id(tab)}-" if tab is not None else ''
+            order_id = f"ORD-{date.replace('/', '-')}-{booth_num}-{tab_part}{digest}"
+        elif tab is not None:
+            order_id = f"{tab_id(tab)}-{order_id}"
+
+        order = {
+            'id': unique_id(order_id, seen),
+            'booth_number': booth_num,
+            'exhibitor_name': exhibitor_name,
+            'item': item,
+            'description': f"Order from Google Sheets: {item}",
+            'color': color,
+            'quantity': quantity,
+            'status': status,
+            'order_date': date,
+            'comments': str(row[comments_col]).strip() if comments_col >= 0 else '',
+            'section': section,
+            'type': order_type,
+            'user': user,
+            'hour': hour,
+            'abacus_ai_processed': True,
+            'data_source': 'Google Sheets via Abacus AI'
+        }
+        if tab is not None:
+            order['source_tab'] = tab
+        return order
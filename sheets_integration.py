@@ -1,39 +1,148 @@
 # sheets_integration.py
 # This script adapts your existing Google Sheets code for the API (NO PANDAS)
 
-import gspread
-from google.oauth2.service_account import Credentials
+# gspread, google-auth and requests are imported when the client is first
+# set up: they are most of the app's import time and no request needs them
+# before the first Sheets fetch
 import logging
+import threading
+import time
+
+from compact_order import compact_order
+from fetch_scheduler import FetchRefused, FetchScheduler
+from metrics import METRICS, SIZE_BUCKETS
+from row_parser import (
+    DEFAULT_STATUS, FINGERPRINT_COLUMNS, ORDER_ID_COLUMNS, STATUS_MAPPING, RowParser, parse_quantity
+)
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SHEETS_REQUEST_SECONDS = METRICS.histogram(
+    'sheets_request_seconds', 'Google Sheets values request latency', labels=('call',)
+)
+SHEETS_REQUEST_ERRORS = METRICS.counter(
+    'sheets_request_errors_total', 'Google Sheets values requests that failed', labels=('call',)
+)
+SHEETS_ROWS_FETCHED = METRICS.histogram(
+    'sheets_rows_fetched', 'Rows returned per Google Sheets values request', labels=('call',),
+    buckets=SIZE_BUCKETS
+)
+PARSE_SECONDS = METRICS.histogram(
+    'sheets_parse_seconds', 'Time spent turning sheet rows into orders', labels=('mode',)
+)
+ROWS_PARSED = METRICS.counter(
+    'sheets_rows_parsed_total', 'Sheet rows run through the order parser', labels=('mode',)
+)
+
+# Columns whose cells identify an order; an incremental sync compares them
+# to tell a row that only changed status from one that was replaced or moved
+IDENTITY_COLUMNS = frozenset(ORDER_ID_COLUMNS + FINGERPRINT_COLUMNS)
+
+# Compiled RowParsers kept at once (one per distinct header row)
+MAX_ROW_PARSERS = 16
+
+# An incremental sync that finds more than this share of the held rows
+# changed identity (or more than MAX_REREAD_RANGES separate runs of them)
+# reads the whole worksheet instead of re-reading those rows
+MAX_REREAD_FRACTION = 0.25
+MAX_REREAD_RANGES = 20
+
 class GoogleSheetsManager:
     """
     Google Sheets Manager - adapted from your existing code (NO PANDAS)
     """
     
-    def __init__(self, credentials_path: str = None):
+    def __init__(self, credentials_path: Union[str, Callable[[], Optional[str]]] = None,
+                 full_resync_every: int = 10, handle_ttl: float = 300, pool_size: int = 10,
+                 scheduler: FetchScheduler = None, lazy: bool = False):
         """
         Initialize Google Sheets Manager
         
         Args:
-            credentials_path: Path to your Google service account JSON file
+            credentials_path: Path to your Google service account JSON file,
+                or a function returning it (called when the client is set up;
+                returning None means there are no credentials)
+            full_resync_every: Number of incremental syncs in sync_orders
+                before the whole worksheet is read again
+            handle_ttl: Seconds to reuse Spreadsheet/Worksheet handles
+                before their metadata is fetched again
+            pool_size: Keep-alive connections held by the shared HTTP session
+            scheduler: FetchScheduler every values request has to pass
+                (quota budget, backoff and circuit breaker); None sends
+                every request
+            lazy: Set up the client on first use (or connect()) instead of now
         """
         self.credentials_path = credentials_path
-        self.gc = None
-        self.setup_client()
+        self._gc = None
+        self._client_state = 'pending'
+        self._client_lock = threading.Lock()
+        self.full_resync_every = full_resync_every
+        self.handle_ttl = handle_ttl
+        self.pool_size = pool_size
+        self.scheduler = scheduler
+        self.last_sync = None
+        self._sync_state = {}
+        self._sync_lock = threading.Lock()
+        self._handles = {}
+        self._handles_lock = threading.Lock()
+        self._batch_state = {}
+        self._row_parsers = {}
+        if not lazy:
+            self.connect()
+    
+    @property
+    def gc(self):
+        """gspread client (None if it could not be set up), created on first use"""
+        if self._client_state == 'pending':
+            self.connect()
+        return self._gc
+    
+    @gc.setter
+    def gc(self, client):
+        self._gc = client
+    
+    @property
+    def client_state(self) -> str:
+        """'pending' until the client is set up, then 'ready' or 'failed'"""
+        return self._client_state
+    
+    def connect(self) -> bool:
+        """
+        Set up the client now if that has not happened yet (e.g. from a prewarm thread)
+        
+        Returns:
+            True if the client is ready
+        """
+        with self._client_lock:
+            if self._client_state == 'pending':
+                started = time.perf_counter()
+                self.setup_client()
+                self._client_state = 'ready' if self._gc else 'failed'
+                if self._gc:
+                    logger.info(f"Sheets client ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return self._client_state == 'ready'
     
     def setup_client(self):
         """Setup Google Sheets client"""
         try:
-            if self.credentials_path:
+            import gspread
+            from google.oauth2.service_account import Credentials
+            from requests.adapters import HTTPAdapter
+            
+            credentials_path = self.credentials_path
+            if callable(credentials_path):
+                credentials_path = credentials_path()
+                if not credentials_path:
+                    raise Exception("No valid credentials found")
+            
+            if credentials_path:
                 # Use service account credentials
                 credentials = Credentials.from_service_account_file(
-                    self.credentials_path,
+                    credentials_path,
                     scopes=[
                         'https://www.googleapis.com/auth/spreadsheets',
                         'https://www.googleapis.com/auth/drive'
@@ -44,19 +153,162 @@ class GoogleSheetsManager:
                 # Use default authentication (for development)
                 self.gc = gspread.service_account()
             
+            # One keep-alive session with a sized pool for every Sheets call
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            self._gc.session.mount('https://', adapter)
+            
             logger.info("Google Sheets client initialized successfully")
             
         except Exception as e:
             logger.error(f"Error setting up Google Sheets client: {e}")
             self.gc = None
     
-    def get_data(self, sheet_id: str, worksheet_name: str = "Orders") -> List[List]:
+    def get_spreadsheet(self, sheet_id: str, refresh: bool = False):
+        """
+        Get a cached Spreadsheet handle, opening it at most once per handle_ttl
+        
+        Args:
+            sheet_id: Google Sheet ID
+            refresh: Ignore any cached handle
+            
+        Returns:
+            gspread Spreadsheet
+        """
+        key = ('spreadsheet', sheet_id)
+        handle = None if refresh else self._cached_handle(key)
+        if handle is None:
+            if not self.gc:
+                raise Exception("Google Sheets client not initialized")
+            handle = self.gc.open_by_key(sheet_id)
+            self._store_handle(key, handle)
+        return handle
+    
+    def get_worksheet(self, sheet_id: str, worksheet_name: str, refresh: bool = False):
+        """
+        Get a cached Worksheet handle, looking it up at most once per handle_ttl
+        
+        If the tab can no longer be found by name but was seen before, it is
+        looked up by its sheet ID instead so a renamed tab keeps working.
+        
+        Args:
+            sheet_id: Google Sheet ID
+            worksheet_name: Name of the worksheet
+            refresh: Ignore any cached handles
+            
+        Returns:
+            gspread Worksheet
+        """
+        key = ('worksheet', sheet_id, worksheet_name)
+        previous = self._handles.get(key)
+        handle = None if refresh else self._cached_handle(key)
+        if handle is not None:
+            return handle
+        
+        from gspread.exceptions import WorksheetNotFound
+        
+        spreadsheet = self.get_spreadsheet(sheet_id, refresh=refresh)
+        try:
+            handle = spreadsheet.worksheet(worksheet_name)
+        except WorksheetNotFound:
+            if previous is None:
+                raise
+            handle = spreadsheet.get_worksheet_by_id(previous[0].id)
+            logger.warning(f"Worksheet '{worksheet_name}' was renamed to '{handle.title}', following it by ID")
+        
+        self._store_handle(key, handle)
+        return handle
+    
+    def with_worksheet(self, sheet_id: str, worksheet_name: str, fn):
+        """
+        Run fn(worksheet) with a cached handle, retrying once with fresh handles
+        
+        A cached handle goes stale when its tab is renamed or deleted, which
+        shows up as a not-found or bad-range error on the values request.
+        Other API errors (429 rate limits, 5xx) are raised right away, so the
+        scheduler backs off instead of more requests going out.
+        """
+        from gspread.exceptions import APIError
+        
+        worksheet = self.get_worksheet(sheet_id, worksheet_name)
+        try:
+            return fn(worksheet)
+        except APIError as e:
+            if not _is_stale_handle_error(e):
+                raise
+            logger.warning(f"Request on cached worksheet '{worksheet_name}' failed, refreshing handles: {e}")
+            self.invalidate_handles(sheet_id)
+            return fn(self.get_worksheet(sheet_id, worksheet_name, refresh=True))
+    
+    def with_spreadsheet(self, sheet_id: str, fn):
+        """Run fn(spreadsheet) with a cached handle, retrying once with a fresh one on a stale-handle error"""
+        from gspread.exceptions import APIError
+        
+        spreadsheet = self.get_spreadsheet(sheet_id)
+        try:
+            return fn(spreadsheet)
+        except APIError as e:
+            if not _is_stale_handle_error(e):
+                raise
+            logger.warning(f"Request on cached spreadsheet failed, refreshing handles: {e}")
+            self.invalidate_handles(sheet_id)
+            return fn(self.get_spreadsheet(sheet_id, refresh=True))
+    
+    def _values_request(self, call: str, sheet_id: str, worksheet_name: str, fn):
+        """with_worksheet for a values request, recording its latency, size and failures"""
+        return self._timed_request(call, lambda: self.with_worksheet(sheet_id, worksheet_name, fn))
+    
+    def _timed_request(self, call: str, request):
+        """
+        Run a Sheets request through the scheduler, recording its latency and failures under call
+        
+        Raises:
+            FetchRefused: If the scheduler held the request back
+        """
+        if self.scheduler is not None:
+            self.scheduler.acquire()
+        
+        started = time.perf_counter()
+        try:
+            values = request()
+        except Exception as e:
+            SHEETS_REQUEST_ERRORS.inc(call=call)
+            if self.scheduler is not None:
+                self.scheduler.record_failure(e)
+            raise
+        finally:
+            SHEETS_REQUEST_SECONDS.observe(time.perf_counter() - started, call=call)
+        
+        if self.scheduler is not None:
+            self.scheduler.record_success()
+        return values
+    
+    def invalidate_handles(self, sheet_id: str = None):
+        """Expire cached handles (for one spreadsheet, or all of them)"""
+        with self._handles_lock:
+            for key, (handle, _) in list(self._handles.items()):
+                if sheet_id is None or key[1] == sheet_id:
+                    # Keep the handle so a renamed tab can still be found by ID
+                    self._handles[key] = (handle, 0)
+    
+    def _cached_handle(self, key):
+        entry = self._handles.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.handle_ttl:
+            return entry[0]
+        return None
+    
+    def _store_handle(self, key, handle):
+        with self._handles_lock:
+            self._handles[key] = (handle, time.monotonic())
+    
+    def get_data(self, sheet_id: str, worksheet_name: str = "Orders", raise_errors: bool = False) -> List[List]:
         """
         Get data from Google Sheets - NO PANDAS VERSION
         
         Args:
             sheet_id: Google Sheet ID
             worksheet_name: Name of the worksheet
+            raise_errors: Raise request failures (and FetchRefused) instead
+                of logging them and returning []
             
         Returns:
             List of lists with the sheet data
@@ -65,12 +317,9 @@ class GoogleSheetsManager:
             if not self.gc:
                 raise Exception("Google Sheets client not initialized")
             
-            # Open the spreadsheet
-            spreadsheet = self.gc.open_by_key(sheet_id)
-            worksheet = spreadsheet.worksheet(worksheet_name)
-            
-            # Get all values
-            data = worksheet.get_all_values()
+            # Get all values (one request once the worksheet handle is cached)
+            data = self._values_request('get_all_values', sheet_id, worksheet_name, lambda ws: ws.get_all_values())
+            SHEETS_ROWS_FETCHED.observe(len(data or ()), call='get_all_values')
             
             if not data:
                 return []
@@ -78,10 +327,370 @@ class GoogleSheetsManager:
             logger.info(f"Successfully loaded {len(data)} rows from {worksheet_name}")
             return data
             
+        except FetchRefused as e:
+            logger.warning(f"Skipped reading {worksheet_name}: {e}")
+            if raise_errors:
+                raise
+            return []
         except Exception as e:
             logger.error(f"Error getting data from sheet: {e}")
+            if raise_errors:
+                raise
             return []
     
+    def sync_orders(self, sheet_id: str, worksheet_name: str = "Orders", full: bool = False) -> List[Dict]:
+        """
+        Get parsed orders, re-reading only what changed since the last sync
+        
+        The first call (and every full_resync_every-th call after it, or any
+        call with full=True) reads the whole worksheet. In between, one
+        batched request reads the Status column and the columns that
+        identify an order (any ID column plus the fingerprint columns:
+        Date, Hour, Booth #, Exhibitor Name, Item, Color, ...) for the rows
+        already held, plus any rows appended past the row-count watermark.
+        A row whose status alone changed is parsed again and keeps its ID.
+        A row whose identifying cells changed - edited, or shifted by rows
+        inserted, deleted or sorted above it - is re-read in full with a
+        second request, and the held grid is then parsed again so every
+        ID matches a full read. When too many rows need re-reading the
+        sync falls back to a full read instead.
+        
+        Trade-off: edits to cells outside those columns (Quantity,
+        Comments) on a row that is otherwise unchanged are only picked up
+        by the next full read, so they can lag by up to full_resync_every
+        syncs. Pass full=True (or call reset_sync) to see them right away.
+        
+        Args:
+            sheet_id: Google Sheet ID
+            worksheet_name: Name of the worksheet
+            full: Read the whole worksheet even if an incremental sync is due
+            
+        Returns:
+            List of orders, same as parse_orders_data on the full grid but held
+            as CompactOrder records
+            
+        Raises:
+            Exception: If the sheet could not be read (FetchRefused if the
+                scheduler held the request back)
+        """
+        key = (sheet_id, worksheet_name)
+        
+        with self._sync_lock:
+            state = self._sync_state.get(key)
+            if not full and state is not None and state['syncs_since_full'] < self.full_resync_every:
+                try:
+                    orders = self._incremental_sync(sheet_id, worksheet_name, state)
+                    if orders is not None:
+                        return orders
+                except FetchRefused:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Incremental sync of {worksheet_name} failed, reading full sheet: {e}")
+            
+            return self._full_sync(sheet_id, worksheet_name)
+    
+    def reset_sync(self):
+        """Forget every held grid, so the next sync_orders/sync_tabs call reads everything again"""
+        with self._sync_lock:
+            self._sync_state.clear()
+            self._batch_state.clear()
+    
+    def _full_sync(self, sheet_id: str, worksheet_name: str) -> List[Dict]:
+        """Read the whole worksheet and reset the sync state for it"""
+        key = (sheet_id, worksheet_name)
+        self._sync_state.pop(key, None)
+        
+        data = self.get_data(sheet_id, worksheet_name, raise_errors=True)
+        if not data or len(data) < 2:
+            self.last_sync = {'mode': 'full', 'rows_fetched': len(data), 'rows_parsed': 0, 'changed': True}
+            return []
+        
+        headers, header_row_idx = self._find_headers(data)
+        with PARSE_SECONDS.time(mode='full'):
+            orders_by_row, ids_seen = self._parse_grid(data, headers, header_row_idx)
+        ROWS_PARSED.inc(len(data) - header_row_idx - 1, mode='full')
+        
+        self._sync_state[key] = {
+            'grid': data,
+            'headers': headers,
+            'header_row_idx': header_row_idx,
+            'orders_by_row': orders_by_row,
+            'ids_seen': ids_seen,
+            'syncs_since_full': 0
+        }
+        self.last_sync = {
+            'mode': 'full',
+            'rows_fetched': len(data),
+            'rows_parsed': len(data) - header_row_idx - 1,
+            'changed': True
+        }
+        
+        logger.info(f"Full sync of {worksheet_name}: {len(orders_by_row)} orders")
+        return list(orders_by_row.values())
+    
+    def _parse_grid(self, grid: List[List], headers: List[str], header_row_idx: int) -> Tuple[Dict, Dict]:
+        """Parse every row below the header: (row index -> CompactOrder, ID occurrence counts)"""
+        parse = self.row_parser(headers).parse
+        orders_by_row = {}
+        ids_seen = {}
+        for row_idx in range(header_row_idx + 1, len(grid)):
+            order = parse(grid[row_idx], row_idx, seen=ids_seen)
+            if order is not None:
+                orders_by_row[row_idx] = compact_order(order)
+        return orders_by_row, ids_seen
+    
+    def _incremental_sync(self, sheet_id: str, worksheet_name: str, state: Dict) -> Optional[List[Dict]]:
+        """
+        Apply status changes, identity changes and appended rows to the cached grid
+        
+        Returns:
+            Updated order list, or None when a full read is needed
+        """
+        headers = state['headers']
+        identity_cols = [i for i, name in enumerate(headers) if name in IDENTITY_COLUMNS]
+        if 'Status' not in headers or not identity_cols:
+            return None
+        
+        from gspread.utils import rowcol_to_a1
+        
+        grid = state['grid']
+        orders_by_row = state['orders_by_row']
+        status_col = headers.index('Status')
+        
+        # Sheet rows are 1-based; grid index i is sheet row i + 1
+        first_row = state['header_row_idx'] + 2
+        last_row = len(grid)
+        last_col = rowcol_to_a1(1, len(headers)).rstrip('0123456789')
+        held_rows = max(last_row - first_row + 1, 0)
+        
+        # One range per run of adjacent columns, so the checked cells come back in few ranges
+        column_runs = _runs(sorted(set(identity_cols) | {status_col}))
+        ranges = [f"A{last_row + 1}:{last_col}"]
+        if held_rows:
+            ranges.extend(
+                f"{rowcol_to_a1(first_row, start + 1)}:{rowcol_to_a1(last_row, end + 1)}"
+                for start, end in column_runs
+            )
+        
+        results = self._values_request('batch_get', sheet_id, worksheet_name, lambda ws: ws.batch_get(ranges))
+        appended = list(results[0])
+        SHEETS_ROWS_FETCHED.observe(sum(len(values) for values in results), call='batch_get')
+        
+        changed_rows = []
+        moved_rows = []
+        if held_rows and len(results) == len(column_runs) + 1:
+            # Checked cells of each held row, keyed by column index
+            fetched = [{} for _ in range(held_rows)]
+            for (start, end), value_range in zip(column_runs, results[1:]):
+                for offset, cells in enumerate(_range_rows(value_range, held_rows)):
+                    for col in range(start, end + 1):
+                        fetched[offset][col] = str(cells[col - start]) if col - start < len(cells) else ''
+            
+            for offset, cells in enumerate(fetched):
+                row = grid[first_row - 1 + offset]
+                if any(cells[col] != _cell(row, col) for col in identity_cols):
+                    moved_rows.append(first_row - 1 + offset)
+                elif cells[status_col] != _cell(row, status_col):
+                    while len(row) <= status_col:
+                        row.append('')
+                    row[status_col] = cells[status_col]
+                    changed_rows.append(first_row - 1 + offset)
+        
+        if moved_rows:
+            row_runs = _runs(moved_rows)
+            if len(moved_rows) > held_rows * MAX_REREAD_FRACTION or len(row_runs) > MAX_REREAD_RANGES:
+                logger.info(f"{len(moved_rows)} rows changed identity in {worksheet_name}, falling back to full sync")
+                return None
+            
+            # Sheet row of grid index i is i + 1
+            row_ranges = [f"A{start + 1}:{last_col}{end + 1}" for start, end in row_runs]
+            reread = self._values_request(
+                'batch_get', sheet_id, worksheet_name, lambda ws: ws.batch_get(row_ranges)
+            )
+            SHEETS_ROWS_FETCHED.observe(sum(len(values) for values in reread), call='batch_get')
+            for (start, end), value_range in zip(row_runs, reread):
+                for offset, cells in enumerate(_range_rows(value_range, end - start + 1)):
+                    grid[start + offset] = list(cells)
+        
+        grid.extend(list(row) for row in appended)
+        rows_parsed = len(changed_rows) + len(appended)
+        
+        with PARSE_SECONDS.time(mode='incremental'):
+            if moved_rows:
+                # Rows changed identity: parse the whole held grid again so
+                # duplicate suffixes come out exactly as a full read gives them
+                orders_by_row, ids_seen = self._parse_grid(grid, headers, state['header_row_idx'])
+                state['orders_by_row'], state['ids_seen'] = orders_by_row, ids_seen
+                rows_parsed = len(grid) - state['header_row_idx'] - 1
+            else:
+                self._apply_row_changes(state, changed_rows, len(grid) - len(appended))
+        ROWS_PARSED.inc(rows_parsed, mode='incremental')
+        
+        state['syncs_since_full'] += 1
+        self.last_sync = {
+            'mode': 'incremental',
+            'rows_fetched': len(appended) + len(moved_rows),
+            'status_cells_fetched': held_rows,
+            'rows_reread': len(moved_rows),
+            'rows_parsed': rows_parsed,
+            'changed': bool(changed_rows or moved_rows or appended)
+        }
+        
+        if self.last_sync['changed']:
+            logger.info(
+                f"Incremental sync of {worksheet_name}: {len(changed_rows)} status changes, "
+                f"{len(moved_rows)} rows re-read, {len(appended)} new rows"
+            )
+        return list(state['orders_by_row'].values())
+    
+    def _apply_row_changes(self, state: Dict, changed_rows: List[int], appended_from: int):
+        """Parse rows whose status changed and rows appended from grid index appended_from"""
+        grid = state['grid']
+        orders_by_row = state['orders_by_row']
+        parse = self.row_parser(state['headers']).parse
+        ids_seen = state['ids_seen']
+        reorder = False
+        
+        for row_idx in changed_rows:
+            previous = orders_by_row.get(row_idx)
+            # A status edit keeps the order's ID, including any duplicate suffix
+            order = parse(grid[row_idx], row_idx, seen=None if previous else ids_seen)
+            if order is None:
+                orders_by_row.pop(row_idx, None)
+            else:
+                if previous is not None:
+                    order['id'] = previous.id
+                reorder = reorder or previous is None
+                orders_by_row[row_idx] = compact_order(order)
+        
+        for row_idx in range(appended_from, len(grid)):
+            order = parse(grid[row_idx], row_idx, seen=ids_seen)
+            if order is not None:
+                orders_by_row[row_idx] = compact_order(order)
+        
+        if reorder:
+            state['orders_by_row'] = dict(sorted(orders_by_row.items()))
+    
+    def get_tabs_data(self, sheet_id: str, worksheet_names: List[str],
+                      raise_errors: bool = False) -> Dict[str, List[List]]:
+        """
+        Get the values of several worksheets in one batched values request
+        
+        Args:
+            sheet_id: Google Sheet ID
+            worksheet_names: Names of the worksheets
+            raise_errors: Raise request failures (and FetchRefused) instead
+                of logging them and returning {}
+            
+        Returns:
+            Worksheet name -> list of lists with its data (rows trimmed of
+            trailing empty cells), or an empty dict if the request failed
+        """
+        try:
+            if not self.gc:
+                raise Exception("Google Sheets client not initialized")
+            
+            # A bare quoted tab name selects the whole tab
+            ranges = ["'" + name.replace("'", "''") + "'" for name in worksheet_names]
+            response = self._timed_request(
+                'values_batch_get',
+                lambda: self.with_spreadsheet(sheet_id, lambda sh: sh.values_batch_get(ranges))
+            )
+            value_ranges = response.get('valueRanges', [])
+            if len(value_ranges) != len(worksheet_names):
+                raise Exception(f"Expected {len(worksheet_names)} ranges, got {len(value_ranges)}")
+            
+            data = {
+                name: value_range.get('values', [])
+                for name, value_range in zip(worksheet_names, value_ranges)
+            }
+            SHEETS_ROWS_FETCHED.observe(sum(len(values) for values in data.values()), call='values_batch_get')
+            
+            logger.info(f"Successfully loaded {len(worksheet_names)} worksheets in one request: "
+                        + ', '.join(f"{name} ({len(values)} rows)" for name, values in data.items()))
+            return data
+            
+        except FetchRefused as e:
+            logger.warning(f"Skipped reading worksheets {worksheet_names}: {e}")
+            if raise_errors:
+                raise
+            return {}
+        except Exception as e:
+            logger.error(f"Error getting data from worksheets {worksheet_names}: {e}")
+            if raise_errors:
+                raise
+            return {}
+    
+    def sync_tabs(self, sheet_id: str, worksheet_names: List[str]) -> List[Dict]:
+        """
+        Get the orders of several worksheets merged into one list
+        
+        Every refresh is a single batched values request for all the tabs.
+        Each tab is parsed with its own header row, and its orders are tagged
+        with 'source_tab' and an ID that includes the tab name. When no tab
+        changed since the last call, the previous orders are returned as-is
+        and last_sync reports changed=False.
+        
+        Args:
+            sheet_id: Google Sheet ID
+            worksheet_names: Names of the worksheets, in merge order
+            
+        Returns:
+            List of orders held as CompactOrder records, tab by tab
+            
+        Raises:
+            Exception: If the worksheets could not be read (FetchRefused if
+                the scheduler held the request back)
+        """
+        key = (sheet_id, tuple(worksheet_names))
+        
+        with self._sync_lock:
+            data = self.get_tabs_data(sheet_id, worksheet_names, raise_errors=True)
+            rows_fetched = sum(len(values) for values in data.values())
+            if not data:
+                self._batch_state.pop(key, None)
+                self.last_sync = {'mode': 'batch', 'tabs': 0, 'rows_fetched': 0, 'rows_parsed': 0, 'changed': True}
+                return []
+            
+            state = self._batch_state.get(key)
+            if state is not None and state['data'] == data:
+                self.last_sync = {
+                    'mode': 'batch',
+                    'tabs': len(data),
+                    'rows_fetched': rows_fetched,
+                    'rows_parsed': 0,
+                    'changed': False
+                }
+                return list(state['orders'])
+            
+            orders = []
+            rows_parsed = 0
+            ids_seen = {}
+            with PARSE_SECONDS.time(mode='batch'):
+                for name, values in data.items():
+                    if len(values) < 2:
+                        continue
+                    headers, header_row_idx = self._find_headers(values)
+                    parse = self.row_parser(headers).parse
+                    for row_idx in range(header_row_idx + 1, len(values)):
+                        order = parse(values[row_idx], row_idx, tab=name, seen=ids_seen)
+                        if order is not None:
+                            orders.append(compact_order(order))
+                    rows_parsed += len(values) - header_row_idx - 1
+            ROWS_PARSED.inc(rows_parsed, mode='batch')
+            
+            self._batch_state[key] = {'data': data, 'orders': orders}
+            self.last_sync = {
+                'mode': 'batch',
+                'tabs': len(data),
+                'rows_fetched': rows_fetched,
+                'rows_parsed': rows_parsed,
+                'changed': True
+            }
+            
+            logger.info(f"Batch sync of {len(data)} worksheets: {len(orders)} orders")
+            return list(orders)
+    
     def get_worksheets(self, sheet_id: str) -> List[str]:
         """
         Get list of worksheet names
@@ -96,7 +705,7 @@ class GoogleSheetsManager:
             if not self.gc:
                 return []
             
-            spreadsheet = self.gc.open_by_key(sheet_id)
+            spreadsheet = self.get_spreadsheet(sheet_id)
             worksheets = [ws.title for ws in spreadsheet.worksheets()]
             
             logger.info(f"Found worksheets: {worksheets}")
@@ -116,17 +725,7 @@ class GoogleSheetsManager:
         Returns:
             Mapped status for API
         """
-        status_mapping = {
-            'Delivered': 'delivered',
-            'Received': 'delivered',
-            'Out for delivery': 'out-for-delivery',
-            'In route from warehouse': 'in-route',
-            'In Process': 'in-process',
-            'cancelled': 'cancelled',
-            'Cancelled': 'cancelled'
-        }
-        
-        return status_mapping.get(sheet_status, 'in-process')
+        return STATUS_MAPPING.get(sheet_status, DEFAULT_STATUS)
     
     def parse_orders_data(self, data: List[List]) -> List[Dict]:
         """
@@ -144,68 +743,19 @@ class GoogleSheetsManager:
             if not data or len(data) < 2:
                 return []
             
-            # Find header row (look for 'Booth' column)
-            header_row_idx = 0
-            headers = []
-            
-            for i, row in enumerate(data):
-                if any('Booth' in str(cell) for cell in row):
-                    headers = [str(cell).strip() for cell in row]
-                    header_row_idx = i
-                    break
-            
-            if not headers:
-                # Use first row as headers if no 'Booth' found
-                headers = [str(cell).strip() for cell in data[0]]
-                header_row_idx = 0
+            headers, header_row_idx = self._find_headers(data)
             
             logger.info(f"Using headers: {headers}")
             
             # Process data rows
-            for row_idx, row in enumerate(data[header_row_idx + 1:], start=header_row_idx + 1):
-                if not row or len(row) == 0:
-                    continue
-                
-                # Create dictionary from row data
-                row_dict = {}
-                for i, value in enumerate(row):
-                    if i < len(headers):
-                        row_dict[headers[i]] = str(value).strip()
-                
-                # Extract order data
-                booth_num = row_dict.get('Booth #', '').strip()
-                exhibitor_name = row_dict.get('Exhibitor Name', '').strip()
-                item = row_dict.get('Item', '').strip()
-                
-                # Skip rows without essential data
-                if not booth_num or not exhibitor_name:
-                    continue
-                
-                # Create order ID
-                date = row_dict.get('Date', '').strip()
-                order_id = f"ORD-{date.replace('/', '-')}-{booth_num}-{row_idx}"
-                
-                # Build order dictionary
-                order = {
-                    'id': order_id,
-                    'booth_number': booth_num,
-                    'exhibitor_name': exhibitor_name,
-                    'item': item,
-                    'description': f"Order from Google Sheets: {item}",
-                    'color': row_dict.get('Color', '').strip(),
-                    'quantity': self._safe_int(row_dict.get('Quantity', '1')),
-                    'status': self.map_order_status(row_dict.get('Status', '').strip()),
-                    'order_date': date,
-                    'comments': row_dict.get('Comments', '').strip(),
-                    'section': row_dict.get('Section', '').strip(),
-                    'type': row_dict.get('Type', '').strip(),
-                    'user': row_dict.get('User', '').strip(),
-                    'hour': row_dict.get('Hour', '').strip(),
-                    'abacus_ai_processed': True,
-                    'data_source': 'Google Sheets via Abacus AI'
-                }
-                
-                orders.append(order)
+            parse = self.row_parser(headers).parse
+            ids_seen = {}
+            with PARSE_SECONDS.time(mode='full'):
+                for row_idx in range(header_row_idx + 1, len(data)):
+                    order = parse(data[row_idx], row_idx, seen=ids_seen)
+                    if order is not None:
+                        orders.append(order)
+            ROWS_PARSED.inc(len(data) - header_row_idx - 1, mode='full')
             
             logger.info(f"Parsed {len(orders)} valid orders from Google Sheets")
             return orders
@@ -214,12 +764,64 @@ class GoogleSheetsManager:
             logger.error(f"Error parsing orders data: {e}")
             return []
     
+    def _find_headers(self, data: List[List]) -> Tuple[List[str], int]:
+        """
+        Locate the header row of a raw sheet grid
+        
+        Args:
+            data: List of lists with raw sheet data
+            
+        Returns:
+            Tuple of (stripped header names, index of the header row)
+        """
+        # Find header row (look for 'Booth' column)
+        for i, row in enumerate(data):
+            if any('Booth' in str(cell) for cell in row):
+                return [str(cell).strip() for cell in row], i
+        
+        # Use first row as headers if no 'Booth' found
+        return [str(cell).strip() for cell in data[0]], 0
+    
+    def parse_order_row(self, headers: List[str], row: List, row_idx: int, tab: str = None) -> Optional[Dict]:
+        """
+        Convert one raw sheet row into an order dictionary
+        
+        Args:
+            headers: Header names from the sheet's header row
+            row: Raw cell values for the row
+            row_idx: 0-based index of the row in the sheet grid
+            tab: Worksheet the row came from, when orders are merged across tabs
+            
+        Returns:
+            Order dictionary, or None if the row lacks a booth or exhibitor.
+            Parsed on its own, the row gets no duplicate suffix (see RowParser)
+        """
+        return self.row_parser(headers).parse(row, row_idx, tab)
+    
+    def row_parser(self, headers: List[str]) -> RowParser:
+        """
+        RowParser compiled for this header row, reused while the headers stay the same
+        
+        One parser is kept per distinct header row, so tabs with different
+        column layouts do not recompile each other's parser.
+        
+        Args:
+            headers: Header names from the sheet's header row
+            
+        Returns:
+            RowParser for the headers
+        """
+        key = tuple(headers)
+        parser = self._row_parsers.get(key)
+        if parser is None:
+            if len(self._row_parsers) >= MAX_ROW_PARSERS:
+                self._row_parsers.clear()
+            parser = self._row_parsers[key] = RowParser(headers)
+        return parser
+    
     def _safe_int(self, value, default=1):
         """Safely convert value to int"""
-        try:
-            return int(float(str(value))) if value else default
-        except (ValueError, TypeError):
-            return default
+        return parse_quantity(value, default)
     
     def get_orders_for_exhibitor(self, sheet_id: str, exhibitor_name: str) -> List[Dict]:
         """
@@ -298,6 +900,33 @@ class GoogleSheetsManager:
             logger.error(f"Error getting exhibitors: {e}")
             return []
 
+def _is_stale_handle_error(error: Exception) -> bool:
+    """True for API errors a stale handle causes: not found (404), or a bad range (400) after a tab rename"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 404:
+        return True
+    return status == 400 and 'range' in str(error).lower()
+
+def _cell(row: List, col: int) -> str:
+    """Value of a grid cell, treating missing trailing cells as empty"""
+    return str(row[col]) if col < len(row) else ''
+
+def _range_rows(value_range: List[List], length: int) -> List[List]:
+    """Rows of a ROWS range padded with empty rows to exactly length (the API drops trailing empty rows)"""
+    rows = list(value_range[:length])
+    rows.extend([] for _ in range(length - len(rows)))
+    return rows
+
+def _runs(indexes: List[int]) -> List[Tuple[int, int]]:
+    """Sorted indexes grouped into (first, last) runs of consecutive values"""
+    runs = []
+    for index in indexes:
+        if runs and index == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], index)
+        else:
+            runs.append((index, index))
+    return runs
+
 # Example usage and testing
 def test_sheets_integration():
     """Test the Google Sheets integration"""
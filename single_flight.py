@@ -0,0 +1,98 @@
+# single_flight.py
+# Collapses concurrent identical loads into one in-flight call per key
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A single in-flight call that other callers can wait on"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time.
+
+    The first caller for a key executes the function; every caller that
+    arrives while it is still running waits for that result instead of
+    starting its own call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'errors': 0
+        }
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Execute fn for key, or wait for the call already in flight
+
+        Args:
+            key: Identity of the load (e.g. the cache key)
+            fn: Zero-argument callable doing the actual work
+
+        Returns:
+            The result of fn, shared by every coalesced caller
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.info(f"Coalesced {call.waiters} waiting callers onto load of {key}")
+
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        """Return True while a call for key is running"""
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the call/coalescing counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
@@ -0,0 +1,274 @@
+# snapshot_file.py
+# Durable, compact copy of the last good order snapshot for instant warm restarts
+
+import gc
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Dict, Optional
+
+from compact_order import CompactOrder
+from snapshot_store import StoredSnapshot
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EXOSNAP\0'
+# Bump whenever the layout below, the CompactOrder fields or the way order
+# IDs are derived change; files written with another schema are ignored and
+# replaced on the next refresh. 2: content-derived order IDs
+SCHEMA_VERSION = 2
+
+# CompactOrder constructor arguments, in file column order
+FIELDS = CompactOrder.__slots__
+STRING_FIELDS = tuple(field for field in FIELDS if field != 'quantity')
+
+# magic, schema version, header length
+_PREAMBLE = struct.Struct('<8sHI')
+_CHECKSUM = struct.Struct('<I')
+
+# String table index 0 stands for None (orders without a source tab)
+_NONE_INDEX = 0
+
+
+class SnapshotFileError(ValueError):
+    """A snapshot file that cannot be read back (corrupt, truncated or another schema)"""
+
+
+def encode_snapshot(snapshot) -> bytes:
+    """
+    Serialize a snapshot of CompactOrder records
+
+    Columns are stored as arrays of indexes into one table of distinct
+    strings, so repeated values (statuses, booths, exhibitor names) are
+    written once and the file is a fraction of the JSON size.
+
+    Raises:
+        SnapshotFileError: If an order is not a CompactOrder with string
+            fields and an integer quantity
+    """
+    strings: Dict[str, int] = {}
+    table = [None]
+    columns = {field: array('I') for field in STRING_FIELDS}
+    quantities = array('q')
+
+    for order in snapshot.orders:
+        if not isinstance(order, CompactOrder):
+            raise SnapshotFileError(f"Cannot persist order of type {type(order).__name__}")
+        for field in STRING_FIELDS:
+            value = getattr(order, field)
+            if value is None and field == 'source_tab':
+                columns[field].append(_NONE_INDEX)
+                continue
+            if type(value) is not str:
+                raise SnapshotFileError(f"Order {order.id!r} has non-text {field}")
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(table)
+                table.append(value)
+            columns[field].append(index)
+        try:
+            if type(order.quantity) is not int:
+                raise TypeError
+            quantities.append(order.quantity)
+        except (TypeError, OverflowError):
+            raise SnapshotFileError(f"Order {order.id!r} has a quantity that is not a 64-bit integer")
+
+    lengths = array('I', (len(value) for value in table[1:]))
+    text = ''.join(table[1:]).encode('utf-8')
+    header = json.dumps({
+        'version': snapshot.version,
+        'source': snapshot.source,
+        'created_at': snapshot.created_at,
+        'orders': len(snapshot.orders),
+        'strings': len(lengths),
+        'text_bytes': len(text),
+        'fields': FIELDS,
+        'byteorder': sys.byteorder
+    }, separators=(',', ':')).encode('utf-8')
+
+    parts = [_PREAMBLE.pack(MAGIC, SCHEMA_VERSION, len(header)), header, lengths.tobytes(), text]
+    for field in FIELDS:
+        parts.append(quantities.tobytes() if field == 'quantity' else columns[field].tobytes())
+    data = b''.join(parts)
+    return data + _CHECKSUM.pack(zlib.crc32(data))
+
+
+def decode_snapshot(data: bytes):
+    """
+    Read back encode_snapshot output
+
+    Returns:
+        (orders, header) with the CompactOrder list and the header dict
+        ('version', 'source', 'created_at', ...)
+
+    Raises:
+        SnapshotFileError: If the data is corrupt or has another schema
+    """
+    if len(data) < _PREAMBLE.size + _CHECKSUM.size:
+        raise SnapshotFileError("File too short")
+    magic, schema, header_size = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotFileError("Not an order snapshot file")
+    if schema != SCHEMA_VERSION:
+        raise SnapshotFileError(f"Schema version {schema}, expected {SCHEMA_VERSION}")
+    (checksum,) = _CHECKSUM.unpack_from(data, len(data) - _CHECKSUM.size)
+    body = memoryview(data)[:len(data) - _CHECKSUM.size]
+    if zlib.crc32(body) != checksum:
+        raise SnapshotFileError("Checksum mismatch")
+
+    offset = _PREAMBLE.size
+    try:
+        header = json.loads(bytes(body[offset:offset + header_size]))
+        count, string_count = header['orders'], header['strings']
+        if tuple(header['fields']) != FIELDS:
+            raise SnapshotFileError("Order fields changed since the file was written")
+    except (ValueError, KeyError, TypeError) as e:
+        raise SnapshotFileError(f"Bad header: {e}")
+    offset += header_size
+    swap = header['byteorder'] != sys.byteorder
+
+    def read_array(typecode, length):
+        nonlocal offset
+        values = array(typecode)
+        end = offset + length * values.itemsize
+        if end > len(body):
+            raise SnapshotFileError("File truncated")
+        values.frombytes(body[offset:end])
+        if swap:
+            values.byteswap()
+        offset = end
+        return values
+
+    lengths = read_array('I', string_count)
+    text = bytes(body[offset:offset + header['text_bytes']]).decode('utf-8')
+    offset += header['text_bytes']
+    ends = list(accumulate(lengths))
+    table = [None] + [text[start:end] for start, end in zip([0] + ends, ends)]
+
+    columns = []
+    for field in FIELDS:
+        if field == 'quantity':
+            columns.append(read_array('q', count))
+        else:
+            columns.append(map(table.__getitem__, read_array('I', count)))
+    if offset != len(body):
+        raise SnapshotFileError("Unexpected trailing data")
+
+    # Cyclic GC passes triggered by the burst of allocations would otherwise
+    # take longer than building the records (none of which form cycles)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        orders = list(map(CompactOrder, *columns))
+    except (IndexError, TypeError):
+        raise SnapshotFileError("String index out of range")
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return orders, header
+
+
+class SnapshotFile:
+    """
+    The last good Sheets snapshot, kept on disk across restarts.
+
+    Written atomically (temp file, fsync, os.replace) after every refresh
+    that built a new snapshot; refreshes that found nothing new only bump
+    the file's mtime, which records when the data was last confirmed
+    against Sheets. A process starting up reads it back in one pass over
+    the columns, so it can serve real orders (flagged with their age)
+    while its first fetch is still running. Unlike the shared snapshot
+    store it should live on a disk that survives redeploys.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: File to keep the snapshot in (its directory is created if needed)
+        """
+        self.path = path
+        self._stats = {'writes': 0, 'loads': 0, 'errors': 0, 'bytes': 0,
+                       'last_write_seconds': None, 'last_load_seconds': None}
+
+    def save(self, snapshot) -> bool:
+        """
+        Persist a snapshot, replacing the previous file
+
+        Returns:
+            True if written; False if the snapshot cannot be persisted or
+            the write failed (logged, never raised)
+        """
+        started = time.perf_counter()
+        tmp_path = None
+        try:
+            data = encode_snapshot(snapshot)
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.orders-', dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            tmp_path = None
+        except (OSError, SnapshotFileError) as e:
+            self._stats['errors'] += 1
+            logger.error(f"Could not persist order snapshot to {self.path}: {e}")
+            return False
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+        self._stats['writes'] += 1
+        self._stats['bytes'] = len(data)
+        self._stats['last_write_seconds'] = round(time.perf_counter() - started, 4)
+        return True
+
+    def touch(self):
+        """Mark the persisted snapshot as freshly confirmed against Sheets"""
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+
+    def load(self) -> Optional[StoredSnapshot]:
+        """
+        Read the persisted snapshot
+
+        Returns:
+            StoredSnapshot whose written_at is when the data was last
+            confirmed and whose token is its content version, or None if
+            there is no usable file
+        """
+        started = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as f:
+                written_at = os.fstat(f.fileno()).st_mtime
+                data = f.read()
+            orders, header = decode_snapshot(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, SnapshotFileError) as e:
+            self._stats['errors'] += 1
+            logger.warning(f"Ignoring persisted snapshot {self.path}: {e}")
+            return None
+
+        self._stats['loads'] += 1
+        self._stats['bytes'] = len(data)
+        self._stats['last_load_seconds'] = round(time.perf_counter() - started, 4)
+        return StoredSnapshot(orders, header['source'], header['created_at'], written_at, header['version'])
+
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats['path'] = self.path
+        return stats
@@ -0,0 +1,247 @@
+# snapshot_store.py
+# Shared home for the order snapshot so one Sheets fetch feeds every worker process
+
+import fcntl
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from compact_order import json_default
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored orders change shape or their IDs are derived
+# differently; other formats are ignored. 2: content-derived order IDs
+STORE_FORMAT = 2
+
+# token() reads the content version from the head of the file ('format'
+# and 'version' are written first), without decoding the orders
+HEAD_BYTES = 256
+_VERSION_RE = re.compile(rb'"version":"([0-9A-Za-z_-]+)"')
+
+
+class StoredSnapshot:
+    """Orders read back from a snapshot store"""
+
+    __slots__ = ('orders', 'source', 'created_at', 'written_at', 'token')
+
+    def __init__(self, orders: List[Dict], source: str, created_at: float, written_at: float, token):
+        self.orders = orders
+        self.source = source
+        self.created_at = created_at
+        self.written_at = written_at
+        self.token = token
+
+
+class LocalSnapshotStore:
+    """
+    In-process stand-in for a shared store.
+
+    Nothing is shared between processes; used for single-process runs and
+    wherever a shared filesystem is not available.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._record: Optional[StoredSnapshot] = None
+        self._writes = 0
+
+    def token(self):
+        """Changes whenever a different snapshot is written; None when empty"""
+        record = self._record
+        return record.token if record is not None else None
+
+    def written_at(self) -> float:
+        """When the stored snapshot was last confirmed against Sheets (0 if empty)"""
+        record = self._record
+        return record.written_at if record is not None else 0.0
+
+    def read(self) -> Optional[StoredSnapshot]:
+        return self._record
+
+    def write(self, snapshot):
+        with self._lock:
+            self._writes += 1
+            self._record = StoredSnapshot(
+                list(snapshot.orders), snapshot.source, snapshot.created_at, time.time(), self._writes
+            )
+            return self._record.token
+
+    def touch(self):
+        """Mark the stored snapshot as freshly confirmed against Sheets"""
+        record = self._record
+        if record is not None:
+            record.written_at = time.time()
+
+    def invalidate(self):
+        self._record = None
+
+    @contextmanager
+    def lock(self, timeout: float = None):
+        # The in-process SingleFlight already serializes loads
+        yield True
+
+    def stats(self) -> Dict:
+        return {'backend': 'local', 'writes': self._writes, 'has_snapshot': self._record is not None}
+
+
+class FileSnapshotStore:
+    """
+    Snapshot shared through a file, typically on tmpfs (/dev/shm).
+
+    The worker holding an exclusive flock on '<path>.lock' is the leader
+    for one fetch: it reads Google Sheets and replaces the file atomically
+    (write to a temp file, then os.replace). Other workers blocked on the
+    lock wake up, see the fresh file and load it instead of fetching. The
+    file's mtime is when the data was last confirmed against Sheets. The
+    snapshot's content version, written at the start of the file, identifies
+    which snapshot it holds (inode and size can repeat across writes).
+    """
+
+    shared = True
+
+    def __init__(self, path: str, lock_timeout: float = 60):
+        """
+        Args:
+            path: Snapshot file path, on a filesystem all workers can see
+            lock_timeout: Seconds to wait for the leader before fetching anyway
+        """
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.lock_timeout = lock_timeout
+        self._stats = {'writes': 0, 'reads': 0, 'lock_waits': 0, 'lock_timeouts': 0}
+
+    def token(self):
+        """Changes whenever a different snapshot is written; None when empty"""
+        try:
+            with open(self.path, 'rb') as f:
+                head = f.read(HEAD_BYTES)
+                match = _VERSION_RE.search(head)
+                if match:
+                    return match.group(1).decode('ascii')
+                # Not a file this class wrote: fall back to its identity on disk
+                st = os.fstat(f.fileno())
+                return (st.st_ino, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def written_at(self) -> float:
+        """When the stored snapshot was last confirmed against Sheets (0 if empty)"""
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def read(self) -> Optional[StoredSnapshot]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                st = os.fstat(f.fileno())
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable snapshot file {self.path}: {e}")
+            return None
+
+        if record.get('format') != STORE_FORMAT:
+            logger.warning(f"Ignoring snapshot file {self.path} with format {record.get('format')}")
+            return None
+
+        self._stats['reads'] += 1
+        return StoredSnapshot(
+            record['orders'], record['source'], record['created_at'],
+            st.st_mtime, record['version']
+        )
+
+    def write(self, snapshot):
+        record = {
+            'format': STORE_FORMAT,
+            'version': snapshot.version,
+            'source': snapshot.source,
+            'created_at': snapshot.created_at,
+            'orders': snapshot.orders
+        }
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f, separators=(',', ':'), default=json_default)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._stats['writes'] += 1
+        return self.token()
+
+    def touch(self):
+        """Mark the stored snapshot as freshly confirmed against Sheets"""
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def lock(self, timeout: float = None):
+        """
+        Hold the cross-process leader lock
+
+        Yields:
+            True if the lock was acquired, False if the wait timed out
+        """
+        timeout = self.lock_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with open(self.lock_path, 'a+') as lock_file:
+            acquired = False
+            waited = False
+            while True:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        break
+                    waited = True
+                    time.sleep(0.05)
+
+            if waited:
+                self._stats['lock_waits'] += 1
+            if not acquired:
+                self._stats['lock_timeouts'] += 1
+                logger.warning(f"Timed out waiting for snapshot lock {self.lock_path}")
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats['backend'] = 'file'
+        stats['path'] = self.path
+        stats['has_snapshot'] = self.token() is not None
+        return stats
+
+
+def default_store_path() -> str:
+    """Snapshot file location: tmpfs when available, else the temp directory"""
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'exhibitor-orders-snapshot.json')
@@ -0,0 +1,88 @@
+# stats_history.py
+# Bounded ring buffer of periodic order status-count samples behind /api/stats/history
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+
+class StatsHistory:
+    """
+    Status counts over time, one sample per interval.
+
+    Samples are aligned to interval boundaries. Recording again within the
+    same interval overwrites that interval's sample, so it always holds
+    the latest counts seen in it, and recording on every snapshot change
+    as well as on a timer never adds more than one sample per interval.
+    Each sample is a timestamp plus a tuple of counts in a fixed key
+    order, so a day of minute samples takes well under a megabyte.
+    """
+
+    def __init__(self, keys: Sequence[str], interval: float = 60, capacity: int = 1440):
+        """
+        Args:
+            keys: Count names recorded from each stats dict, in output order
+            interval: Seconds covered by one sample
+            capacity: Samples kept; the oldest are dropped beyond it
+        """
+        self.keys = tuple(keys)
+        self.interval = max(float(interval), 1.0)
+        self.capacity = max(int(capacity), 1)
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=self.capacity)
+
+    def record(self, stats: Dict[str, int], now: float = None) -> bool:
+        """
+        Record the counts of a stats dict for the current interval
+
+        Returns:
+            True if a new sample was started, False if the interval's
+            sample was updated
+        """
+        now = time.time() if now is None else now
+        start = now - now % self.interval
+        counts = tuple(stats.get(key, 0) for key in self.keys)
+        with self._lock:
+            if self._samples and self._samples[-1][0] == start:
+                self._samples[-1] = (start, counts)
+                return False
+            self._samples.append((start, counts))
+            return True
+
+    def samples(self, since: float = None, limit: int = None) -> List[Dict]:
+        """
+        Recorded samples, oldest first
+
+        Args:
+            since: Only samples whose interval starts after this Unix time
+            limit: Only the newest limit samples
+
+        Returns:
+            Dicts with 'timestamp' (ISO start of the interval) and every count
+        """
+        with self._lock:
+            samples = list(self._samples)
+        if since is not None:
+            samples = [sample for sample in samples if sample[0] > since]
+        if limit is not None:
+            samples = samples[-limit:] if limit else []
+
+        results = []
+        for start, counts in samples:
+            sample = {'timestamp': datetime.fromtimestamp(start).isoformat()}
+            sample.update(zip(self.keys, counts))
+            results.append(sample)
+        return results
+
+    def latest(self) -> Optional[float]:
+        """Start time of the newest sample, or None before the first one"""
+        with self._lock:
+            return self._samples[-1][0] if self._samples else None
+
+    def __len__(self):
+        return len(self._samples)
+
+    def stats(self) -> Dict:
+        return {'samples': len(self._samples), 'capacity': self.capacity, 'interval': self.interval}
@@ -0,0 +1,116 @@
+# test_bounded_cache.py
+# LRU/TTL eviction of the response cache, with pinned entries exempt
+
+import time
+
+from bounded_cache import BoundedCache
+
+
+class Blob:
+    """Cached value with a fixed reported size"""
+
+    def __init__(self, size):
+        self.size = size
+
+    def nbytes(self):
+        return self.size
+
+
+def test_least_recently_used_entry_goes_first():
+    cache = BoundedCache(max_entries=3)
+    for key in 'abc':
+        cache.set(key, key)
+    assert cache.get('a') is not None
+
+    cache.set('d', 'd')
+    assert 'b' not in cache
+    assert all(key in cache for key in 'acd')
+    assert cache.stats()['evicted_lru'] == 1
+
+
+def test_byte_budget_evicts_until_within_limit():
+    cache = BoundedCache(max_entries=100, max_bytes=250)
+    cache.set('a', Blob(100))
+    cache.set('b', Blob(100))
+    cache.set('c', Blob(100))
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    assert cache.stats()['estimated_bytes'] == 200
+
+    cache.set('big', Blob(240))
+    assert len(cache) == 1 and 'big' in cache
+
+
+def test_peek_does_not_touch_recency_or_stats():
+    cache = BoundedCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.peek('a') == 1
+    cache.set('c', 3)
+    assert 'a' not in cache
+    stats = cache.stats()
+    assert stats['hits'] == 0 and stats['misses'] == 0
+
+
+def test_entries_expire_after_ttl():
+    cache = BoundedCache(ttl=60)
+    cache.set('old', 1, stored_at=time.time() - 61)
+    cache.set('new', 2)
+    # Expired entries are dropped on the next set as well as on lookup
+    assert 'old' not in cache
+    cache.set('stale', 3, stored_at=time.time() - 30)
+    cache._entries['stale'].stored_at -= 31
+    assert cache.get('stale') is None
+    assert 'stale' not in cache
+    assert cache.get('new').value == 2
+    assert cache.stats()['evicted_expired'] == 2
+
+
+def test_max_age_is_a_miss_without_dropping_the_entry():
+    cache = BoundedCache()
+    cache.set('a', 1, stored_at=time.time() - 10)
+    assert cache.get('a', max_age=5) is None
+    assert cache.get('a', max_age=20).value == 1
+    assert 'a' in cache
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_stored_at_backdates_the_entry():
+    cache = BoundedCache()
+    stored_at = time.time() - 100
+    cache.set('a', 1, stored_at=stored_at)
+    entry = cache.get('a')
+    assert entry.stored_at == stored_at
+    assert entry.age() >= 100
+
+
+def test_pinned_entries_never_expire_or_evict():
+    cache = BoundedCache(max_entries=2, max_bytes=150, ttl=60)
+    cache.set('snapshot', Blob(1000), pin=True, stored_at=time.time() - 3600)
+    cache.set('a', Blob(100))
+    cache.set('b', Blob(100))
+    cache.set('c', Blob(10))
+
+    assert cache.get('snapshot').value.size == 1000
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    stats = cache.stats()
+    assert stats['pinned_entries'] == 1
+    assert stats['pinned_bytes'] == 1000
+    assert stats['estimated_bytes'] == 1110
+
+
+def test_repinning_and_delete_keep_accounting_straight():
+    cache = BoundedCache()
+    cache.set('a', Blob(50), pin=True)
+    cache.set('a', Blob(70))
+    stats = cache.stats()
+    assert (stats['pinned_entries'], stats['pinned_bytes'], stats['estimated_bytes']) == (0, 0, 70)
+
+    cache.delete('a')
+    cache.delete('missing')
+    assert len(cache) == 0 and cache.stats()['estimated_bytes'] == 0
+
+    cache.set('b', Blob(20), pin=True)
+    cache.clear()
+    stats = cache.stats()
+    assert (stats['entries'], stats['pinned_entries'], stats['estimated_bytes']) == (0, 0, 0)
@@ -0,0 +1,121 @@
+# test_change_log.py
+# Versioned change log behind /api/changes
+
+import os
+
+import pytest
+
+from change_log import ADDED, REMOVED, STATUS_CHANGED, UPDATED, ChangeLog, change_events
+from order_snapshot import OrderSnapshot, diff_snapshots
+
+
+def events(*names):
+    return [{'type': ADDED, 'order_id': name} for name in names]
+
+
+def test_since_returns_only_newer_events_in_order():
+    log = ChangeLog()
+    start = log.version
+    log.record(events('a', 'b'))
+    middle = log.version
+    log.record(events('c'))
+
+    found, version = log.since(start)
+    assert [event['order_id'] for event in found] == ['a', 'b', 'c']
+    assert version == log.version
+
+    found, version = log.since(middle)
+    assert [event['order_id'] for event in found] == ['c']
+    assert log.since(log.version) == ([], log.version)
+
+
+def test_limit_pages_through_the_log():
+    log = ChangeLog()
+    version = log.version
+    log.record(events('a', 'b', 'c', 'd', 'e'))
+
+    seen = []
+    while version != log.version:
+        found, version = log.since(version, limit=2)
+        seen.extend(event['order_id'] for event in found)
+    assert seen == ['a', 'b', 'c', 'd', 'e']
+
+
+def test_versions_older_than_the_log_need_a_resync():
+    log = ChangeLog(max_events=3)
+    start = log.version
+    log.record(events('a', 'b', 'c', 'd'))
+    assert log.since(start) == (None, log.version)
+
+
+def test_reset_forces_a_resync():
+    log = ChangeLog()
+    start = log.version
+    log.record(events('a'))
+    log.reset()
+    assert log.since(start) == (None, log.version)
+    assert log.since(log.version) == ([], log.version)
+
+
+@pytest.mark.parametrize('version', ['', 'garbage', '-1', 'deadbeef-1', None, 12345])
+def test_foreign_or_malformed_versions_need_a_resync(version):
+    log = ChangeLog()
+    log.record(events('a'))
+    assert log.since(version) == (None, log.version)
+
+
+def test_another_log_never_shares_versions():
+    first, second = ChangeLog(), ChangeLog()
+    start = first.version
+    first.record(events('a'))
+    second.record(events('b'))
+    assert first.since(second.version)[0] is None
+    assert second.since(start)[0] is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_process_starts_a_new_epoch():
+    log = ChangeLog()
+    start = log.version
+    log.record(events('a'))
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        # The parent's versions are not answered from the child's log
+        found, version = log.since(start)
+        ok = found is None and version.split('-')[0] != start.split('-')[0]
+        os.write(write_end, b'1' if ok else b'0')
+        os._exit(0)
+    os.close(write_end)
+    result = os.read(read_end, 1)
+    os.waitpid(pid, 0)
+    os.close(read_end)
+
+    assert result == b'1'
+    # The parent's log is unaffected
+    assert [event['order_id'] for event in log.since(start)[0]] == ['a']
+
+
+def test_change_events_classify_the_diff():
+    base = {'booth_number': 'A-1', 'exhibitor_name': 'Acme', 'item': 'Chair', 'quantity': 1}
+    old = OrderSnapshot([
+        dict(base, id='kept', status='in-process'),
+        dict(base, id='moved', status='in-process'),
+        dict(base, id='edited', status='delivered'),
+        dict(base, id='gone', status='delivered')
+    ], source='mock')
+    new = OrderSnapshot([
+        dict(base, id='kept', status='in-process'),
+        dict(base, id='moved', status='delivered'),
+        dict(base, id='edited', status='delivered', quantity=3),
+        dict(base, id='new', status='in-process')
+    ], source='mock')
+
+    changed, removed = diff_snapshots(old, new)
+    by_id = {event['order_id']: event for event in change_events(old, changed, removed)}
+    assert {order_id: event['type'] for order_id, event in by_id.items()} == {
+        'moved': STATUS_CHANGED, 'edited': UPDATED, 'new': ADDED, 'gone': REMOVED
+    }
+    assert by_id['moved']['previous_status'] == 'in-process'
@@ -0,0 +1,117 @@
+# test_order_query.py
+# Cursor pagination, sorting and filters of /api/orders queries
+
+import pytest
+
+from order_query import OrderQuery, QueryError, _decode_cursor, _encode_cursor, _first_after, sort_key
+from order_snapshot import OrderSnapshot
+
+STATUSES = ['delivered', 'in-process', 'out-for-delivery', 'in-route']
+
+
+def make_snapshot(count=101):
+    # Few distinct quantities, sections and statuses, so sort keys repeat a lot
+    orders = [
+        {
+            'id': f"ORD-{i:03d}", 'booth_number': f"A-{i % 9}", 'exhibitor_name': f"Exhibitor {i % 6}",
+            'item': 'Chair', 'quantity': i % 3, 'status': STATUSES[i % 4], 'section': f"Section {i % 2}",
+            'order_date': '' if i % 5 == 0 else f"6/{10 + i % 4}/2025"
+        }
+        for i in range(count)
+    ]
+    return OrderSnapshot(orders, source='mock')
+
+
+def query(**args):
+    return OrderQuery.from_args({name: str(value) for name, value in args.items()}, 25, 1000)
+
+
+def unpaged_ids(snapshot, **args):
+    matching = query(**args).run(snapshot) if args else snapshot.orders
+    return [order['id'] for order in matching]
+
+
+def all_pages(snapshot, **args):
+    """Follow next_cursor from the first page to the last, collecting order IDs"""
+    ids = []
+    cursor = None
+    while True:
+        page_args = dict(args, cursor=cursor) if cursor else args
+        page = query(**page_args).run(snapshot)
+        ids.extend(order['id'] for order in page['orders'])
+        assert page['total_orders'] == len(unpaged_ids(snapshot, **{k: v for k, v in args.items() if k != 'limit'}))
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('sort', [None, 'quantity', '-quantity', 'order_date', '-status', 'id'])
+@pytest.mark.parametrize('filters', [{}, {'status': 'delivered,in-route'}, {'section': 'Section 1'}])
+@pytest.mark.parametrize('limit', [1, 7, 25, 500])
+def test_pages_return_every_order_exactly_once(sort, filters, limit):
+    snapshot = make_snapshot()
+    args = dict(filters)
+    if sort:
+        args['sort'] = sort
+    unpaged = unpaged_ids(snapshot, **args)
+
+    ids = all_pages(snapshot, limit=limit, **args)
+    assert ids == unpaged
+    assert len(set(ids)) == len(ids)
+
+
+def test_sort_is_total_and_descending_is_the_reverse():
+    snapshot = make_snapshot()
+    ascending = [order['id'] for order in query(sort='quantity').run(snapshot)]
+    descending = [order['id'] for order in query(sort='-quantity').run(snapshot)]
+    expected = sorted(snapshot.orders, key=lambda order: (sort_key(order['quantity']), order['id']))
+    assert ascending == [order['id'] for order in expected]
+    assert descending == ascending[::-1]
+
+
+def test_first_after_skips_duplicate_keys_up_to_the_cursor():
+    keys = [(1, 'a'), (1, 'b'), (1, 'c'), (2, 'a')]
+    assert _first_after(keys, (1, 'b'), descending=False) == 2
+    assert _first_after(keys, (0, 'z'), descending=False) == 0
+    assert _first_after(keys, (2, 'a'), descending=False) == 4
+    assert _first_after(keys[::-1], (1, 'b'), descending=True) == 3
+
+
+def test_cursor_round_trips_sort_keys():
+    key = ((2, 'Section 1'), 'ORD-007', 7)
+    assert _decode_cursor(_encode_cursor('-section', key), '-section') == key
+
+
+def test_cursor_from_another_sort_or_garbage_is_rejected():
+    cursor = _encode_cursor('quantity', ((1, 2), 'ORD-001', 1))
+    with pytest.raises(QueryError):
+        _decode_cursor(cursor, '-quantity')
+    with pytest.raises(QueryError):
+        _decode_cursor('not-a-cursor!', 'quantity')
+
+
+def test_cursor_survives_appends_and_status_changes():
+    snapshot = make_snapshot(30)
+    first = query(sort='quantity', limit=10).run(snapshot)
+    expected = [order['id'] for order in query(sort='quantity', limit=10, cursor=first['next_cursor']).run(snapshot)['orders']]
+
+    # Appended orders sort after the cursor here (higher quantity); a status edit keeps the key
+    changed = [dict(order, status='delivered') for order in snapshot.orders]
+    appended = [dict(snapshot.orders[0], id=f"ORD-9{i:02d}", quantity=9) for i in range(5)]
+    grown = OrderSnapshot(changed + appended, source='mock')
+
+    second = query(sort='quantity', limit=10, cursor=first['next_cursor']).run(grown)
+    assert [order['id'] for order in second['orders']] == expected
+
+
+@pytest.mark.parametrize('args', [
+    {'sort': 'nope'}, {'fields': 'id,nope'}, {'limit': '0'}, {'limit': 'x'}, {'limit': '1001'}
+])
+def test_invalid_parameters_raise_query_error(args):
+    with pytest.raises(QueryError):
+        OrderQuery.from_args(args, 25, 1000)
+
+
+def test_projection_keeps_only_requested_fields():
+    rows = query(fields='id,status', limit=3).run(make_snapshot())['orders']
+    assert all(set(row) == {'id', 'status'} for row in rows)
@@ -0,0 +1,112 @@
+# test_row_parser.py
+# Parity of the compiled RowParser with the per-row dict parser it replaced
+
+import pytest
+
+from fake_sheets import HEADERS, make_grid
+from row_parser import FINGERPRINT_COLUMNS, ORDER_ID_COLUMNS, fingerprint, unique_id
+from sheets_integration import GoogleSheetsManager
+
+
+def legacy_parse_orders(manager, data):
+    """The original parse_orders_data row loop: a dict of every cell per row (with stable IDs)"""
+    headers, header_row_idx = manager._find_headers(data)
+    id_column = next((column for column in ORDER_ID_COLUMNS if column in headers), None)
+    ids_seen = {}
+    orders = []
+    for row_idx, row in enumerate(data[header_row_idx + 1:], start=header_row_idx + 1):
+        if not row or len(row) == 0:
+            continue
+
+        row_dict = {}
+        for i, value in enumerate(row):
+            if i < len(headers):
+                row_dict[headers[i]] = str(value).strip()
+
+        booth_num = row_dict.get('Booth #', '').strip()
+        exhibitor_name = row_dict.get('Exhibitor Name', '').strip()
+        item = row_dict.get('Item', '').strip()
+        if not booth_num or not exhibitor_name:
+            continue
+
+        date = row_dict.get('Date', '').strip()
+        order_id = row_dict.get(id_column, '')
+        if not order_id:
+            digest = fingerprint(row_dict.get(column, '') for column in FINGERPRINT_COLUMNS)
+            order_id = f"ORD-{date.replace('/', '-')}-{booth_num}-{digest}"
+        orders.append({
+            'id': unique_id(order_id, ids_seen),
+            'booth_number': booth_num,
+            'exhibitor_name': exhibitor_name,
+            'item': item,
+            'description': f"Order from Google Sheets: {item}",
+            'color': row_dict.get('Color', '').strip(),
+            'quantity': manager._safe_int(row_dict.get('Quantity', '1')),
+            'status': manager.map_order_status(row_dict.get('Status', '').strip()),
+            'order_date': date,
+            'comments': row_dict.get('Comments', '').strip(),
+            'section': row_dict.get('Section', '').strip(),
+            'type': row_dict.get('Type', '').strip(),
+            'user': row_dict.get('User', '').strip(),
+            'hour': row_dict.get('Hour', '').strip(),
+            'abacus_ai_processed': True,
+            'data_source': 'Google Sheets via Abacus AI'
+        })
+    return orders
+
+
+def edge_case_grids():
+    """Layouts the index-based parser must handle exactly like the dict parser"""
+    base = make_grid(200, exhibitors=20, seed=7)
+    rows = base[1:]
+
+    # Title rows above the header, short rows, blank rows, padded cells and odd quantities
+    messy = [['Orders export', ''], [], list(HEADERS)]
+    for i, row in enumerate(rows):
+        row = list(row)
+        if i % 7 == 0:
+            row = row[:i % len(row)]
+        if i % 11 == 0:
+            row[7:8] = [[' 2.9 ', 'x', '', '1e3', '-4'][i % 5]] if len(row) > 7 else []
+        if i % 13 == 0:
+            row = [f"  {cell}  " for cell in row]
+        if i % 17 == 0:
+            row = []
+        messy.append(row)
+
+    # Columns in another order, a missing Quantity/Hour and extra columns
+    shuffled_headers = ['Status', 'Exhibitor Name', 'Notes', 'Booth #', 'Item', 'Date', 'Section', 'Color']
+    shuffled = [shuffled_headers] + [
+        [row[8], row[3], 'n/a', row[2], row[5], row[0], row[4], row[6], 'overflow'] for row in rows
+    ]
+
+    # A repeated header name: the right-most cell present wins
+    duplicated_headers = HEADERS + ['Status', 'Color']
+    duplicated = [duplicated_headers] + [
+        row + (['Delivered', 'Teal'][:i % 3]) for i, row in enumerate(rows)
+    ]
+
+    # Non-string cells, as a caller passing numbers would
+    numeric = [list(HEADERS)] + [row[:7] + [i % 4, row[8]] + row[9:] for i, row in enumerate(rows)]
+
+    # A designated ID column, blank on some rows, and repeated rows
+    with_ids = [['Order ID'] + list(HEADERS)] + [
+        [f"A-{i // 2}" if i % 5 else ''] + row for i, row in enumerate(rows + rows[:20])
+    ]
+
+    return {'messy': messy, 'shuffled': shuffled, 'duplicated': duplicated, 'numeric': numeric, 'with_ids': with_ids}
+
+
+@pytest.fixture(scope='module')
+def manager():
+    return GoogleSheetsManager(lazy=True)
+
+
+@pytest.mark.parametrize('name', sorted(edge_case_grids()) + ['synthetic'])
+def test_parse_orders_data_matches_dict_parser(manager, name):
+    grid = make_grid(2000, 50) if name == 'synthetic' else edge_case_grids()[name]
+    expected = legacy_parse_orders(manager, grid)
+    actual = manager.parse_orders_data(grid)
+    assert actual == expected
+    # Same key order, so serialized bodies are byte-identical
+    assert [list(order) for order in actual] == [list(order) for order in expected]
@@ -0,0 +1,146 @@
+# test_sheets_sync.py
+# Incremental sync_orders against a fake worksheet: after every edit it must match a full read
+
+import pytest
+
+import sheets_integration
+from fake_sheets import FakeSheetsManager, make_grid
+
+SHEET_ID = 'fake-sheet'
+
+# Row layout of fake_sheets.HEADERS
+BOOTH, EXHIBITOR, ITEM, QUANTITY, STATUS = 2, 3, 5, 7, 8
+
+
+def full_read(grid):
+    """Orders of a fresh manager reading the whole grid"""
+    manager = FakeSheetsManager({'Orders': grid})
+    return [order.to_dict() for order in manager.sync_orders(SHEET_ID, full=True)]
+
+
+def assert_matches_full_read(manager, grid, mode='incremental'):
+    orders = [order.to_dict() for order in manager.sync_orders(SHEET_ID)]
+    assert manager.last_sync['mode'] == mode
+    assert orders == full_read(grid)
+
+
+def status_edit(grid):
+    grid[10][STATUS] = 'Delivered' if grid[10][STATUS] != 'Delivered' else 'In Process'
+    grid[200][STATUS] = 'Out for delivery'
+
+
+def append_rows(grid):
+    grid.append(list(grid[5]))
+    grid.append(list(grid[50]))
+
+
+def insert_same_booth(grid):
+    # A new row inside a run of rows for one booth; the booth column alone cannot see it
+    row = list(grid[300])
+    row[ITEM], row[STATUS] = 'Easel', 'Out for delivery'
+    grid.insert(301, row)
+
+
+def delete_rows(grid):
+    del grid[350:353]
+
+
+def truncate_tail(grid):
+    del grid[-20:]
+
+
+def clear_identity_cell(grid):
+    grid[120][EXHIBITOR] = ''
+
+
+def edit_identity_cell(grid):
+    grid[130][ITEM] = 'Lectern'
+
+
+def blank_rows(grid):
+    grid[140] = [''] * len(grid[140])
+    grid.insert(len(grid) - 5, [])
+
+
+@pytest.mark.parametrize('mutate', [
+    status_edit, append_rows, insert_same_booth, delete_rows, truncate_tail,
+    clear_identity_cell, edit_identity_cell, blank_rows
+])
+def test_incremental_sync_matches_full_read(mutate):
+    grid = make_grid(400, exhibitors=20, seed=3)
+    manager = FakeSheetsManager({'Orders': grid})
+    manager.sync_orders(SHEET_ID)
+    assert manager.last_sync['mode'] == 'full'
+
+    mutate(grid)
+    assert_matches_full_read(manager, grid)
+    # And again with nothing changed since
+    assert_matches_full_read(manager, grid)
+    assert manager.last_sync['changed'] is False
+
+
+def test_edits_accumulate_across_incremental_syncs():
+    grid = make_grid(400, exhibitors=20, seed=5)
+    manager = FakeSheetsManager({'Orders': grid}, full_resync_every=100)
+    manager.sync_orders(SHEET_ID)
+
+    for mutate in (status_edit, insert_same_booth, append_rows, delete_rows, clear_identity_cell, blank_rows):
+        mutate(grid)
+        assert_matches_full_read(manager, grid)
+
+
+def test_shift_past_reread_limit_falls_back_to_full_read():
+    grid = make_grid(400, exhibitors=20, seed=7)
+    manager = FakeSheetsManager({'Orders': grid})
+    manager.sync_orders(SHEET_ID)
+
+    # Every row below the insert moves down one
+    grid.insert(2, list(grid[20]))
+    assert_matches_full_read(manager, grid, mode='full')
+
+
+def test_large_shift_reread_matches_full_read(monkeypatch):
+    monkeypatch.setattr(sheets_integration, 'MAX_REREAD_FRACTION', 1)
+    monkeypatch.setattr(sheets_integration, 'MAX_REREAD_RANGES', 1000)
+    grid = make_grid(60, exhibitors=4, seed=9)
+    manager = FakeSheetsManager({'Orders': grid})
+    manager.sync_orders(SHEET_ID)
+
+    grid.insert(3, list(grid[30]))
+    del grid[40]
+    assert_matches_full_read(manager, grid)
+    assert manager.last_sync['rows_reread'] > 0
+
+
+def test_insert_inside_same_booth_block(monkeypatch):
+    monkeypatch.setattr(sheets_integration, 'MAX_REREAD_FRACTION', 1)
+    header = make_grid(0)[0]
+
+    def row(item, status, quantity='1'):
+        return ['6/10/2025', '8:00', 'A-1', 'Acme', 'Section A', item, 'Red', quantity, status, 'Furniture', 'li', '']
+
+    grid = [header, row('Chair', 'In Process'), row('Table', 'In Process'), row('Lamp', 'In Process')]
+    manager = FakeSheetsManager({'Orders': grid})
+    manager.sync_orders(SHEET_ID)
+
+    grid.insert(2, row('Easel', 'Out for delivery'))
+    grid[3][ITEM], grid[3][QUANTITY] = 'Sofa', '5'
+    assert_matches_full_read(manager, grid)
+    assert [(order['item'], order['status']) for order in full_read(grid)] == [
+        ('Chair', 'in-process'), ('Easel', 'out-for-delivery'), ('Sofa', 'in-process'), ('Lamp', 'in-process')
+    ]
+
+
+def test_quantity_edit_waits_for_full_read():
+    grid = make_grid(100, exhibitors=5, seed=11)
+    manager = FakeSheetsManager({'Orders': grid})
+    before = manager.sync_orders(SHEET_ID)
+
+    grid[10][QUANTITY] = '99'
+    assert manager.sync_orders(SHEET_ID) == before
+    assert [order.to_dict() for order in manager.sync_orders(SHEET_ID, full=True)] == full_read(grid)
+
+    grid[20][QUANTITY] = '42'
+    manager.reset_sync()
+    assert [order.to_dict() for order in manager.sync_orders(SHEET_ID)] == full_read(grid)
+    assert manager.last_sync['mode'] == 'full'
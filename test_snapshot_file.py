@@ -0,0 +1,88 @@
+# test_snapshot_file.py
+# Round-trip and rejection of the columnar snapshot file
+
+import os
+import struct
+
+import pytest
+
+import snapshot_file
+from compact_order import CompactOrder
+from order_snapshot import OrderSnapshot
+from snapshot_file import SnapshotFile, SnapshotFileError, decode_snapshot, encode_snapshot
+
+
+def make_orders(count=50):
+    statuses = ['delivered', 'in-process', 'out-for-delivery']
+    return [
+        CompactOrder(
+            f"ORD-{i}", f"A-{i % 7}", f"Exhibitor {i % 5} Café", f"Item {i % 3}", 'Red', i % 4 + 1,
+            statuses[i % 3], '6/10/2025', f"Note {i}" if i % 2 else '', 'Section A', 'Furniture',
+            'li', '8:00', 'Orders' if i % 10 == 0 else None
+        )
+        for i in range(count)
+    ]
+
+
+def test_round_trip_keeps_every_order_and_the_header():
+    snapshot = OrderSnapshot(make_orders(), source='sheets', created_at=1750000000.5)
+    orders, header = decode_snapshot(encode_snapshot(snapshot))
+
+    assert [order.to_dict() for order in orders] == [order.to_dict() for order in snapshot.orders]
+    assert [order.source_tab for order in orders] == [order.source_tab for order in snapshot.orders]
+    assert header['version'] == snapshot.version
+    assert header['source'] == 'sheets'
+    assert header['created_at'] == 1750000000.5
+
+
+def test_empty_snapshot_round_trips():
+    orders, header = decode_snapshot(encode_snapshot(OrderSnapshot([], source='sheets')))
+    assert orders == []
+    assert header['orders'] == 0
+
+
+def test_corrupted_byte_fails_the_checksum():
+    data = bytearray(encode_snapshot(OrderSnapshot(make_orders(), source='sheets')))
+    data[len(data) // 2] ^= 0xFF
+    with pytest.raises(SnapshotFileError, match='Checksum'):
+        decode_snapshot(bytes(data))
+
+
+def test_truncated_file_is_rejected():
+    data = encode_snapshot(OrderSnapshot(make_orders(), source='sheets'))
+    with pytest.raises(SnapshotFileError):
+        decode_snapshot(data[:len(data) // 2])
+    with pytest.raises(SnapshotFileError):
+        decode_snapshot(data[:4])
+
+
+def test_other_schema_version_is_rejected():
+    data = bytearray(encode_snapshot(OrderSnapshot(make_orders(), source='sheets')))
+    # The schema version follows the 8-byte magic
+    struct.pack_into('<H', data, 8, snapshot_file.SCHEMA_VERSION - 1)
+    with pytest.raises(SnapshotFileError, match='Schema version'):
+        decode_snapshot(bytes(data))
+
+
+def test_non_integer_quantity_cannot_be_persisted():
+    orders = make_orders(3)
+    orders[1].quantity = '2'
+    with pytest.raises(SnapshotFileError, match='quantity'):
+        encode_snapshot(OrderSnapshot(orders, source='sheets'))
+
+
+def test_snapshot_file_save_load_and_unusable_files(tmp_path):
+    path = tmp_path / 'nested' / 'orders.bin'
+    store = SnapshotFile(str(path))
+    assert store.load() is None
+
+    snapshot = OrderSnapshot(make_orders(), source='sheets')
+    assert store.save(snapshot)
+    stored = store.load()
+    assert stored.token == snapshot.version
+    assert [order.to_dict() for order in stored.orders] == [order.to_dict() for order in snapshot.orders]
+    assert abs(stored.written_at - os.stat(path).st_mtime) < 1e-6
+
+    path.write_bytes(b'not a snapshot')
+    assert store.load() is None
+    assert store.stats()['errors'] == 1